@@ -0,0 +1,60 @@
+"""
+Micro-benchmark of the event queue resolve loop on trigger heavy teams.
+
+Run from the repository root with `python -m benchmarks.event_queue`.
+"""
+import timeit
+
+from sap.battle import Battle
+from sap.event_queue import EventQueue
+from sap.pet import Pet, Trigger, TriggerType
+from sap.pet_impl import Hedgehog, Badger, Sheep, Cricket, Flamingo, Rooster, Deer
+
+TEAMS = {
+    "hedgehogs": (
+        lambda: [Hedgehog.spawn() for _ in range(5)],
+        lambda: [Hedgehog.spawn() for _ in range(5)],
+    ),
+    "badger chain": (
+        lambda: [Hedgehog.spawn(), Badger.spawn(), Hedgehog.spawn(), Badger.spawn(), Cricket.spawn()],
+        lambda: [Sheep.spawn(), Hedgehog.spawn(), Flamingo.spawn(), Badger.spawn(), Cricket.spawn()],
+    ),
+    "summons": (
+        lambda: [Sheep.spawn(), Cricket.spawn(), Rooster.spawn(), Deer.spawn(), Hedgehog.spawn()],
+        lambda: [Cricket.spawn(), Sheep.spawn(), Cricket.spawn(), Rooster.spawn(), Hedgehog.spawn()],
+    ),
+}
+
+
+class Listener(Pet):
+    """Pet that hears every trigger and does nothing with it"""
+    __slots__ = ()
+    trigger_types = frozenset(TriggerType)
+
+
+def battle_once(make_team_1, make_team_2):
+    Battle(make_team_1(), make_team_2()).battle()
+
+
+def drain_queue(num_triggers: int):
+    """Broadcast a burst of no-op triggers and resolve them, to isolate the queue itself"""
+    queue = EventQueue(team_1=[Listener("👂", 1, 2) for _ in range(5)], team_2=[Listener("👂", 1, 2) for _ in range(5)])
+    for _ in range(num_triggers):
+        queue.apply_trigger(Trigger(TriggerType.TURN_STARTED))
+    assert len(queue.event_queue) == 10 * num_triggers, "every pet should hear every trigger"
+    queue.resolve_events()
+
+
+def main(repeats: int = 2000):
+    for name, (make_team_1, make_team_2) in TEAMS.items():
+        seconds = timeit.timeit(lambda: battle_once(make_team_1, make_team_2), number=repeats)
+        print(f"{name:>14}: {repeats / seconds:10.0f} battles/s")
+
+    for num_triggers in (10, 100, 1000):
+        number = max(1, 10000 // num_triggers)
+        seconds = timeit.timeit(lambda: drain_queue(num_triggers), number=number)
+        print(f"{num_triggers * 10:>8} events: {seconds / number * 1e3:8.3f} ms per drain")
+
+
+if __name__ == "__main__":
+    main()
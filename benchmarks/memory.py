@@ -0,0 +1,39 @@
+"""
+Memory taken by each pet, food and trigger, as measured by tracemalloc.
+
+Run from the repository root with `python -m benchmarks.memory`.
+"""
+import tracemalloc
+from typing import Callable
+
+from sap.pet import Trigger, TriggerType
+from sap.pet_impl import Fish, Whale, Apple, SaladBowl
+
+COUNT = 10000
+
+
+def bytes_per_object(make: Callable[[], object]) -> float:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = [make() for _ in range(COUNT)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Don't count the list holding them
+    return (after - before - objects.__sizeof__()) / COUNT
+
+
+def main():
+    fish = Fish.spawn()
+    makers = {
+        "pet": Fish.spawn,
+        "pet with ability state": Whale.spawn,
+        "food": Apple.spawn,
+        "random food": SaladBowl.spawn,
+        "trigger": lambda: Trigger(TriggerType.DEAL_DAMAGE, fish, damage=1),
+    }
+    for name, make in makers.items():
+        print(f"{name:>22}: {bytes_per_object(make):6.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
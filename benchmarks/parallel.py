@@ -0,0 +1,41 @@
+"""
+Benchmark of parallel battle evaluation, reporting the speedup over a single process.
+
+Run from the repository root with `python -m benchmarks.parallel [processes]`.
+"""
+import os
+import sys
+import time
+from random import Random
+
+from sap.parallel import simulate_pairs_parallel
+from sap.pet_impl import PET_TIERS
+
+NUM_PAIRS = 200
+SAMPLES = 20
+
+
+def random_team(random_gen: Random):
+    species = [pet_type for tier in PET_TIERS for pet_type in tier]
+    return [random_gen.choice(species).spawn() for _ in range(random_gen.randint(1, 5))]
+
+
+def time_run(pairs, processes: int) -> float:
+    start = time.perf_counter()
+    simulate_pairs_parallel(pairs, samples=SAMPLES, processes=processes, seed=0)
+    return time.perf_counter() - start
+
+
+def main(processes: int):
+    random_gen = Random(0)
+    pairs = [(random_team(random_gen), random_team(random_gen)) for _ in range(NUM_PAIRS)]
+    battles = NUM_PAIRS * SAMPLES
+
+    serial = time_run(pairs, 1)
+    print(f"{1:>3} process:   {battles / serial:10.0f} battles/s")
+    parallel = time_run(pairs, processes)
+    print(f"{processes:>3} processes: {battles / parallel:10.0f} battles/s, speedup {serial / parallel:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count())
@@ -0,0 +1,42 @@
+"""
+Benchmark of pick_unique_pets over team sizes, against the quadratic version it replaced.
+
+Run from the repository root with `python -m benchmarks.pick_unique_pets`.
+"""
+import timeit
+from random import Random
+
+from sap.pet import pick_unique_pets
+from sap.pet_impl import Fish
+
+
+def quadratic_pick_unique_pets(pets, number, exclusion=None, require_living=True, random_gen=Random()):
+    """The old implementation, which scanned with dataclass equality for every pick"""
+    if exclusion is None:
+        exclusion = []
+
+    picks = []
+    if require_living:
+        exclusion += [pet for pet in pets if pet.toughness <= 0]
+    while len(picks) < number and (len(picks) + len(exclusion)) < len(pets):
+        picks.append(random_gen.choice([pet for pet in pets if pet not in exclusion + picks]))
+
+    return picks
+
+
+def main(repeats: int = 200):
+    random_gen = Random(0)
+    print(f"{'pets':>6} {'picks':>6} {'before (us)':>12} {'after (us)':>12}")
+    for size in (5, 10, 25, 50):
+        pets = [Fish.spawn() for _ in range(size)]
+        for number in (1, size // 2):
+            number = max(number, 1)
+            before = timeit.timeit(lambda: quadratic_pick_unique_pets(pets, number, [pets[0]], random_gen=random_gen),
+                                   number=repeats)
+            after = timeit.timeit(lambda: pick_unique_pets(pets, number, [pets[0]], random_gen=random_gen),
+                                  number=repeats)
+            print(f"{size:>6} {number:>6} {before / repeats * 1e6:12.2f} {after / repeats * 1e6:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
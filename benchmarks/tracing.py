@@ -0,0 +1,44 @@
+"""
+Battles per second with tracing off, against tracing on with logging set to drop the messages anyway, which is what
+every battle used to pay for.
+
+Run from the repository root with `python -m benchmarks.tracing`.
+"""
+import logging
+import timeit
+
+from sap import trace
+from sap.battle import simulate
+from benchmarks.event_queue import TEAMS
+
+
+def battles_per_second(repeats: int) -> float:
+    seconds = 0.0
+    for make_team_1, make_team_2 in TEAMS.values():
+        team_1, team_2 = make_team_1(), make_team_2()
+        seconds += timeit.timeit(lambda: simulate(team_1, team_2), number=repeats)
+    return repeats * len(TEAMS) / seconds
+
+
+def main(repeats: int = 2000):
+    logging.getLogger().setLevel(logging.WARNING)
+
+    was_enabled = trace.enabled
+    try:
+        trace.disable()
+        untraced = battles_per_second(repeats)
+        trace.enable(logging.WARNING)  # formats every message, which logging then drops
+        traced = battles_per_second(repeats)
+    finally:
+        if was_enabled:
+            trace.enable()
+        else:
+            trace.disable()
+
+    print(f"{'tracing off':>15}: {untraced:10.0f} battles/s")
+    print(f"{'tracing dropped':>15}: {traced:10.0f} battles/s")
+    print(f"{'speedup':>15}: {untraced / traced:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark of trying every legal action of a turn and going back, with the undo journal against deep copying the player.
+
+Run from the repository root with `python -m benchmarks.undo`.
+"""
+import copy
+import time
+from random import Random
+
+from sap.envs.sap_random_versus_env import EnvironmentPlayer
+from sap.game import create_shop
+from sap.player import TurnAction
+
+
+def players(number: int, seed: int = 0):
+    """Players part way through a turn, with some pets bought"""
+    random_gen = Random(seed)
+    result = []
+    for i in range(number):
+        player = EnvironmentPlayer(create_shop(Random(i)))
+        player.start_turn(random_gen.randint(0, 8))
+        for _ in range(3):
+            buys = [action for action in player.legal_actions() if action[0] is TurnAction.BUY_AND_PLACE_PET]
+            if buys:
+                player.apply_action(*random_gen.choice(buys))
+        result.append(player)
+    return result
+
+
+def try_with_copies(player: EnvironmentPlayer) -> int:
+    tried = 0
+    for action in player.legal_actions():
+        if action[0] is not TurnAction.END_TURN:
+            copy.deepcopy(player).apply_action(*action)
+            tried += 1
+    return tried
+
+
+def try_with_journal(player: EnvironmentPlayer) -> int:
+    tried = 0
+    for action in list(player.legal_actions()):
+        if action[0] is not TurnAction.END_TURN:
+            player.apply_action(*action, journal=True)
+            player.undo()
+            tried += 1
+    return tried
+
+
+def main(number: int = 50):
+    for name, try_actions in (("deepcopy", try_with_copies), ("journal", try_with_journal)):
+        setup = players(number)
+        start = time.perf_counter()
+        tried = sum(try_actions(player) for player in setup)
+        taken = time.perf_counter() - start
+        print(f"{name:>10}: {tried} actions in {taken:.2f}s, {taken / tried * 1e6:.1f}us per action")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark of stepping a batch of games with the vectorized environment, against stepping as many single environments
+one after the other and stacking what they return.
+
+Run from the repository root with `python -m benchmarks.vec_env`.
+"""
+import time
+
+import numpy as np
+
+from sap.envs.sap_random_versus_env import SapRandomVersusEnv0
+from sap.envs.sap_random_versus_vec_env import SapRandomVersusVecEnv
+
+
+def actions(masks: np.ndarray, random_gen: np.random.Generator) -> np.ndarray:
+    return np.array([random_gen.choice(np.flatnonzero(mask)) for mask in masks])
+
+
+def step_separately(num_envs: int, steps: int) -> float:
+    envs = [SapRandomVersusEnv0(flat_actions=True) for _ in range(num_envs)]
+    for i, env in enumerate(envs):
+        env.seed(i)
+        env.reset()
+    random_gen = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        masks = np.stack([env.action_masks() for env in envs])
+        results = [env.step(action) for env, action in zip(envs, actions(masks, random_gen))]
+        np.stack([result[0] for result in results])
+        for env, result in zip(envs, results):
+            if result[2]:
+                env.reset()
+    return time.perf_counter() - start
+
+
+def step_together(num_envs: int, steps: int) -> float:
+    vec_env = SapRandomVersusVecEnv(num_envs, flat_actions=True)
+    vec_env.seed(0)
+    vec_env.reset()
+    random_gen = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        vec_env.step(actions(vec_env.env_method("action_masks"), random_gen))
+    return time.perf_counter() - start
+
+
+def main(num_envs: int = 16, steps: int = 200):
+    for name, run in (("separate", step_separately), ("vectorized", step_together)):
+        taken = run(num_envs, steps)
+        print(f"{name:>10}: {num_envs * steps} game steps in {taken:.2f}s, "
+              f"{taken / (num_envs * steps) * 1e6:.1f}us per game step")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Find the best order for a team's pets against a spread of opponents.
+
+Order matters a lot: the front pet does the fighting, the whale swallows the pet in front of it, the kangaroo, dirty rat
+and ox react to the pet ahead, and the elephant hurts the pets behind it. A team of five has 120 orders, fewer when
+some of its pets are the same (see orderings, which only leaves out orders that swap equal pets), so rather than
+battling each order equally often they're raced by successive halving (see sap.racing). Every order gets a few
+battles, the better half goes on to twice as many, and so on until one is left.
+"""
+from dataclasses import dataclass
+from random import Random
+from typing import List, Tuple, Optional, Iterator, Sequence
+
+from sap.battle import BattleOutcomes
+from sap.pet import Pet
+from sap.player import Player
+from sap.racing import successive_halving, score
+from sap.solver import pet_key
+
+Move = Tuple[int, int]  # (origin, target) for Player.move
+
+
+@dataclass
+class Arrangement:
+    """An order for a team, and how it did"""
+    order: List[Pet]
+    moves: List[Move]  # to get from the team's order to this one with Player.move
+    outcomes: BattleOutcomes  # of the battles this order was in
+    lower: float  # confidence bounds on the score
+    upper: float
+    simulations: int  # battles run over all orders to find this one
+
+    @property
+    def score(self) -> float:
+        return score(self.outcomes)
+
+
+def orderings(team: List[Pet]) -> Iterator[List[Pet]]:
+    """
+    Every distinct order of the team, starting with the order it's in. Pets that are the same in every way that matters
+    in battle are interchangeable, so orders are built up a position at a time, trying each kind of pet once in each
+    position, and orders that only swap equal pets around aren't made at all.
+
+    That's the only pruning: orders that share their front pets are still each battled in full, as the pets behind
+    can swing a battle after the front ones faint, so there's nothing from a shared front to reuse or cut off early
+    """
+    kinds: List[List[Pet]] = []  # pets of each kind, in order of first appearance
+    kind_index = {}
+    for pet in team:
+        key = pet_key(pet)
+        if key not in kind_index:
+            kind_index[key] = len(kinds)
+            kinds.append([])
+        kinds[kind_index[key]].append(pet)
+
+    used = [0] * len(kinds)
+    order: List[Pet] = []
+
+    def extend() -> Iterator[List[Pet]]:
+        if len(order) == len(team):
+            yield list(order)
+            return
+        for kind, pets in enumerate(kinds):
+            if used[kind] < len(pets):
+                order.append(pets[used[kind]])
+                used[kind] += 1
+                yield from extend()
+                used[kind] -= 1
+                order.pop()
+
+    return extend()
+
+
+def moves_to(current: List[Pet], order: List[Pet]) -> List[Move]:
+    """Moves for Player.move that turn the current order of pets into the given one"""
+    current = list(current)
+    moves = []
+    for target, pet in enumerate(order):
+        origin = next(i for i in range(target, len(current)) if current[i] is pet)
+        if origin != target:
+            current.insert(target, current.pop(origin))
+            moves.append((origin, target))
+    return moves
+
+
+def best_arrangement(team: List[Pet], opponents: Sequence[List[Pet]], samples: int = 4,
+                     random_gen: Optional[Random] = None) -> Arrangement:
+    """
+    The order of the team that does best against the opponents, which are battled in turn
+
+    :param samples: battles for each order in the first round of successive halving, which doubles every round
+    :param random_gen: for the random choices in battles
+    """
+    # Ties go to the earliest order, i.e. the team's own order if it's one of the best, so it isn't moved for nothing
+    result = successive_halving(list(orderings(team)), opponents, samples=samples, random_gen=random_gen)
+    best = result.best
+    return Arrangement(order=best.team, moves=moves_to(team, best.team), outcomes=best.outcomes, lower=best.lower,
+                       upper=best.upper, simulations=result.simulations)
+
+
+def arrange(player: Player, opponents: Sequence[List[Pet]], samples: int = 4,
+            random_gen: Optional[Random] = None) -> Arrangement:
+    """
+    Put the player's pets in the best order against the opponents, see best_arrangement
+    """
+    player.condense()
+    arrangement = best_arrangement(player.pets, opponents, samples, random_gen)
+    for origin, target in arrangement.moves:
+        player.move(origin, target)
+    return arrangement
@@ -1,10 +1,12 @@
-import random
-from typing import List, Tuple
-from sap.pet import Pet, Trigger, TriggerType
+from random import Random
+from typing import List, Tuple, Optional, Iterable
+from sap import trace
+from sap.pet import Pet, Trigger, TriggerType, TeamPair
 from enum import Enum
 import logging
 from sap.event_queue import EventQueue
-from dataclasses import replace
+from sap.team import Team
+from dataclasses import dataclass
 
 
 class Result(Enum):
@@ -15,45 +17,97 @@ class Result(Enum):
 
 
 PetTuple = Tuple[Pet, ...]
+# Rounds a battle gets on top of those its starting stats need, for summons, buffs and healing
+ROUND_LIMIT_SLACK = 100
 
 
-def copy_team(pets: List[Pet]):
-    return [replace(pet) for pet in pets]
+def round_limit(team_1: List[Pet], team_2: List[Pet]) -> int:
+    """
+    Rounds after which a battle between the teams is called a draw, so that battles that go on forever still end.
+    A round that changes nothing is caught straight away (see Battle.battle), and otherwise every round does at least
+    one damage, so no battle of the starting pets can need more rounds than their total toughness
+    """
+    return sum(pet.toughness for pet in team_1) + sum(pet.toughness for pet in team_2) + ROUND_LIMIT_SLACK
+
+
+def copy_team(pets: List[Pet]) -> List[Pet]:
+    return [pet.clone() for pet in pets]
 
 
 class Battle:
-    def __init__(self, team_1: List[Pet], team_2: List[Pet]):
+    def __init__(self, team_1: List[Pet], team_2: List[Pet], random_gen: Optional[Random] = None,
+                 max_rounds: Optional[int] = None):
+        """
+        :param random_gen: if given, every pet in the battle uses this for its random choices, rather than its own.
+            Otherwise pets without one of their own, and pets summoned in the battle, get an unseeded one
+        :param max_rounds: rounds after which the battle is called a draw, by default round_limit of the teams
+        """
+        self.team_1 = Team()
+        self.team_2 = Team()
+        self.random_gen = random_gen
+        self.default_random_gen = Random() if random_gen is None else random_gen
+        self.event_queue = EventQueue(team_1=self.team_1, team_2=self.team_2, random_gen=self.default_random_gen)
+        self.rounds = 0
+        self.given_max_rounds = max_rounds
+        self.max_rounds = 0
+        self.looped = False  # whether the battle was called a draw because it would never end
+        self.reset(team_1, team_2)
+
+    def reset(self, team_1: List[Pet], team_2: List[Pet]):
+        """
+        Set the battle up again for the given teams, reusing the team lists and event queue of this battle
+        """
         # We want battle buffs to be lost at the end of battle, so copy all pets
-        self.team_1 = copy_team(team_1)
-        self.team_2 = copy_team(team_2)
-        self.event_queue = EventQueue(team_1=self.team_1, team_2=self.team_2)
+        self.team_1[:] = copy_team(team_1)
+        self.team_2[:] = copy_team(team_2)
+        for pet in self.team_1 + self.team_2:
+            if self.random_gen is not None or pet.random_gen is None:
+                pet.random_gen = self.default_random_gen
+        self.event_queue.event_queue.clear()
+        self.event_queue.reset_resolve_order()
+        self.rounds = 0
+        self.max_rounds = round_limit(team_1, team_2) if self.given_max_rounds is None else self.given_max_rounds
+        self.looped = False
 
     def battle(self) -> Result:
         """
         Have the two teams battle, return the result
         """
 
-        logging.info(f"Teams at the start: {self.team_1}, {self.team_2}")
+        if trace.enabled:
+            logging.info(f"Teams at the start: {self.team_1}, {self.team_2}")
 
-        # First, allow battle starting events to resolve, like e.g. mosquito damage
-        self.event_queue.apply_trigger(Trigger(TriggerType.BATTLE_STARTED, None))
-        self.event_queue.resolve_events()
+        self.start()
 
         result = self.assess()  # must be after events as battle might be over
-        last_teams = ([], [])
+        last_fingerprint = None
         while result == Result.UNFINISHED:
             # We just run rounds until we get a result that isn't unfinished
             self.do_round()
-            if (self.team_1, self.team_2) == last_teams:
-                pass  # raise ValueError("Game should never loop")
-            else:
-                last_teams = (copy_team(self.team_1), copy_team(self.team_2))
 
-            logging.info(f"Teams after a round: f{self.team_1}, f{self.team_2}")
+            if trace.enabled:
+                logging.info(f"Teams after a round: f{self.team_1}, f{self.team_2}")
             result = self.assess()
 
+            if result == Result.UNFINISHED:
+                # A round that changes nothing will be repeated forever, e.g. if neither front pet has any power
+                fingerprint = self.fingerprint()
+                if fingerprint == last_fingerprint or self.rounds >= self.max_rounds:
+                    if trace.enabled:
+                        logging.debug(f"Battle stalled after {self.rounds} rounds, calling it a draw")
+                    self.looped = True
+                    result = Result.DRAW
+                last_fingerprint = fingerprint
+
         return result
 
+    def start(self):
+        """
+        Allow battle starting events to resolve, like e.g. mosquito damage
+        """
+        self.event_queue.apply_trigger(Trigger(TriggerType.BATTLE_STARTED, None))
+        self.event_queue.resolve_events()
+
     def do_round(self):
         """
         Run a single round, and return the teams after it
@@ -61,9 +115,9 @@ class Battle:
         if not self.team_1 or not self.team_2:
             return
 
-        # Triggers are resolved in power => toughness => random order
-        all_pets = self.team_1 + self.team_2
-        random.shuffle(all_pets)
+        self.rounds += 1
+        # Triggers are resolved in power => toughness => team and position order
+        self.event_queue.reset_resolve_order()
 
         team_1 = self.team_1
         team_2 = self.team_2
@@ -84,6 +138,13 @@ class Battle:
             self.event_queue.apply_trigger(Trigger(TriggerType.AFTER_ATTACK, front_team_2))
             self.event_queue.resolve_events()
 
+    def fingerprint(self) -> Tuple:
+        """
+        Cheap summary of the state of the battle, which is the same after a round only if nothing happened in it
+        """
+        return (tuple((id(pet), pet.power, pet.toughness, id(pet.equipped_food)) for pet in self.team_1),
+                tuple((id(pet), pet.power, pet.toughness, id(pet.equipped_food)) for pet in self.team_2))
+
     def assess(self) -> Result:
         """
         Look at the current teams, and see the result of the battle
@@ -103,10 +164,85 @@ class Battle:
         return f"<Battle team_1={self.team_1}, team_2={self.team_2}, event_queue={self.event_queue}>"
 
 
+@dataclass
+class BattleOutcomes:
+    """How a number of battles between two teams turned out"""
+    team_1_wins: int = 0
+    team_2_wins: int = 0
+    draws: int = 0
+    looped: int = 0  # draws that were called because the battle would never end
+    rounds: Optional[List[int]] = None  # rounds taken by each battle, if asked for
+
+    @property
+    def battles(self) -> int:
+        return self.team_1_wins + self.team_2_wins + self.draws
+
+    def record(self, result: Result, rounds: int = 0, looped: bool = False):
+        if result is Result.TEAM_1_WINS:
+            self.team_1_wins += 1
+        elif result is Result.TEAM_2_WINS:
+            self.team_2_wins += 1
+        elif result is Result.DRAW:
+            self.draws += 1
+        else:
+            raise ValueError("Can't record an unfinished battle", result)
+
+        if looped:
+            self.looped += 1
+        if self.rounds is not None:
+            self.rounds.append(rounds)
+
+    def mirrored(self) -> "BattleOutcomes":
+        """The same battles, seen from the other team's side"""
+        return BattleOutcomes(team_1_wins=self.team_2_wins, team_2_wins=self.team_1_wins, draws=self.draws,
+                              looped=self.looped, rounds=None if self.rounds is None else list(self.rounds))
+
+    def merge(self, other: "BattleOutcomes") -> "BattleOutcomes":
+        """Add the battles of another tally to this one, e.g. to combine results from different workers"""
+        self.team_1_wins += other.team_1_wins
+        self.team_2_wins += other.team_2_wins
+        self.draws += other.draws
+        self.looped += other.looped
+        if self.rounds is not None and other.rounds is not None:
+            self.rounds.extend(other.rounds)
+        return self
+
+
+def _simulate(battle: Battle, team_1: List[Pet], team_2: List[Pet], samples: int,
+              record_rounds: bool) -> BattleOutcomes:
+    outcomes = BattleOutcomes(rounds=[] if record_rounds else None)
+    for _ in range(samples):
+        battle.reset(team_1, team_2)
+        outcomes.record(battle.battle(), battle.rounds, battle.looped)
+    return outcomes
+
+
+def simulate(team_1: List[Pet], team_2: List[Pet], samples: int = 1, record_rounds: bool = False,
+             random_gen: Optional[Random] = None) -> BattleOutcomes:
+    """
+    Battle the two teams against each other a number of times, and tally up the results. The teams aren't modified.
+
+    :param random_gen: used for every random choice in the battles, an unseeded one if not given. The pets' own
+        generators, e.g. that of the shop they were bought from, are never used, so simulating doesn't advance them
+    """
+    return _simulate(Battle([], [], Random() if random_gen is None else random_gen), team_1, team_2, samples, record_rounds)
+
+
+def simulate_pairs(pairs: Iterable[TeamPair], samples: int = 1, record_rounds: bool = False,
+                   random_gen: Optional[Random] = None) -> List[BattleOutcomes]:
+    """
+    Battle each pair of teams a number of times, giving the tally for each pair in the same order
+
+    :param random_gen: see simulate
+    """
+    battle = Battle([], [], Random() if random_gen is None else random_gen)
+    return [_simulate(battle, team_1, team_2, samples, record_rounds) for team_1, team_2 in pairs]
+
+
 if __name__ == "__main__":
     from pet_impl import *
     from tests.test_helpers import dummy_pet
-    logging.basicConfig(level=logging.DEBUG)
+    trace.enable()
 
     b = Battle(
         [
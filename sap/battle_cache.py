@@ -0,0 +1,71 @@
+"""
+Cache of battle outcomes, so the same fight is never simulated twice.
+"""
+from collections import OrderedDict
+from typing import List
+
+from sap.battle import BattleOutcomes, simulate
+from sap.encoding import EncodedTeamPair, encode_team
+from sap.estimator import is_deterministic
+from sap.pet import Pet
+
+DEFAULT_MAX_SIZE = 100000
+DEFAULT_SAMPLES = 100
+
+
+class BattleCache:
+    """
+    Least recently used cache of the outcomes of battles between two teams.
+
+    Teams are keyed by their encoding (species, power, toughness, experience and food of each pet), so equivalent
+    teams share an entry however they were built. Each entry is the tally of a number of simulated battles, i.e. a
+    distribution rather than a single result. Battles aren't symmetric, as team 1 goes first when pets tie, so A
+    against B and B against A are separate entries.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, samples: int = DEFAULT_SAMPLES):
+        """
+        :param max_size: number of entries to keep
+        :param samples: battles to simulate for a matchup that involves randomness
+        """
+        self.max_size = max_size
+        self.samples = samples
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[EncodedTeamPair, BattleOutcomes]" = OrderedDict()
+
+    def outcomes(self, team_1: List[Pet], team_2: List[Pet]) -> BattleOutcomes:
+        """
+        Outcomes of team 1 battling team 2, simulating them if they're not cached yet. The returned tally is shared
+        with the cache, so shouldn't be modified.
+        """
+        key = (encode_team(team_1), encode_team(team_2))
+        outcomes = self._entries.get(key)
+        if outcomes is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return outcomes
+
+        self.misses += 1
+        samples = 1 if is_deterministic(team_1, team_2) else self.samples
+        outcomes = simulate(team_1, team_2, samples=samples)
+        self._entries[key] = outcomes
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return outcomes
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"<BattleCache entries={len(self)}, hits={self.hits}, misses={self.misses}>"
@@ -0,0 +1,55 @@
+"""
+Compact encoding of teams, as tuples of integers.
+
+Pets carry a Random, an id and their food, which makes them slow to pickle and unhashable. An encoded team is just the
+species and stats of each pet, so it's cheap to send to another process, and can be used as a dictionary key.
+"""
+from random import Random
+from typing import List, Tuple, Optional
+
+from sap.pet import Pet, Food
+from sap.pet_impl import PET_TYPE_TO_ID, ID_TO_PET_INFO, FOOD_TYPE_TO_ID, ID_TO_FOOD_INFO
+
+# (species id, power, toughness, experience, equipped food id)
+EncodedPet = Tuple[int, int, int, int, int]
+EncodedTeam = Tuple[EncodedPet, ...]
+EncodedTeamPair = Tuple[EncodedTeam, EncodedTeam]
+
+NO_FOOD = FOOD_TYPE_TO_ID[None]
+
+
+def encode_pet(pet: Pet) -> EncodedPet:
+    pet_id = PET_TYPE_TO_ID.get(type(pet))
+    if pet_id is None:
+        raise ValueError("Can't encode a pet that isn't a known species", pet)
+    food_id = FOOD_TYPE_TO_ID[type(pet.equipped_food)] if pet.equipped_food else NO_FOOD
+    return pet_id, pet.power, pet.toughness, pet.experience, food_id
+
+
+def encode_team(pets: List[Pet]) -> EncodedTeam:
+    """Encode a team as it is at the start of a battle"""
+    return tuple(encode_pet(pet) for pet in pets)
+
+
+def create_food(food_id: int) -> Food:
+    food_type = ID_TO_FOOD_INFO[food_id].food_type
+    try:
+        return food_type.spawn()
+    except NotImplementedError:  # foods that only come from pets, like the scorpion's peanut
+        return food_type.create()
+
+
+def decode_pet(encoded_pet: EncodedPet, random_gen: Optional[Random] = None) -> Pet:
+    pet_id, power, toughness, experience, food_id = encoded_pet
+    pet = ID_TO_PET_INFO[pet_id].pet_type.spawn()
+    pet.power = power
+    pet.toughness = toughness
+    pet.experience = experience
+    pet.equipped_food = create_food(food_id) if food_id != NO_FOOD else None
+    if random_gen is not None:
+        pet.random_gen = random_gen
+    return pet
+
+
+def decode_team(encoded_team: EncodedTeam, random_gen: Optional[Random] = None) -> List[Pet]:
+    return [decode_pet(encoded_pet, random_gen) for encoded_pet in encoded_team]
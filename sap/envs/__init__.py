@@ -1 +1,2 @@
-from sap.envs.sap_random_versus_env import SapRandomVersusEnv0
\ No newline at end of file
+from sap.envs.sap_random_versus_env import SapRandomVersusEnv0
+from sap.envs.sap_random_versus_vec_env import SapRandomVersusVecEnv
@@ -1,7 +1,8 @@
 import abc
 import os
+from random import Random
 from enum import Enum
-from typing import Optional, Union, TypeVar, List, Tuple, Callable, Generator
+from typing import Optional, Union, TypeVar, List, Tuple, Callable
 
 import gym
 import numpy as np
@@ -12,6 +13,7 @@ import sap.game as game
 import sap.pet as pet
 import sap.pet_impl as pet_impl
 import sap.player as player
+import sap.seeding as seeding
 import sap.shop as shop
 from abc import ABC, abstractmethod
 
@@ -37,6 +39,23 @@ def get_action_mask(g: game.Game):
     return action_mask
 
 
+def get_legal_action_mask(g: game.Game, dimension: ActionSpaceDimension, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Mask over the flattened action space, i.e. over every (action, source, target) triple in row major order, which is
+    True only for the triples that are actually legal right now
+
+    :param out: flat bool array to write the mask into, rather than making a new one
+    """
+    if out is None:
+        out = np.zeros(int(np.prod(dimension)), dtype=bool)
+    else:
+        out[:] = False
+    mask = out.reshape(dimension)
+    for action, source, target in g.player_1.legal_actions():
+        mask[action.value, source, target] = True
+    return out
+
+
 class ActionValidator(ABC):
     @abstractmethod
     def apply(self, p1: player.Player) -> bool:
@@ -232,28 +251,177 @@ def player_observation(observed_game: game.Game):
     }
 
 
+def _add_leaves(space: spaces.Space, positions: List[int], block_sizes: List[int], offset: int) -> int:
+    """
+    Where each scalar of an observation goes when the space is flattened, and the size of its one hot block, or 0 if
+    it's written as is. Returns the offset after the space
+    """
+    if isinstance(space, spaces.Discrete):
+        positions.append(offset)
+        block_sizes.append(space.n)
+        return offset + space.n
+    if isinstance(space, (spaces.MultiDiscrete, spaces.MultiBinary)):
+        size = spaces.flatdim(space)
+        positions.extend(range(offset, offset + size))
+        block_sizes.extend([0] * size)
+        return offset + size
+    if isinstance(space, spaces.Tuple):
+        for subspace in space.spaces:
+            offset = _add_leaves(subspace, positions, block_sizes, offset)
+        return offset
+    if isinstance(space, spaces.Dict):
+        for subspace in space.spaces.values():
+            offset = _add_leaves(subspace, positions, block_sizes, offset)
+        return offset
+    raise NotImplementedError("Can't flatten space", space)
+
+
+def _pet_values(observed_pet: Optional[pet.Pet]) -> List[int]:
+    if observed_pet is None:
+        return [0] * 8
+    food = observed_pet.equipped_food
+    return [
+        pet_impl.PET_TYPE_TO_ID[type(observed_pet)],
+        observed_pet.power,
+        observed_pet.toughness,
+        observed_pet.temp_buff_power,
+        observed_pet.temp_buff_toughness,
+    ] + (food_observation(food) if food is not None else empty_food_observation())
+
+
+def _team_values(pets: List[Optional[pet.Pet]]) -> List[int]:
+    values = []
+    for team_pet in pets:
+        values += _pet_values(team_pet)
+    return values + [0] * (8 * (player.MAX_PETS - len(pets)))
+
+
+def _shop_pets_values(observed_shop: shop.Shop) -> List[int]:
+    values = []
+    for item in observed_shop.pets:
+        if item.spawned:
+            values += _pet_values(item.pet)
+        else:  # a new pet, which has no temporary buffs yet, and only the food it spawns with
+            values += [pet_impl.PET_TYPE_TO_ID[item.pet_type], item.power, item.toughness, 0, 0] + \
+                      food_observation(item.equipped_food)
+    return values + [0] * (8 * (shop.MAX_PETS - len(observed_shop.pets)))
+
+
+def _shop_food_values(observed_shop: shop.Shop) -> List[int]:
+    values = []
+    for item in observed_shop.food:
+        values += food_observation(item.food)
+    return values + [0] * (3 * (shop.MAX_FOOD - len(observed_shop.food)))
+
+
+# The scalars of each part of player_observation, in the order spaces.flatten takes them
+_OBSERVATION_VALUES = {
+    'pets': lambda g: _team_values(g.player_1.pets),
+    'gold': lambda g: [g.player_1.gold],
+    'lives': lambda g: [g.player_1.lives],
+    'wins': lambda g: [g.player_1.wins],
+    'won_last': lambda g: [1 if g.player_1.won_last else 0],
+    'shop_food': lambda g: _shop_food_values(g.player_1.shop),
+    'shop_frozen_food': lambda g: [int(item.frozen) for item in g.player_1.shop.food] +
+                                  [0] * (shop.MAX_FOOD - len(g.player_1.shop.food)),
+    'shop_pets': lambda g: _shop_pets_values(g.player_1.shop),
+    'shop_frozen_pets': lambda g: [int(item.frozen) for item in g.player_1.shop.pets] +
+                                  [0] * (shop.MAX_PETS - len(g.player_1.shop.pets)),
+    'other_team': lambda g: _team_values(g.player_2.pets),
+}
+
+
+class ObservationEncoder:
+    """
+    Writes observations into flat arrays, laid out the same as spaces.flatten(player_space(), player_observation(g)).
+    That builds the nested observation and concatenates an array per field, which takes most of the time of a step,
+    whereas this collects the scalars of the observation in one list and writes them all with one numpy assignment
+    """
+
+    def __init__(self, space: spaces.Dict):
+        positions: List[int] = []
+        block_sizes: List[int] = []
+        self.size = _add_leaves(space, positions, block_sizes, 0)
+        self.keys = list(space.spaces)
+        self.positions = np.array(positions, dtype=np.intp)
+        self.block_sizes = np.array(block_sizes, dtype=np.int64)
+        self.one_hot = self.block_sizes > 0
+        self.moduli = np.maximum(self.block_sizes, 1)
+
+    def values(self, g: game.Game) -> List[int]:
+        values = []
+        for key in self.keys:
+            values += _OBSERVATION_VALUES[key](g)
+        return values
+
+    def encode(self, g: game.Game) -> np.ndarray:
+        out = np.zeros((1, self.size), dtype=np.int64)
+        self.encode_into([g], out)
+        return out[0]
+
+    def encode_into(self, games: List[game.Game], out: np.ndarray):
+        """Write the observation of each game into the row of out with the same index"""
+        values = np.array([self.values(g) for g in games], dtype=np.int64)
+        # Like spaces.flatten, which sets onehot[value], a negative value counts from the end of its block
+        indices = self.positions + np.where(self.one_hot, values % self.moduli, 0)
+        out[:len(games)] = 0
+        out[np.arange(len(games))[:, np.newaxis], indices] = np.where(self.one_hot, 1, values)
+
+
 class SapRandomVersusEnv0(gym.Env):
     """Custom environment for having Super Auto Pets run in RL"""
     metadata = {'render.modes': ['human']}
 
-    def __init__(self):
+    def __init__(self, flat_actions: bool = False,
+                 opponent_factory: Callable[[int], player.Player] = game.create_random_player,
+                 lazy_shop: bool = False):
+        """
+        :param flat_actions: use a single Discrete action for each (action, source, target) triple, so that the action
+            mask can rule out exactly the illegal ones, rather than a MultiDiscrete masked per dimension
+        :param opponent_factory: makes the opponent for a game from a seed, e.g. sap.mcts_player.create_mcts_player for
+            a stronger one than the random player
+        :param lazy_shop: only spawn the agent's shop pets when they're bought, see sap.game.create_shop
+        """
         super(SapRandomVersusEnv0, self).__init__()
         self.action_space_dimension = (
             len(Action),  # action value
             max(shop.MAX_PETS, shop.MAX_FOOD, player.MAX_PETS),  # source index, used for shop (pets + food) and moving
             player.MAX_PETS,  # index of pet on my team
         )
-        self.action_space = spaces.MultiDiscrete(self.action_space_dimension)
+        self.flat_actions = flat_actions
+        self.opponent_factory = opponent_factory
+        self.lazy_shop = lazy_shop
+        if flat_actions:
+            self.action_space = spaces.Discrete(int(np.prod(self.action_space_dimension)))
+        else:
+            self.action_space = spaces.MultiDiscrete(self.action_space_dimension)
 
         self.real_observation_space = player_space()
         self.observation_space = spaces.flatten_space(self.real_observation_space)
+        self.encoder = ObservationEncoder(self.real_observation_space)
         self.game: Optional[game.Game] = None
         self.actions_this_turn = 0
-
-    def step(self, action: Tuple[int, int, int]):
+        self.random_gen = Random()  # seeds each game, see seed()
+
+    def seed(self, seed: Optional[int] = None) -> List[int]:
+        """Make the games from here on, and everything random in them, follow from the seed"""
+        if seed is None:
+            seed = seeding.new_seed()
+        self.random_gen = Random(seed)
+        return [seed]
+
+    def step(self, action: Union[int, Tuple[int, int, int]]):
+        reward, done = self.play(action)
+        # player_observation(self.game) would spawn every lazy shop pet, so it is left to whoever wants it
+        return self.encoder.encode(self.game), reward, done, {}
+
+    def play(self, action: Union[int, Tuple[int, int, int]]) -> Tuple[int, bool]:
+        """Take the action in the game, returning the reward and whether the game is over"""
         reward = 0
 
-        action_val, shop_index, pet_index = action
+        if self.flat_actions:
+            action = np.unravel_index(action, self.action_space_dimension)
+        action_val, shop_index, pet_index = (int(value) for value in action)
         action_enum: Action = Action.get_action(val=action_val)
 
         self.actions_this_turn += 1
@@ -270,46 +438,35 @@ class SapRandomVersusEnv0(gym.Env):
                 reward += player.STARTING_GOLD - self.game.player_1.gold  # reward for gold spent
                 p1.start_turn(self.game.round)
                 self.actions_this_turn = 0
-            elif action_enum is Action.REROLL:
-                p1.reroll()
-            elif action_enum is Action.BUY_AND_PLACE_PET:
-                p1.buy_and_place_pet(shop_index, pet_index)
-                reward += 1
-            elif action_enum is Action.BUY_AND_COMBINE_PET:
-                p1.buy_and_combine_pet(shop_index, pet_index)
-                reward += 1
-            elif action_enum is Action.BUY_FOOD_FOR_PET:
-                p1.buy_and_apply_food(shop_index, pet_index)
-                reward += 1
-            elif action_enum is Action.TOGGLE_FREEZE_PET:
-                p1.shop.toggle_freeze_pet(shop_index)
-            elif action_enum is Action.TOGGLE_FREEZE_FOOD:
-                p1.shop.toggle_freeze_food(shop_index)
-            elif action_enum is Action.SELL_PET:
-                p1.sell(pet_index)
-            elif action_enum is Action.MOVE_PET:
-                p1.move(shop_index, pet_index)
+            else:
+                p1.apply_action(player.TurnAction(action_enum.action_value), shop_index, pet_index)
+                if action_enum in (Action.BUY_AND_PLACE_PET, Action.BUY_AND_COMBINE_PET, Action.BUY_FOOD_FOR_PET):
+                    reward += 1
         except (ValueError, IndexError):
             pass  # ignore invalid actions
 
         done = (not self.game.player_1.has_lives()) or self.game.player_1.wins == 10
-        info = player_observation(self.game)
-        observation = spaces.flatten(self.real_observation_space, player_observation(self.game))
-        return observation, reward, done, info
+        return reward, done
 
-    def action_masks(self) -> List[bool]:
+    def action_masks(self) -> Union[List[bool], np.ndarray]:
+        if self.flat_actions:
+            return get_legal_action_mask(self.game, self.action_space_dimension)
         return get_action_mask(self.game)
 
     def reset(self):
+        self.new_game()
+        return self.encoder.encode(self.game)
+
+    def new_game(self):
+        game_seed = self.random_gen.getrandbits(64)
         self.game = game.Game(
-            EnvironmentPlayer(game.create_shop()),
-            game.create_random_player()
+            EnvironmentPlayer(game.create_shop(seeding.seeded_random(game_seed, 1, "shop"), lazy=self.lazy_shop)),
+            self.opponent_factory(seeding.derive_seed(game_seed, 2)),
+            seeding.seeded_random(game_seed, "battles")
         )
         self.game.start_round()
         self.game.player_1.start_turn(self.game.round)
 
-        return spaces.flatten(self.real_observation_space, player_observation(self.game))
-
     def render(self, mode='human'):
         print(self.game.player_1, self.game.player_2)
 
@@ -318,10 +475,10 @@ class SapRandomVersusEnv0(gym.Env):
 
 
 if __name__ == "__main__":
-    # TODO add VecEnv
     from stable_baselines3.common.env_checker import check_env
     from sb3_contrib import MaskablePPO
     from sb3_contrib.common.maskable.utils import get_action_masks
+    from sap.envs.sap_random_versus_vec_env import SapRandomVersusVecEnv
     import time
 
     start = time.time_ns()
@@ -333,12 +490,14 @@ if __name__ == "__main__":
     obs = env.reset()
     model_path = "model_saves/ppo_sap_random_versus.zip"
 
+    # Train on a batch of games at once, and play the single environment to see how it does
+    train_env = SapRandomVersusVecEnv(8)
     if os.path.exists(model_path):
         print("Loading model")
-        model = MaskablePPO.load(model_path, env)
+        model = MaskablePPO.load(model_path, train_env)
     else:
         print("Making new model")
-        model = MaskablePPO("MlpPolicy", env, verbose=1)
+        model = MaskablePPO("MlpPolicy", train_env, verbose=1)
 
     seconds_to_train = 8 * 60 * 60
     timesteps = int(seconds_to_train * 180)  # rough approximation
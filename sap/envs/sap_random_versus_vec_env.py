@@ -0,0 +1,143 @@
+"""
+Many games of SapRandomVersusEnv0 stepped together in one process, for training with a batch of games at a time.
+
+Actions come in as one array for all the games, and observations, rewards, dones and action masks go out as stacked
+arrays, written into buffers made once up front. Observations of all the games are encoded with a single numpy
+assignment (see ObservationEncoder). Games that finish are started again straight away, with the last observation of
+the finished game in the info under "terminal_observation", as stable_baselines3 expects.
+
+This is a stable_baselines3 VecEnv when stable_baselines3 is installed, so MaskablePPO uses it as it is, and asks it
+for the masks it worked out in the last step.
+"""
+from typing import Optional, List, Callable, Sequence, Union, Any, Dict
+
+import numpy as np
+
+import sap.game as game
+import sap.player as player
+import sap.seeding as seeding
+from sap.envs.sap_random_versus_env import SapRandomVersusEnv0, get_action_mask, get_legal_action_mask
+
+try:
+    from stable_baselines3.common.vec_env import VecEnv
+except ImportError:  # only needed for training, the games run without it
+    VecEnv = object
+
+Indices = Union[None, int, Sequence[int]]
+
+
+class SapRandomVersusVecEnv(VecEnv):
+    """A batch of SapRandomVersusEnv0 games, with the VecEnv interface"""
+    metadata = {'render.modes': ['human']}
+
+    def __init__(self, num_envs: int, flat_actions: bool = False,
+                 opponent_factory: Callable[[int], player.Player] = game.create_random_player,
+                 lazy_shop: bool = False):
+        """
+        :param num_envs: number of games
+        :param flat_actions: see SapRandomVersusEnv0, actions are then an array of num_envs indices rather than a
+            (num_envs, 3) array of (action, source, target)
+        :param opponent_factory: see SapRandomVersusEnv0
+        :param lazy_shop: see SapRandomVersusEnv0
+        """
+        if num_envs < 1:
+            raise ValueError("Need at least one game", num_envs)
+        self.envs = [SapRandomVersusEnv0(flat_actions, opponent_factory, lazy_shop) for _ in range(num_envs)]
+        # All VecEnv.__init__ does is set these three
+        self.num_envs = num_envs
+        self.observation_space = self.envs[0].observation_space
+        self.action_space = self.envs[0].action_space
+        self.flat_actions = flat_actions
+        self.action_space_dimension = self.envs[0].action_space_dimension
+        self.encoder = self.envs[0].encoder
+
+        self.observations = np.zeros((num_envs, self.encoder.size), dtype=np.int64)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        mask_size = np.prod(self.action_space_dimension) if flat_actions else sum(self.action_space_dimension)
+        self.masks = np.zeros((num_envs, int(mask_size)), dtype=bool)
+        self.actions: Optional[np.ndarray] = None
+
+    @property
+    def games(self) -> List[game.Game]:
+        return [env.game for env in self.envs]
+
+    def seed(self, seed: Optional[int] = None) -> List[int]:
+        """Make the games of each environment from here on follow from the seed, each with its own stream"""
+        if seed is None:
+            seed = seeding.new_seed()
+        return [env.seed(seeding.derive_seed(seed, i))[0] for i, env in enumerate(self.envs)]
+
+    def reset(self) -> np.ndarray:
+        for env in self.envs:
+            env.new_game()
+        self.encoder.encode_into(self.games, self.observations)
+        self._update_masks(range(self.num_envs))
+        # stable_baselines3 holds on to the last observation while taking the next step, so it can't be the buffer
+        return self.observations.copy()
+
+    def step_async(self, actions: np.ndarray):
+        self.actions = actions
+
+    def step_wait(self):
+        for i, (env, action) in enumerate(zip(self.envs, self.actions)):
+            self.rewards[i], self.dones[i] = env.play(action)
+        self.encoder.encode_into(self.games, self.observations)
+
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+        finished = np.flatnonzero(self.dones).tolist()
+        if finished:
+            for i in finished:
+                infos[i]["terminal_observation"] = self.observations[i].copy()
+                self.envs[i].new_game()
+            new_observations = np.zeros((len(finished), self.encoder.size), dtype=np.int64)
+            self.encoder.encode_into([self.envs[i].game for i in finished], new_observations)
+            self.observations[finished] = new_observations
+        self._update_masks(range(self.num_envs))
+        return self.observations.copy(), self.rewards.copy(), self.dones.copy(), infos
+
+    def step(self, actions: np.ndarray):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def _update_masks(self, indices: Sequence[int]):
+        for i in indices:
+            if self.flat_actions:
+                get_legal_action_mask(self.envs[i].game, self.action_space_dimension, out=self.masks[i])
+            else:
+                self.masks[i] = get_action_mask(self.envs[i].game)
+
+    def action_masks(self) -> np.ndarray:
+        """The mask of each game, as for SapRandomVersusEnv0.action_masks, stacked"""
+        return self.masks.copy()
+
+    def _get_indices(self, indices: Indices) -> Sequence[int]:
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
+
+    def get_attr(self, attr_name: str, indices: Indices = None) -> List[Any]:
+        return [getattr(self.envs[i], attr_name) for i in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices: Indices = None):
+        for i in self._get_indices(indices):
+            setattr(self.envs[i], attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices: Indices = None, **method_kwargs) -> List[Any]:
+        if method_name == "action_masks":
+            # How sb3_contrib gets the masks, which were already worked out in the last step
+            return [self.masks[i].copy() for i in self._get_indices(indices)]
+        return [getattr(self.envs[i], method_name)(*method_args, **method_kwargs) for i in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class: type, indices: Indices = None) -> List[bool]:
+        return [False for _ in self._get_indices(indices)]
+
+    def render(self, mode: str = 'human'):
+        for env in self.envs:
+            env.render(mode)
+
+    def close(self):
+        for env in self.envs:
+            env.close()
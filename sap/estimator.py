@@ -0,0 +1,77 @@
+"""
+Estimate how likely a team is to win a matchup, simulating only as many battles as needed.
+"""
+import math
+from dataclasses import dataclass
+from random import Random
+from statistics import NormalDist
+from typing import List, Optional, Tuple
+
+from sap.battle import BattleOutcomes, simulate
+from sap.pet import Pet
+
+
+@dataclass
+class WinEstimate:
+    """Estimated chance of team 1 winning, with a confidence interval around it"""
+    win_probability: float
+    lower: float
+    upper: float
+    outcomes: BattleOutcomes
+    deterministic: bool = False  # no pet makes random choices, so one battle tells us everything
+
+    @property
+    def samples(self) -> int:
+        return self.outcomes.battles
+
+
+def is_deterministic(team_1: List[Pet], team_2: List[Pet]) -> bool:
+    """Whether a battle between the teams always ends the same way"""
+    return not any(pet.uses_randomness for pet in team_1) and not any(pet.uses_randomness for pet in team_2)
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Wilson score interval for a success probability. Unlike the normal approximation it behaves sensibly for small
+    numbers of trials, and when every trial went the same way.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence must be between 0 and 1", confidence)
+    if trials < 0 or not 0 <= successes <= trials:
+        raise ValueError("Successes must be between 0 and the number of trials", successes, trials)
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+def estimate_win_probability(team_1: List[Pet], team_2: List[Pet], tolerance: float = 0.05,
+                             confidence: float = 0.95, max_samples: int = 10000, batch_size: int = 50,
+                             random_gen: Optional[Random] = None) -> WinEstimate:
+    """
+    Estimate the probability of team 1 beating team 2.
+
+    Battles are simulated in batches until the confidence interval on the win probability is within tolerance either
+    side of the estimate, or max_samples battles have been run. If no pet on either team uses randomness, a single
+    battle is enough.
+    """
+    if max_samples < 1:
+        raise ValueError("Need to run at least one battle", max_samples)
+    if batch_size < 1:
+        raise ValueError("Batches need at least one battle", batch_size)
+    if is_deterministic(team_1, team_2):
+        outcomes = simulate(team_1, team_2, samples=1)
+        win_probability = float(outcomes.team_1_wins)
+        return WinEstimate(win_probability, win_probability, win_probability, outcomes, deterministic=True)
+
+    outcomes = BattleOutcomes()
+    while True:
+        samples = min(batch_size, max_samples - outcomes.battles)
+        outcomes.merge(simulate(team_1, team_2, samples=samples, random_gen=random_gen))
+        lower, upper = wilson_interval(outcomes.team_1_wins, outcomes.battles, confidence)
+        if (upper - lower) / 2 <= tolerance or outcomes.battles >= max_samples:
+            return WinEstimate(outcomes.team_1_wins / outcomes.battles, lower, upper, outcomes)
@@ -1,16 +1,26 @@
 import logging
+from collections import deque
+from sap import trace
 from sap.pet import Trigger, TriggerType, Pet
-from typing import Iterable, List
+from typing import Iterable, List, Deque, Optional, Dict
 import math
+from random import Random
 from typing import Tuple, List
 
 Event = Tuple[Pet, Trigger]
 
 class EventQueue:
-    def __init__(self, team_1: List[Pet], team_2: List[Pet]):
+    def __init__(self, team_1: List[Pet], team_2: List[Pet], random_gen: Optional[Random] = None):
         self.team_1 = team_1
         self.team_2 = team_2
-        self.event_queue: List[Event] = []
+        # Pets summoned while resolving get this random generator, an unseeded one if it isn't given
+        self.random_gen = Random() if random_gen is None else random_gen
+        # Events are resolved first in, first out. A deque keeps that O(1) at the front, where a list would shift
+        # every remaining event on each pop
+        self.event_queue: Deque[Event] = deque()
+        self._resolve_order: Optional[List[Pet]] = None
+        self._subscribers: Dict[TriggerType, List[Pet]] = {}
+        self.resets = 0  # times the resolve order has been forgotten, e.g. as pets joined or left while resolving
 
     def append(self, event: Event):
         self.event_queue.append(event)
@@ -22,23 +32,43 @@ class EventQueue:
     def resolve_order(self) -> List[Pet]:
         """
         Events are resolved first by power, then toughness, then random. This is determined at the top of the
-        round
+        round, and kept until pets join or leave a team
         """
-        all_pets = self.team_1 + self.team_2
-        return sorted(all_pets, key=lambda pet: (pet.power, pet.toughness))
+        if self._resolve_order is None:
+            all_pets = self.team_1 + self.team_2
+            self._resolve_order = sorted(all_pets, key=lambda pet: (pet.power, pet.toughness))
+        return self._resolve_order
+
+    def reset_resolve_order(self):
+        """
+        Forget the resolve order, so it's worked out again on the next trigger. Needs to be called at the top of a
+        round, and whenever the teams change
+        """
+        self._resolve_order = None
+        self._subscribers = {}
+        self.resets += 1
+
+    def subscribers(self, trigger_type: TriggerType) -> List[Pet]:
+        """Pets that react to the given trigger type, in resolve order"""
+        subscribers = self._subscribers.get(trigger_type)
+        if subscribers is None:
+            subscribers = [pet for pet in self.resolve_order if pet.handles_trigger(trigger_type)]
+            self._subscribers[trigger_type] = subscribers
+        return subscribers
 
     def apply_trigger(self, trigger: Trigger):
-        for pet in self.resolve_order:
-            if pet in self.team_1 + self.team_2:
-                self.event_queue.append((pet, trigger))
+        self.event_queue.extend((pet, trigger) for pet in self.subscribers(trigger.type))
 
     def deal_damage(self, pet: Pet, damage: int, triggered_pet: Pet, poison:bool=False):
-        logging.debug(f"Dealing damage {pet} {damage}")
+        if trace.enabled:
+            logging.debug(f"Dealing damage {pet} {damage}")
         if pet.toughness <= 0:
-            logging.debug(f"Skipping damage {pet} {damage} since it's < 0")
+            if trace.enabled:
+                logging.debug(f"Skipping damage {pet} {damage} since it's < 0")
             return
         elif damage == 0:
-            logging.debug(f"Damage is 0 for {pet}, so skipping")
+            if trace.enabled:
+                logging.debug(f"Damage is 0 for {pet}, so skipping")
             return
 
         damage_taken = pet.take_damage(damage)
@@ -50,25 +80,31 @@ class EventQueue:
             self.apply_trigger(Trigger(TriggerType.PET_DAMAGED, pet))
 
     def resolve_events(self):
-        while self.event_queue:
-            triggered_pet, trigger = self.event_queue.pop(0)
+        event_queue = self.event_queue
+        while event_queue:
+            triggered_pet, trigger = event_queue.popleft()
 
             my_team = self.team_1 if triggered_pet in self.team_1 else self.team_2
             other_team = self.team_1 if my_team is self.team_2 else self.team_2
 
             if trigger.type is TriggerType.REMOVE_PET:
-                logging.debug(f"Removing pet {trigger.pet}")
+                if trace.enabled:
+                    logging.debug(f"Removing pet {trigger.pet}")
                 if trigger.pet in my_team:
                     my_team.remove(trigger.pet)
                 elif trigger.pet in other_team:
                     other_team.remove(trigger.pet)
+                self.reset_resolve_order()
             elif trigger.type is TriggerType.SUMMON_PET:
-                logging.debug(f"Summoning pet {trigger.pet} {trigger.summoned_pets}")
+                if trace.enabled:
+                    logging.debug(f"Summoning pet {trigger.pet} {trigger.summoned_pets}")
                 index = my_team.index(trigger.pet)
                 live_team_members = len([pet for pet in my_team if pet.toughness > 0])
                 for summoned_pet in trigger.summoned_pets:
                     if live_team_members <= 4:
+                        summoned_pet.random_gen = self.random_gen
                         my_team.insert(index, summoned_pet)
+                        self.reset_resolve_order()
                         self.apply_trigger(Trigger(TriggerType.PET_SUMMONED, summoned_pet))
                         live_team_members += 1
             elif trigger.type is TriggerType.DEAL_DAMAGE or trigger.type is TriggerType.DEAL_POISON_DAMAGE:
@@ -78,7 +114,8 @@ class EventQueue:
                     triggered_pet=triggered_pet,
                     poison=trigger.type == TriggerType.DEAL_POISON_DAMAGE)
             elif trigger.type is TriggerType.DEAL_DAMAGE_TO_ALL:
-                logging.debug(f"Dealing damage to all pets: {trigger.damage}")
+                if trace.enabled:
+                    logging.debug(f"Dealing damage to all pets: {trigger.damage}")
                 for pet in my_team + other_team:
                     self.deal_damage(pet, trigger.damage, triggered_pet)
             elif trigger.type is TriggerType.DEAL_DAMAGE_TO_FRONT:
@@ -88,14 +125,18 @@ class EventQueue:
                         break
             elif trigger.type is TriggerType.SUMMON_PET_OTHER_TEAM:
                 # mainly for rat, TODO if there's a cleaner way to do this
-                logging.debug(f"Summoning on other team {trigger.summoned_pets}")
+                if trace.enabled:
+                    logging.debug(f"Summoning on other team {trigger.summoned_pets}")
                 for pet in trigger.summoned_pets:
                     if len(other_team) <= 4:
+                        pet.random_gen = self.random_gen
                         other_team.append(pet)
+                self.reset_resolve_order()
 
             elif trigger.type is TriggerType.FAINT_PET:
                 # needed for whale and pill
-                logging.debug(f"Fainting pet {trigger.pet}")
+                if trace.enabled:
+                    logging.debug(f"Fainting pet {trigger.pet}")
                 if trigger.pet.toughness > 0:
                     # We want to set its toughness to 0, so it's ignored for e.g. damage
                     trigger.pet.toughness = 0
@@ -103,13 +144,17 @@ class EventQueue:
 
             elif trigger.type is TriggerType.REDUCE_HEALTH:
                 # needed for skunk
-                logging.debug(f"Reducing health {trigger.pet} {trigger.health_ratio}")
+                if trace.enabled:
+                    logging.debug(f"Reducing health {trigger.pet} {trigger.health_ratio}")
                 if trigger.pet.toughness > 0:
                     trigger.pet.toughness = math.floor(trigger.pet.toughness * (1 - trigger.health_ratio))
                     if trigger.pet.toughness == 0:
                         self.apply_trigger(Trigger(TriggerType.PET_FAINTED, trigger.pet))
 
             else:
-                self.event_queue.extend([
+                if triggered_pet.random_gen is None:
+                    # e.g. a pet put straight on a team, rather than bought from a shop
+                    triggered_pet.random_gen = self.random_gen
+                event_queue.extend(
                     (triggered_pet, new_trigger) for new_trigger
-                    in triggered_pet.apply_trigger(trigger, my_team, other_team)])
+                    in triggered_pet.apply_trigger(trigger, my_team, other_team))
@@ -1,18 +1,24 @@
 import logging
 from random import Random
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
+from sap import trace
 from sap.battle import Battle, Result
 from sap.pet import Pet
 from sap.pet_impl import PET_TIERS, FOOD_TIERS
 from sap.player import Player, RandomPlayer
+from sap.seeding import new_seed, derive_seed, seeded_random
 from sap.shop import Shop, TierShopGenerator
 
 
 class Game:
-    def __init__(self, player_1: Player, player_2: Player):
+    def __init__(self, player_1: Player, player_2: Player, random_gen: Optional[Random] = None):
+        """
+        :param random_gen: used by the pets for their random choices in battles
+        """
         self.player_1 = player_1
         self.player_2 = player_2
+        self.random_gen = Random() if random_gen is None else random_gen
         self.round = 0
 
     def buy_phase(self) -> Tuple[List[Pet], List[Pet]]:
@@ -21,7 +27,7 @@ class Game:
         return self.player_1.pets, self.player_2.pets
 
     def battle_phase(self) -> Result:
-        result = Battle(self.player_1.pets, self.player_2.pets).battle()
+        result = Battle(self.player_1.pets, self.player_2.pets, self.random_gen).battle()
         if result == Result.TEAM_1_WINS:
             self.player_1.trigger_win()
             self.player_2.trigger_loss(self.round)
@@ -38,34 +44,55 @@ class Game:
 
     def start_round(self):
         self.round += 1
-        logging.info(f"Starting round {self.round}")
+        if trace.enabled:
+            logging.info(f"Starting round {self.round}")
 
     def play_round(self) -> Result:
         self.start_round()
         self.buy_phase()
-        logging.info(f"Battle between {self.player_1} and {self.player_2}")
+        if trace.enabled:
+            logging.info(f"Battle between {self.player_1} and {self.player_2}")
         result = self.battle_phase()
-        logging.info(f"Result: {result}")
+        if trace.enabled:
+            logging.info(f"Result: {result}")
         return result
 
     def play_game(self) -> Result:
         last_result = Result.UNFINISHED
         while self.player_1.has_lives() and self.player_2.has_lives():
             last_result = self.play_round()
-        logging.info(f"Final result: {last_result}")
+        if trace.enabled:
+            logging.info(f"Final result: {last_result}")
         return last_result
 
 
-def create_shop():
-    return Shop(TierShopGenerator(PET_TIERS, FOOD_TIERS))
+def create_shop(random_gen: Optional[Random] = None, lazy: bool = False):
+    """
+    :param lazy: only spawn the shop's pets once something needs the pet itself, e.g. to buy it, see
+        sap.vector_shop.VectorShopGenerator
+    """
+    if lazy:
+        from sap.vector_shop import VectorShopGenerator  # needs numpy, which the rest of the game doesn't
+        return Shop(VectorShopGenerator(PET_TIERS, FOOD_TIERS, random_gen))
+    return Shop(TierShopGenerator(PET_TIERS, FOOD_TIERS, random_gen))
 
 
-def create_random_player():
-    return RandomPlayer(create_shop(), Random())
+def create_random_player(seed: Optional[int] = None):
+    return RandomPlayer(create_shop(seeded_random(seed, "shop")), seeded_random(seed, "player"))
+
+
+def create_game(seed: Optional[int] = None) -> Game:
+    """
+    Game between two random players, where every random choice follows from the seed
+    """
+    if seed is None:
+        seed = new_seed()
+    return Game(create_random_player(derive_seed(seed, 1)), create_random_player(derive_seed(seed, 2)),
+                seeded_random(seed, "battles"))
 
 
 if __name__ == "__main__":
-    logging.basicConfig(level=logging.DEBUG)
+    trace.enable()
     random_gen = Random()
     shop_generator = TierShopGenerator(PET_TIERS, FOOD_TIERS)
     for i in range(1):
@@ -0,0 +1,258 @@
+"""
+A player that plans its buy phase with Monte Carlo tree search.
+
+Before each action it searches over sequences of actions (buying, selling, placing, feeding, freezing, rerolling),
+applying them to itself with the undo journal and taking them back after each rollout, so nothing is copied. Buying at
+random finishes each sequence off, and the team it ends the turn with is scored by battling a few teams drawn from a
+pool of opponents. The undo journal also puts back the shop's random state, so a sequence always plays out the same
+way. The first action of the most visited sequence is then taken for real, and the search carries on from there.
+"""
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from random import Random
+from typing import List, Optional, Callable, Sequence, Dict
+
+from sap import trace
+from sap.battle import simulate_pairs, BattleOutcomes
+from sap.game import create_shop
+from sap.pet import Pet
+from sap.player import Player, RandomPlayer, TurnAction, LegalAction
+from sap.seeding import seeded_random
+from sap.shop import Shop
+
+# What rollouts do once they're out of the tree, as selling, moving or rerolling at random mostly makes things worse
+_BUYS = frozenset({TurnAction.BUY_AND_PLACE_PET, TurnAction.BUY_AND_COMBINE_PET, TurnAction.BUY_FOOD_FOR_PET})
+
+# Total power and toughness of a team that's as good as it needs to be, as far as the score is concerned
+_BIG_TEAM_STATS = 100
+
+# Teams to plan against for the given round
+OpponentPool = Callable[[int], Sequence[List[Pet]]]
+
+
+def random_opponent_teams(game_round: int, number: int, random_gen: Random) -> List[List[Pet]]:
+    """
+    Teams of random players that have bought in every round up to the given one, e.g. to plan against
+    """
+    teams = []
+    for _ in range(number):
+        opponent = RandomPlayer(create_shop(Random(random_gen.getrandbits(64))), Random(random_gen.getrandbits(64)))
+        for opponent_round in range(1, game_round + 1):
+            opponent.perform_buys(opponent_round)
+        teams.append(opponent.pets)
+    return teams
+
+
+@dataclass
+class SearchStats:
+    """How much searching was done, over one turn or several"""
+    rollouts: int = 0
+    seconds: float = 0
+
+    @property
+    def rollouts_per_second(self) -> float:
+        return self.rollouts / self.seconds if self.seconds else 0
+
+    def merge(self, other: "SearchStats") -> "SearchStats":
+        self.rollouts += other.rollouts
+        self.seconds += other.seconds
+        return self
+
+
+@dataclass
+class _Node:
+    action: Optional[LegalAction]  # action that led here, None for the root
+    children: List["_Node"] = field(default_factory=list)
+    untried: Optional[List[LegalAction]] = None  # actions not expanded yet, filled in on the first visit
+    visits: int = 0
+    value: float = 0  # sum of the scores of rollouts through here
+
+    @property
+    def ends_turn(self) -> bool:
+        return self.action is not None and self.action[0] is TurnAction.END_TURN
+
+
+class MCTSPlayer(Player):
+    def __init__(self, shop: Shop, random_gen: Random, rollouts: Optional[int] = 30,
+                 time_budget: Optional[float] = None, opponent_pool: Optional[OpponentPool] = None,
+                 opponents_per_rollout: int = 4, samples: int = 1, exploration: float = 0.7, max_depth: int = 8,
+                 stats_weight: float = 0.2):
+        """
+        :param random_gen: used for the search, i.e. the rollouts and battles, and for the default opponent pool
+        :param rollouts: rollouts to do before each action taken, or None for no limit
+        :param time_budget: seconds to search for in each turn, or None for no limit. Searching stops when either runs
+            out
+        :param opponent_pool: teams to score against for a round, by default those of random players
+        :param opponents_per_rollout: teams drawn from the pool to battle at the end of each rollout
+        :param samples: battles against each of those teams
+        :param exploration: UCT exploration constant, scores being between 0 and 1
+        :param max_depth: most actions to take in a turn, in the search and rollouts
+        :param stats_weight: share of the score given to the team's total power and toughness rather than battles won,
+            which tells apart teams that win or lose all the same battles, as often happens early on
+        """
+        super().__init__("MCTS Player", shop)
+        if rollouts is None and time_budget is None:
+            raise ValueError("Need a rollout or time budget for the search")
+        self.random = random_gen
+        self.rollouts = rollouts
+        self.time_budget = time_budget
+        self.opponent_pool = opponent_pool if opponent_pool is not None else self._random_opponent_pool
+        self.opponents_per_rollout = opponents_per_rollout
+        self.samples = samples
+        self.exploration = exploration
+        self.max_depth = max_depth
+        self.stats_weight = stats_weight
+        self.round = 0
+        self.last_search = SearchStats()
+        self.search_stats = SearchStats()  # over all turns
+        self._random_pools: Dict[int, List[List[Pet]]] = {}
+
+    def _random_opponent_pool(self, game_round: int) -> List[List[Pet]]:
+        if game_round not in self._random_pools:
+            self._random_pools = {game_round: random_opponent_teams(game_round, 16, self.random)}
+        return self._random_pools[game_round]
+
+    def start_turn(self, round: int):
+        self.round = round
+        super().start_turn(round)
+
+    def buy_phase(self):
+        # Take one action at a time, searching again before each, and keeping what was found under the action taken.
+        # With a time budget, each search gets half of what's left of the turn
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        root = _Node(action=None)
+        for _ in range(self.max_depth):
+            time_budget = None if deadline is None else (deadline - time.perf_counter()) / 2
+            root = self.search(root, self.rollouts, time_budget)
+            if not root.children:
+                break
+            root = max(root.children, key=lambda child: (child.visits, child.value))
+            if root.ends_turn:
+                break  # which perform_buys does
+            self.apply_action(*root.action)
+            root.action = None
+
+    def search(self, root: Optional[_Node] = None, rollouts: Optional[int] = None,
+               time_budget: Optional[float] = None) -> _Node:
+        """
+        Search from the current state, leaving the player as it was, and return the root of the tree
+
+        :param root: tree from an earlier search from this state, to carry on with
+        :param rollouts: rollouts to do, by default the player's budget
+        :param time_budget: seconds to search for, by default the player's budget
+        """
+        if root is None:
+            root = _Node(action=None)
+        if rollouts is None and time_budget is None:
+            rollouts, time_budget = self.rollouts, self.time_budget
+        opponents = self.opponent_pool(self.round)
+        done = 0
+        start = time.perf_counter()
+        deadline = None if time_budget is None else start + time_budget
+        while (rollouts is None or done < rollouts) and (deadline is None or time.perf_counter() < deadline):
+            self._rollout(root, opponents)
+            done += 1
+
+        self.last_search = SearchStats(rollouts=done, seconds=time.perf_counter() - start)
+        self.search_stats.merge(self.last_search)
+        if trace.enabled:
+            logging.info(f"{self.name} did {done} rollouts in round {self.round}, "
+                         f"{self.last_search.rollouts_per_second:.0f} per second")
+        return root
+
+    def _rollout(self, root: _Node, opponents: Sequence[List[Pet]]):
+        start_depth = len(self.journal)
+        try:
+            # Selection, going down the tree while every action from the node has been tried
+            node = root
+            path = [root]
+            while node.untried == [] and node.children and not node.ends_turn:
+                node = self._select(node)
+                self.apply_action(*node.action, journal=True)
+                path.append(node)
+
+            # Expansion of one new action
+            depth = len(path) - 1
+            if not node.ends_turn:
+                if node.untried is None:
+                    node.untried = self._search_actions(depth)
+                if node.untried:
+                    action = node.untried.pop(self.random.randrange(len(node.untried)))
+                    child = _Node(action=action)
+                    node.children.append(child)
+                    self.apply_action(*action, journal=True)
+                    path.append(child)
+                    node = child
+                    depth += 1
+
+            # Random actions to the end of the turn
+            if not node.ends_turn:
+                self._random_actions(depth)
+            score = self._score(opponents)
+        finally:
+            while len(self.journal) > start_depth:
+                self.undo()
+
+        for visited in path:
+            visited.visits += 1
+            visited.value += score
+
+    def _search_actions(self, depth: int) -> List[LegalAction]:
+        if depth >= self.max_depth:
+            return [(TurnAction.END_TURN, 0, 0)]
+        return list(self.legal_actions())
+
+    def _random_actions(self, depth: int):
+        """Finish the turn off by buying at random until the gold runs out, then end it"""
+        while depth < self.max_depth:
+            actions = [action for action in self.legal_actions() if action[0] in _BUYS]
+            if not actions:
+                break
+            self.apply_action(*actions[self.random.randrange(len(actions))], journal=True)
+            depth += 1
+        self.apply_action(TurnAction.END_TURN, journal=True)
+
+    def _select(self, node: _Node) -> _Node:
+        log_visits = math.log(node.visits)
+        return max(node.children, key=lambda child: child.value / child.visits +
+                   self.exploration * math.sqrt(log_visits / child.visits))
+
+    def _score(self, opponents: Sequence[List[Pet]]) -> float:
+        """
+        Share of battles won by the team as it is now, counting draws as half, mixed with how big the team is
+        """
+        team = [pet for pet in self.pets if pet is not None]
+        stats = min(sum(pet.power + pet.toughness for pet in team) / _BIG_TEAM_STATS, 1)
+        if not opponents:
+            return stats
+        drawn = [opponents[self.random.randrange(len(opponents))] for _ in range(self.opponents_per_rollout)]
+        outcomes = BattleOutcomes()
+        for pair_outcomes in simulate_pairs([(team, opponent) for opponent in drawn], self.samples,
+                                            random_gen=self.random):
+            outcomes.merge(pair_outcomes)
+        won = (outcomes.team_1_wins + 0.5 * outcomes.draws) / outcomes.battles
+        return (1 - self.stats_weight) * won + self.stats_weight * stats
+
+
+def create_mcts_player(seed: Optional[int] = None, **kwargs) -> MCTSPlayer:
+    """MCTS player with its own shop, where every random choice follows from the seed"""
+    return MCTSPlayer(create_shop(seeded_random(seed, "shop")), seeded_random(seed, "player"), **kwargs)
+
+
+if __name__ == "__main__":
+    from sap.game import Game, create_random_player
+    from sap.battle import Result
+
+    wins = 0
+    games = 10
+    stats = SearchStats()
+    for seed in range(games):
+        mcts_player = create_mcts_player(seed)
+        game = Game(mcts_player, create_random_player(seed + games), seeded_random(seed, "battles"))
+        if game.play_game() is Result.TEAM_1_WINS:
+            wins += 1
+        stats.merge(mcts_player.search_stats)
+        print(f"Game {seed}: {mcts_player.wins} wins, {mcts_player.lives} lives left")
+    print(f"Won {wins} of {games} games against random players, {stats.rollouts_per_second:.0f} rollouts per second")
@@ -0,0 +1,98 @@
+"""
+Run battles across a pool of processes.
+
+Battles are pure CPU work, so to use more than one core we shard them across worker processes. Teams are sent to the
+workers in their compact encoding (see sap.encoding), and every battle gets its own random stream seeded from the run's
+seed, so a run can be repeated given the same seed, however it's split into shards.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import List, Sequence, Tuple, Optional, Iterable
+
+from sap.battle import Battle, BattleOutcomes
+from sap.encoding import EncodedTeamPair, encode_team, decode_team
+from sap.pet import TeamPair
+from sap.seeding import new_seed, derive_seed
+
+# (encoded pairs, samples for each pair, whether to record rounds, seed of the run, (pair index, first sample) for each
+# pair)
+Shard = Tuple[List[EncodedTeamPair], List[int], bool, int, List[Tuple[int, int]]]
+
+DEFAULT_SHARD_SIZE = 256  # battles per shard
+_SAMPLE_BITS = 32  # of the seed of each battle, for the sample number under the seed of its pair
+
+
+def _run_shard(shard: Shard) -> List[BattleOutcomes]:
+    encoded_pairs, samples, record_rounds, seed, streams = shard
+    outcomes = []
+    for (team_1, team_2), pair_samples, (pair_index, first_sample) in zip(encoded_pairs, samples, streams):
+        team_1, team_2 = decode_team(team_1), decode_team(team_2)
+        pair_outcomes = BattleOutcomes(rounds=[] if record_rounds else None)
+        # Seeding with a string is slow, so that's only done once for the pair, and each battle reseeds the same
+        # Random from an integer
+        pair_seed = derive_seed(seed, pair_index) << _SAMPLE_BITS
+        random_gen = Random()
+        battle = Battle([], [], random_gen)
+        for sample in range(first_sample, first_sample + pair_samples):
+            random_gen.seed(pair_seed | sample)
+            battle.reset(team_1, team_2)
+            pair_outcomes.record(battle.battle(), battle.rounds, battle.looped)
+        outcomes.append(pair_outcomes)
+    return outcomes
+
+
+def make_shards(pairs: Sequence[EncodedTeamPair], samples: int, record_rounds: bool, seed: int,
+                shard_size: int) -> Tuple[List[Shard], List[int]]:
+    """
+    Split the battles into shards of about shard_size battles each. A pair with many samples can be split across
+    shards. Also returns which pair each result of the shards belongs to.
+    """
+    shards: List[Shard] = []
+    pair_indices: List[int] = []
+    shard_pairs, shard_samples, shard_streams, shard_battles = [], [], [], 0
+    for pair_index, pair in enumerate(pairs):
+        done = 0
+        while done < samples:
+            pair_samples = min(samples - done, shard_size - shard_battles)
+            shard_pairs.append(pair)
+            shard_samples.append(pair_samples)
+            shard_streams.append((pair_index, done))
+            pair_indices.append(pair_index)
+            shard_battles += pair_samples
+            done += pair_samples
+            if shard_battles == shard_size:
+                shards.append((shard_pairs, shard_samples, record_rounds, seed, shard_streams))
+                shard_pairs, shard_samples, shard_streams, shard_battles = [], [], [], 0
+    if shard_pairs:
+        shards.append((shard_pairs, shard_samples, record_rounds, seed, shard_streams))
+    return shards, pair_indices
+
+
+def simulate_pairs_parallel(pairs: Sequence[TeamPair], samples: int = 1, record_rounds: bool = False,
+                            processes: Optional[int] = None, seed: Optional[int] = None,
+                            shard_size: int = DEFAULT_SHARD_SIZE) -> List[BattleOutcomes]:
+    """
+    Like sap.battle.simulate_pairs, but spread over a pool of processes, one per core by default.
+
+    Results depend only on the seed, not on the number of processes or the shard size.
+    """
+    if seed is None:
+        seed = new_seed()
+    encoded_pairs = [(encode_team(team_1), encode_team(team_2)) for team_1, team_2 in pairs]
+    shards, pair_indices = make_shards(encoded_pairs, samples, record_rounds, seed, shard_size)
+
+    outcomes = [BattleOutcomes(rounds=[] if record_rounds else None) for _ in pairs]
+    if processes == 1:  # no need to pay for starting a pool
+        return _merge(map(_run_shard, shards), pair_indices, outcomes)
+
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as executor:
+        return _merge(executor.map(_run_shard, shards), pair_indices, outcomes)
+
+
+def _merge(shard_results: Iterable[List[BattleOutcomes]], pair_indices: List[int],
+           outcomes: List[BattleOutcomes]) -> List[BattleOutcomes]:
+    shard_outcomes = (outcome for shard_result in shard_results for outcome in shard_result)
+    for pair_index, outcome in zip(pair_indices, shard_outcomes):
+        outcomes[pair_index].merge(outcome)
+    return outcomes
@@ -1,9 +1,11 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 
 from enum import Enum, auto
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, ClassVar, FrozenSet, Type, TypeVar, Iterable, Union
 from random import Random
-import uuid
+import functools
+import itertools
+import os
 from abc import ABC, abstractmethod
 
 TeamPair = Tuple[List["Pet"], List["Pet"]]
@@ -12,6 +14,98 @@ TeamPair = Tuple[List["Pet"], List["Pet"]]
 MAX_POWER = 50
 MAX_TOUGHNESS = 50
 
+T = TypeVar("T")
+
+# Ids are a counter under the process id, so they're cheap to make and pets made in different worker processes don't
+# share them. The counter gets this many bits to itself
+_ID_COUNTER_BITS = 40
+
+
+def _reset_ids():
+    global _id_prefix, _id_counter
+    _id_prefix = os.getpid() << _ID_COUNTER_BITS
+    _id_counter = itertools.count()
+
+
+_reset_ids()
+if hasattr(os, "register_at_fork"):
+    # A forked worker would otherwise carry on with the parent's process id and counter
+    os.register_at_fork(after_in_child=_reset_ids)
+
+
+def generate_id() -> int:
+    """An id that's unique to the object within this run, across processes"""
+    return _id_prefix | next(_id_counter)
+
+
+def short_id(id: int) -> str:
+    """A few hex digits of the id, enough to tell objects apart when logging"""
+    return f"{id & 0xfff:03x}"
+
+
+def slotted(cls: Type[T]) -> Type[T]:
+    """
+    Recreate a dataclass with __slots__ for the fields it adds, so its instances have no __dict__, like
+    dataclass(slots=True) does from python 3.10. Subclasses need to declare __slots__ too, or they get a __dict__ back.
+    Methods using super() or __class__ are pointed at the new class, as dataclass does.
+    """
+    inherited = {name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())}
+    names = tuple(f.name for f in fields(cls) if f.name not in inherited)
+    cls_dict = {key: value for key, value in cls.__dict__.items()
+                if key not in names and key not in ("__dict__", "__weakref__")}
+    cls_dict["__slots__"] = names
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+    for member in cls_dict.values():
+        # Every method of a class body shares one __class__ cell, but a method may not use it, so try them all
+        if _update_class_cell(member, cls, slotted_cls):
+            break
+    return slotted_cls
+
+
+def _update_class_cell(member, old_cls: type, new_cls: type) -> bool:
+    """Point the __class__ cell of a method, which super() uses, at the new class. Returns whether it had one"""
+    if isinstance(member, (classmethod, staticmethod)):
+        member = member.__func__
+    if isinstance(member, property):
+        return any(_update_class_cell(accessor, old_cls, new_cls)
+                   for accessor in (member.fget, member.fset, member.fdel) if accessor is not None)
+    closure = getattr(member, "__closure__", None)
+    if not closure:
+        return False
+    for name, cell in zip(member.__code__.co_freevars, closure):
+        if name == "__class__" and cell.cell_contents is old_cls:
+            cell.cell_contents = new_cls
+            return True
+    return False
+
+
+@functools.lru_cache(maxsize=None)
+def slot_names(cls: type) -> Tuple[str, ...]:
+    """Every slot an instance of the class has, including those of its base classes"""
+    return tuple(name for base in reversed(cls.__mro__) for name in getattr(base, "__slots__", ()))
+
+
+def copy_slots(obj: T) -> T:
+    """Shallow copy of a slotted object, without going through __init__"""
+    copied = object.__new__(type(obj))
+    for name in slot_names(type(obj)):
+        setattr(copied, name, getattr(obj, name))
+    if hasattr(obj, "__dict__"):  # e.g. a subclass that didn't declare __slots__
+        copied.__dict__.update(obj.__dict__)
+    return copied
+
+
+def slot_values(obj) -> Tuple:
+    """Everything in the slots of a slotted object, to put back later with set_slot_values"""
+    return tuple(getattr(obj, name) for name in slot_names(type(obj)))
+
+
+def set_slot_values(obj, values: Tuple):
+    for name, value in zip(slot_names(type(obj)), values):
+        setattr(obj, name, value)
+
+
 class TriggerType(Enum):
     # PET TRIGGERS
     PET_FAINTED = auto()
@@ -43,6 +137,7 @@ class TriggerType(Enum):
     FORWARD_TRIGGER = auto()  # tiger
 
 
+@slotted
 @dataclass
 class Trigger:
     type: TriggerType
@@ -58,17 +153,23 @@ class Trigger:
     food: Optional["Food"] = None
 
 
+@slotted
 @dataclass
 class Food(ABC):
     symbol: str
     cost: int
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    random_gen: Random = Random()
+    id: int = field(default_factory=generate_id)
+    # Given by the shop, battle or event queue it's in, see random_for. Not part of what makes two equal
+    random_gen: Optional[Random] = field(default=None, compare=False, repr=False)
     power: int = 0
     toughness: int = 0
 
     def __repr__(self):
-        return f"<{self.symbol} ({self.id[:3]})>"
+        return f"<{self.symbol} ({short_id(self.id)})>"
+
+    def clone(self) -> "Food":
+        """Copy of the food with the same id"""
+        return copy_slots(self)
 
     def summoned_pets(self, pet: "Pet") -> List["Pet"]:
         return []
@@ -87,31 +188,35 @@ class Food(ABC):
 
 
 class EatableFood(Food, ABC):
-    power: int = 0
-    toughness: int = 0
+    __slots__ = ()
 
     def feed(self, pet: "Pet"):
         pet.buff(power=self.power, toughness=self.toughness)
 
 
 class SingleEatableFood(EatableFood, ABC):
+    __slots__ = ()
+
     def apply(self, player: "Player", pet: Optional["Pet"] = None):
         self.feed(pet)
         return [pet]
 
 
+@slotted
 @dataclass
 class RandomEatableFood(EatableFood, ABC):
     targets: int = 0
 
     def apply(self, player: "Player", pet: Optional["Pet"] = None):
-        pets = pick_unique_pets(player.pets, self.targets)
+        pets = pick_unique_pets(player.pets, self.targets, random_gen=random_for(self))
         for pet in pets:
             self.feed(pet)
         return pets
 
 
 class EquipableFood(Food):
+    __slots__ = ()
+
     def apply(self, player: "Player", pet: Optional["Pet"] = None):
         if pet is None:
             assert ValueError("Can't apply food to None pet")
@@ -125,43 +230,80 @@ class EquipableFood(Food):
         return damage
 
 
+def random_for(item: Union["Pet", Food]) -> Random:
+    """
+    The random generator for a pet or food to make a random choice with. There's no shared default, so that every
+    random choice follows from whatever seeded the shop or battle that gave it one
+    """
+    if item.random_gen is None:
+        raise ValueError("Making a random choice without a random generator, it needs one from a shop or battle", item)
+    return item.random_gen
+
+
 def pick_unique_pets(
         pets: List["Pet"],
         number: int,
-        exclusion: List["Pet"] = None,
+        exclusion: Optional[Iterable["Pet"]] = None,
         require_living: bool = True,
-        random_gen: Random = Random()) -> List["Pet"]:
-    if exclusion is None:
-        exclusion = []
+        *,
+        random_gen: Random) -> List["Pet"]:
+    """
+    Pick up to the given number of different pets at random, in the order picked, leaving the arguments as they are
+    """
+    excluded = {id(pet) for pet in exclusion} if exclusion else ()
+    candidates = [pet for pet in pets if id(pet) not in excluded and (pet.toughness > 0 or not require_living)]
 
     picks = []
-    if require_living:
-        exclusion += [pet for pet in pets if pet.toughness <= 0]
-    while len(picks) < number and (len(picks) + len(exclusion)) < len(pets):
-        picks.append(random_gen.choice([pet for pet in pets if pet not in exclusion + picks]))
+    while len(picks) < number and candidates:
+        # Swap the pick out for the last candidate, so each pick is constant time
+        index = random_gen.randrange(len(candidates))
+        picks.append(candidates[index])
+        candidates[index] = candidates[-1]
+        candidates.pop()
 
     return picks
 
 
+@slotted
 @dataclass
 class Pet:
     symbol: str
     power: int
     toughness: int
     experience: int = 0
-    random_gen: Random = Random()
-    id: str = field(default_factory=lambda: Pet.generate_id())
+    # Given by the shop, battle or event queue it's in, see random_for. Not part of what makes two equal
+    random_gen: Optional[Random] = field(default=None, compare=False, repr=False)
+    id: int = field(default_factory=generate_id)
     temp_buff_power: int = 0
     temp_buff_toughness: int = 0
     equipped_food: Optional[EquipableFood] = None
 
+    # Which trigger types _resolve_trigger reacts to, so the event queue only sends a pet the triggers it cares about
+    trigger_types: ClassVar[FrozenSet[TriggerType]] = frozenset()
+    # Whether any ability makes a random choice, so battles with only non-random pets need to be simulated just once
+    uses_randomness: ClassVar[bool] = False
+
+    def __post_init__(self):
+        """Set up any state an ability keeps, which subclasses declare in __slots__"""
+        pass
+
     @staticmethod
-    def generate_id() -> str:
-        return str(uuid.uuid4())
+    def generate_id() -> int:
+        return generate_id()
 
     def __repr__(self):
         food_str = str(self.equipped_food) if self.equipped_food else ""
-        return f"<{self.symbol}{food_str}: {self.power} / {self.toughness}  ({self.id[:3]})>"
+        return f"<{self.symbol}{food_str}: {self.power} / {self.toughness}  ({short_id(self.id)})>"
+
+    def clone(self) -> "Pet":
+        """
+        Copy of the pet with the same id, e.g. to battle with without changing the original. Ability state like the
+        fly's number of triggers is copied too, and the equipped food is cloned as it's the pet's own
+        """
+        cloned = copy_slots(self)
+        if self.equipped_food is not None:
+            cloned.equipped_food = self.equipped_food.clone()
+        return cloned
 
     def combine(self, other: "Pet"):
         if other.symbol != self.symbol:
@@ -199,6 +341,11 @@ class Pet:
         # Since this modifies the power directly, we can just reuse it to reset the bonuses
         self.temp_buff(power=-self.temp_buff_power, toughness=-self.temp_buff_toughness)
 
+    @classmethod
+    def handles_trigger(cls, trigger_type: TriggerType) -> bool:
+        # Every pet needs to hear about fainting, as apply_trigger deals with flies, food and removal itself
+        return trigger_type is TriggerType.PET_FAINTED or trigger_type in cls.trigger_types
+
     @property
     def level(self):
         if self.experience < 2:
@@ -232,13 +379,13 @@ class Pet:
         triggers.extend(self._resolve_trigger(trigger, my_team, other_team))
 
         # Handle spawning flies
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             summoned_pets = []
             # Zombie flies
             flies: List[Fly] = []
             if not isinstance(self, ZombieFly):  # can't spawn zombies from zombies, what brains would they eat?
                 for pet in my_team:
-                    if isinstance(pet, Fly) and pet.num_triggers and pet != self:
+                    if isinstance(pet, Fly) and pet.num_triggers and pet is not self:
                         flies.append(pet)
                         break
             for fly in flies:
@@ -275,7 +422,12 @@ class Pet:
 
 # Lives in pet to avoid circular imports. TODO: add a way to register triggers rather than inheritance?
 class Fly(Pet):
-    num_triggers: int = 3
+    __slots__ = ("num_triggers",)
+    trigger_types = frozenset({TriggerType.TURN_ENDED})
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.num_triggers: int = 3
 
     @classmethod
     def spawn(cls):
@@ -295,6 +447,8 @@ class Fly(Pet):
 
 
 class ZombieFly(Pet):
+    __slots__ = ()
+
     @classmethod
     def create(cls, power: int, toughness: int):
         return cls(power=power, toughness=toughness, symbol="🧟🪰")
@@ -1,15 +1,19 @@
 import math
 from operator import attrgetter
-from typing import List, Optional, Type, Tuple, Dict
+from typing import List, Optional, Type, Dict
 
 from sap.pet import Pet, Food, EquipableFood, Trigger, TriggerType, pick_unique_pets, Fly, SingleEatableFood, \
-    RandomEatableFood, EatableFood, ZombieFly
+    RandomEatableFood, EatableFood, ZombieFly, random_for
 from sap.player import Player
 from dataclasses import dataclass
 from sap.shop import MAX_TIER
 
 
 class Ant(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=1, symbol="🐜")
@@ -17,37 +21,44 @@ class Ant(Pet):
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
         """Ant adds a buff to a random pet: https://superauto.pet/pet/ant"""
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
-            for pet in pick_unique_pets(my_team, 1, [self], random_gen=self.random_gen):
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
+            for pet in pick_unique_pets(my_team, 1, [self], random_gen=random_for(self)):
                 pet.buff(power=self.level * 2, toughness=self.level)
 
         return []
 
 
 class Beaver(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_SOLD})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=2, symbol="🦫")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
-        if trigger.type == TriggerType.PET_SOLD and trigger.pet == self:
+        if trigger.type == TriggerType.PET_SOLD and trigger.pet is self:
             if trigger.player is None:
                 raise ValueError("Can't resolve sell events with no player")
-            for pet in pick_unique_pets(trigger.player.pets, 2, exclusion=[self], random_gen=self.random_gen):
+            for pet in pick_unique_pets(trigger.player.pets, 2, exclusion=[self], random_gen=random_for(self)):
                 pet.buff(toughness=self.level)
 
         return []
 
 
 class Pig(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_SOLD})
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=1, symbol="🐷")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
-        if trigger.type == TriggerType.PET_SOLD and trigger.pet == self:
+        if trigger.type == TriggerType.PET_SOLD and trigger.pet is self:
             if trigger.player is None:
                 raise ValueError("Can't resolve sell events with no player")
             trigger.player.gold += self.level
@@ -56,38 +67,48 @@ class Pig(Pet):
 
 
 class Otter(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_BOUGHT})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=1, symbol="🦦")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
-        if trigger.type == TriggerType.PET_BOUGHT and trigger.pet == self:
+        if trigger.type == TriggerType.PET_BOUGHT and trigger.pet is self:
             if trigger.player is None:
                 raise ValueError("Can't resolve sell events with no player")
-            for pet in pick_unique_pets(trigger.player.pets, 1, [self], random_gen=self.random_gen):
+            for pet in pick_unique_pets(trigger.player.pets, 1, [self], random_gen=random_for(self)):
                 pet.buff(power=self.level, toughness=self.level)
 
         return []
 
 
 class Duck(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_SOLD})
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=2, symbol="🦆")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
-        if trigger.type == TriggerType.PET_SOLD and trigger.pet == self:
+        if trigger.type == TriggerType.PET_SOLD and trigger.pet is self:
             if trigger.player is None or trigger.shop is None:
                 raise ValueError("Can't resolve sell events with no player or shop")
             for shop_pet in trigger.shop.pets:
-                shop_pet.pet.buff(toughness=self.level)
+                shop_pet.buff(toughness=self.level)
 
         return []
 
 
 class Cricket(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=2, symbol="🦗")
@@ -95,7 +116,7 @@ class Cricket(Pet):
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
         triggers = []
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             triggers.append(Trigger(TriggerType.SUMMON_PET, self,
                                     [ZombieCricket.create(power=self.level, toughness=self.level)]))
 
@@ -103,32 +124,42 @@ class Cricket(Pet):
 
 
 class Horse(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_SUMMONED})
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=1, symbol="🐎")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
-        if trigger.type == TriggerType.PET_SUMMONED and trigger.pet in my_team and trigger.pet != self:
+        if trigger.type == TriggerType.PET_SUMMONED and trigger.pet in my_team and trigger.pet is not self:
             trigger.pet.temp_buff(power=self.level)
         return []
 
 
 class Fish(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_LEVELED_UP})
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=3, symbol="🐟")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
-        if trigger.type == TriggerType.PET_LEVELED_UP and trigger.pet == self:
+        if trigger.type == TriggerType.PET_LEVELED_UP and trigger.pet is self:
             for pet in my_team:
-                if pet != self:
+                if pet is not self:
                     pet.buff(power=self.level - 1, toughness=self.level - 1)
         return []
 
 
 class Mosquito(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.BATTLE_STARTED})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=2, symbol="🦟")
@@ -137,21 +168,24 @@ class Mosquito(Pet):
             List[Trigger]:
         triggers = []
         if trigger.type == TriggerType.BATTLE_STARTED:
-            for pet in pick_unique_pets(other_team, 1, [], random_gen=self.random_gen):
+            for pet in pick_unique_pets(other_team, 1, [], random_gen=random_for(self)):
                 triggers.append(Trigger(TriggerType.DEAL_DAMAGE, pet, damage=self.level))
 
         return triggers
 
 
 class Crab(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_BOUGHT})
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=3, symbol="🦀")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
-        if trigger.type == TriggerType.PET_BOUGHT and trigger.pet == self:
-            max_health = sorted([pet.toughness for pet in my_team if pet != self], reverse=True)
+        if trigger.type == TriggerType.PET_BOUGHT and trigger.pet is self:
+            max_health = sorted([pet.toughness for pet in my_team if pet is not self], reverse=True)
             if max_health:
                 self.toughness = max_health[0]
 
@@ -159,6 +193,9 @@ class Crab(Pet):
 
 
 class Dodo(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.BATTLE_STARTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=3, symbol="🦤")
@@ -174,6 +211,9 @@ class Dodo(Pet):
 
 
 class Elephant(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.BEFORE_ATTACK})
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=5, symbol="🐘")
@@ -182,7 +222,7 @@ class Elephant(Pet):
             List[Trigger]:
         triggers = []
 
-        if trigger.type == TriggerType.BEFORE_ATTACK and trigger.pet == self:
+        if trigger.type == TriggerType.BEFORE_ATTACK and trigger.pet is self:
             position = my_team.index(self)
             for pet in my_team[position + 1: position + self.level + 1]:
                 triggers.append(Trigger(TriggerType.DEAL_DAMAGE, pet, damage=1))
@@ -191,13 +231,16 @@ class Elephant(Pet):
 
 
 class Flamingo(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=1, symbol="🦩")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             position = my_team.index(self)
             pets_boosted = 0
             for pet in my_team[position + 1:]:
@@ -212,6 +255,9 @@ class Flamingo(Pet):
 
 
 class Hedgehog(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=2, symbol="🦔")
@@ -220,26 +266,32 @@ class Hedgehog(Pet):
             List[Trigger]:
         triggers = []
 
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             triggers.append(Trigger(TriggerType.DEAL_DAMAGE_TO_ALL, self, damage=2 * self.level))
 
         return triggers
 
 
 class Peacock(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_DAMAGED})
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=5, symbol="🦚")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
-        if trigger.type == TriggerType.PET_DAMAGED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_DAMAGED and trigger.pet is self:
             self.buff(power=self.level * 2)
 
         return []
 
 
 class Rat(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=4, toughness=5, symbol="🐀")
@@ -247,7 +299,7 @@ class Rat(Pet):
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
         triggers = []
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             triggers.append(
                 Trigger(TriggerType.SUMMON_PET_OTHER_TEAM, None, summoned_pets=[DirtyRat.create(self.experience)]))
 
@@ -255,6 +307,10 @@ class Rat(Pet):
 
 
 class Shrimp(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_SOLD})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=3, symbol="🦐")
@@ -263,13 +319,17 @@ class Shrimp(Pet):
             List[Trigger]:
 
         if trigger.type == TriggerType.PET_SOLD:
-            for pet in pick_unique_pets(my_team, 1, [self], random_gen=self.random_gen):
+            for pet in pick_unique_pets(my_team, 1, [self], random_gen=random_for(self)):
                 pet.buff(toughness=self.level)
 
         return []
 
 
 class Spider(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=2, symbol="🕷️")
@@ -277,8 +337,8 @@ class Spider(Pet):
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
         triggers = []
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
-            summoned_pet = self.random_gen.choice(PET_TIERS[2]).spawn()
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
+            summoned_pet = random_for(self).choice(PET_TIERS[2]).spawn()
             summoned_pet.toughness = 2
             summoned_pet.power = 2
             summoned_pet.experience = self.experience
@@ -288,6 +348,8 @@ class Spider(Pet):
 
 
 class Swan(Pet):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=3, symbol="🦢")
@@ -298,14 +360,18 @@ class Swan(Pet):
 
 
 class Dog(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_SUMMONED})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=2, symbol="🐕")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
-        if trigger.type == TriggerType.PET_SUMMONED and trigger.pet in my_team and trigger.pet != self:
-            if self.random_gen.choice([True, False]):
+        if trigger.type == TriggerType.PET_SUMMONED and trigger.pet in my_team and trigger.pet is not self:
+            if random_for(self).choice([True, False]):
                 self.buff(power=self.level)
             else:
                 self.buff(toughness=self.level)
@@ -313,6 +379,9 @@ class Dog(Pet):
 
 
 class Badger(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=5, toughness=4, symbol="🦡")
@@ -320,7 +389,7 @@ class Badger(Pet):
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
         triggers = []
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             my_position = my_team.index(self)
             if my_position == 0:  # front, should attack other pet
                 for pet in other_team:
@@ -344,6 +413,10 @@ class Badger(Pet):
 
 
 class Blowfish(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_DAMAGED})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=5, symbol="🐡")
@@ -351,21 +424,24 @@ class Blowfish(Pet):
     def _resolve_trigger(self, trigger: Trigger, my_team: List["Pet"], other_team: Optional[List["Pet"]]) -> List[
         Trigger]:
         triggers = []
-        if trigger.type == TriggerType.PET_DAMAGED and trigger.pet == self:
-            for pet in pick_unique_pets(other_team, 1, [], random_gen=self.random_gen):
+        if trigger.type == TriggerType.PET_DAMAGED and trigger.pet is self:
+            for pet in pick_unique_pets(other_team, 1, [], random_gen=random_for(self)):
                 triggers.append(Trigger(TriggerType.DEAL_DAMAGE, pet, damage=self.level * 2))
 
         return triggers
 
 
 class Camel(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_DAMAGED})
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=5, symbol="🐪")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List["Pet"], other_team: Optional[List["Pet"]]) -> List[
         Trigger]:
-        if trigger.type == TriggerType.PET_DAMAGED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_DAMAGED and trigger.pet is self:
             my_position = my_team.index(self)
             for pet in my_team[my_position + 1:]:
                 if pet.toughness > 0:
@@ -376,6 +452,9 @@ class Camel(Pet):
 
 
 class Giraffe(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.TURN_ENDED})
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=5, symbol="🦒")
@@ -398,6 +477,9 @@ class Giraffe(Pet):
 
 
 class Kangaroo(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.AFTER_ATTACK})
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=2, symbol="🦘")
@@ -413,6 +495,9 @@ class Kangaroo(Pet):
 
 
 class Ox(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=4, symbol="🐂")
@@ -429,6 +514,9 @@ class Ox(Pet):
 
 
 class Rabbit(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_EATEN_SHOP_FOOD})
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=2, symbol="🐇")
@@ -443,6 +531,9 @@ class Rabbit(Pet):
 
 
 class Sheep(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=2, symbol="🐑")
@@ -450,7 +541,7 @@ class Sheep(Pet):
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
         triggers = []
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             triggers.append(Trigger(TriggerType.SUMMON_PET, self,
                                     [Ram.create(power=2 * self.level, toughness=2 * self.level),
                                      Ram.create(power=2 * self.level, toughness=2 * self.level)]))
@@ -459,18 +550,21 @@ class Sheep(Pet):
 
 
 class Snail(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_BOUGHT})
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=2, symbol="🐌")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
-        if trigger.type == TriggerType.PET_BOUGHT and trigger.pet == self:
+        if trigger.type == TriggerType.PET_BOUGHT and trigger.pet is self:
             if trigger.player is None:
                 raise ValueError("Can't resolve sell events with no player")
             if trigger.player.won_last is False:  # can be None
                 for pet in my_team:
-                    if pet == self:
+                    if pet is self:
                         continue
                     pet.buff(power=2 * self.level, toughness=self.level)
 
@@ -478,13 +572,16 @@ class Snail(Pet):
 
 
 class Turtle(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=2, symbol="🐢")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             my_position = my_team.index(self)
             if my_position != len(my_team) - 1:
                 my_team[my_position + 1].equipped_food = Melon.spawn()
@@ -493,7 +590,12 @@ class Turtle(Pet):
 
 
 class Whale(Pet):
-    swallowed_pet: Optional[Pet] = None
+    __slots__ = ("swallowed_pet",)
+    trigger_types = frozenset({TriggerType.BATTLE_STARTED, TriggerType.PET_FAINTED})
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.swallowed_pet: Optional[Pet] = None
 
     @classmethod
     def spawn(cls):
@@ -509,7 +611,7 @@ class Whale(Pet):
                     self.swallowed_pet = pet
                     triggers.append(Trigger(TriggerType.FAINT_PET, pet))
                     break
-        elif trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        elif trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             pets_to_summon = []
             if self.swallowed_pet:
                 pet_to_summon = self.swallowed_pet.__class__.spawn()
@@ -529,6 +631,9 @@ class Whale(Pet):
 
 
 class Bison(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.TURN_ENDED})
+
     @classmethod
     def spawn(cls):
         return cls(power=6, toughness=6, symbol="🦬")
@@ -537,7 +642,7 @@ class Bison(Pet):
         Trigger]:
 
         if trigger.type == TriggerType.TURN_ENDED:
-            level_three_in_team = any(pet for pet in my_team if pet != self and pet.level == 3)
+            level_three_in_team = any(pet for pet in my_team if pet is not self and pet.level == 3)
             if level_three_in_team:
                 self.buff(power=self.level * 2, toughness=self.level * 2)
 
@@ -545,6 +650,9 @@ class Bison(Pet):
 
 
 class Deer(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=1, symbol="🦌")
@@ -552,7 +660,7 @@ class Deer(Pet):
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
         triggers = []
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             triggers.append(Trigger(TriggerType.SUMMON_PET, self,
                                     [Bus.create(power=5 * self.level, toughness=5 * self.level)]))
 
@@ -560,6 +668,8 @@ class Deer(Pet):
 
 
 class Squirrel(Pet):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=2, symbol="🐿️")
@@ -570,19 +680,25 @@ class Squirrel(Pet):
 
 
 class Worm(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_EATEN_SHOP_FOOD})
+
     @classmethod
     def spawn(cls):
         return cls(power=2, toughness=2, symbol="🪱")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List["Pet"], other_team: Optional[List["Pet"]]) -> List[
         Trigger]:
-        if trigger.type == TriggerType.PET_EATEN_SHOP_FOOD and trigger.pet == self:
+        if trigger.type == TriggerType.PET_EATEN_SHOP_FOOD and trigger.pet is self:
             self.buff(power=self.level, toughness=self.level)
 
         return []
 
 
 class Dolphin(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.BATTLE_STARTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=4, toughness=6, symbol="🐬")
@@ -600,19 +716,25 @@ class Dolphin(Pet):
 
 
 class Hippo(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_KNOCKED_OUT_BY})
+
     @classmethod
     def spawn(cls):
         return cls(power=4, toughness=4, symbol="🦛")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
-        if trigger.type == TriggerType.PET_KNOCKED_OUT_BY and trigger.pet == self:
+        if trigger.type == TriggerType.PET_KNOCKED_OUT_BY and trigger.pet is self:
             self.buff(power=self.level * 2, toughness=self.level * 2)
 
         return []
 
 
 class Penguin(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.TURN_ENDED})
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=2, symbol="🐧")
@@ -621,13 +743,16 @@ class Penguin(Pet):
             List[Trigger]:
         if trigger.type == TriggerType.TURN_ENDED:
             for pet in my_team:
-                if pet != self and pet.level >= 2:
+                if pet is not self and pet.level >= 2:
                     pet.buff(power=self.level, toughness=self.level)
 
         return []
 
 
 class Rooster(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=5, toughness=3, symbol="🐓")
@@ -635,7 +760,7 @@ class Rooster(Pet):
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
         triggers = []
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             summoned_pets = []
             for _ in range(self.level):
                 summoned_pets.append(Chick.create(power=self.power // 2))
@@ -645,6 +770,9 @@ class Rooster(Pet):
 
 
 class Skunk(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.BATTLE_STARTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=4, toughness=6, symbol="🦨")
@@ -668,6 +796,9 @@ class Skunk(Pet):
 
 
 class Monkey(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.TURN_ENDED})
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=2, symbol="🐒")
@@ -681,13 +812,16 @@ class Monkey(Pet):
 
 
 class Cow(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_BOUGHT})
+
     @classmethod
     def spawn(cls):
         return cls(power=4, toughness=6, symbol="🐄")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
-        if trigger.type == TriggerType.PET_BOUGHT and trigger.pet == self:
+        if trigger.type == TriggerType.PET_BOUGHT and trigger.pet is self:
             trigger.player.shop.replace_shop([
                 Milk.create(power=self.level, toughness=2 * self.level),
                 Milk.create(power=self.level, toughness=2 * self.level)
@@ -696,6 +830,9 @@ class Cow(Pet):
 
 
 class Crocodile(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.BATTLE_STARTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=8, toughness=4, symbol="🐊")
@@ -713,6 +850,9 @@ class Crocodile(Pet):
 
 
 class Rhino(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_KNOCKED_OUT_BY})
+
     @classmethod
     def spawn(cls):
         return cls(power=5, toughness=8, symbol="🦏")
@@ -720,7 +860,7 @@ class Rhino(Pet):
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
         triggers = []
-        if trigger.type == TriggerType.PET_KNOCKED_OUT_BY and trigger.pet == self and self.toughness > 0:
+        if trigger.type == TriggerType.PET_KNOCKED_OUT_BY and trigger.pet is self and self.toughness > 0:
             for pet in other_team:
                 if pet.toughness > 0:
                     triggers.append(Trigger(TriggerType.DEAL_DAMAGE_TO_FRONT, None, damage=self.level * 4, index=0))
@@ -730,26 +870,35 @@ class Rhino(Pet):
 
 
 class Scorpion(Pet):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(power=1, toughness=1, symbol="🦂", equipped_food=Peanut.create())
 
 
 class Seal(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_EATEN_SHOP_FOOD})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=8, symbol="🦭")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List["Pet"], other_team: Optional[List["Pet"]]) -> List[
         Trigger]:
-        if trigger.type == TriggerType.PET_EATEN_SHOP_FOOD and trigger.pet == self:
-            for pet in pick_unique_pets(my_team, 2, [self]):
+        if trigger.type == TriggerType.PET_EATEN_SHOP_FOOD and trigger.pet is self:
+            for pet in pick_unique_pets(my_team, 2, [self], random_gen=random_for(self)):
                 pet.buff(power=self.level, toughness=self.level)
 
         return []
 
 
 class Shark(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=4, toughness=4, symbol="🦈")
@@ -762,31 +911,40 @@ class Shark(Pet):
 
 
 class Turkey(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_SUMMONED})
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=4, symbol="🦃")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
-        if trigger.type == TriggerType.PET_SUMMONED and trigger.pet in my_team and trigger.pet != self:
+        if trigger.type == TriggerType.PET_SUMMONED and trigger.pet in my_team and trigger.pet is not self:
             trigger.pet.buff(power=self.level * 3, toughness=self.level * 3)
         return []
 
 
 class Boar(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.BEFORE_ATTACK})
+
     @classmethod
     def spawn(cls):
         return cls(power=8, toughness=6, symbol="🐗")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> \
             List[Trigger]:
-        if trigger.type == TriggerType.BEFORE_ATTACK and trigger.pet == self:
+        if trigger.type == TriggerType.BEFORE_ATTACK and trigger.pet is self:
             self.buff(power=2 * self.level, toughness=2 * self.level)
 
         return []
 
 
 class Cat(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_EATEN_SHOP_FOOD})
+
     @classmethod
     def spawn(cls):
         return cls(power=4, toughness=5, symbol="🐱")
@@ -802,6 +960,9 @@ class Cat(Pet):
 
 
 class Dragon(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_BOUGHT})
+
     @classmethod
     def spawn(cls):
         return cls(power=6, toughness=8, symbol="🐉")
@@ -816,7 +977,12 @@ class Dragon(Pet):
 
 
 class Gorilla(Pet):
-    num_triggers: int = 1
+    __slots__ = ("num_triggers",)
+    trigger_types = frozenset({TriggerType.TURN_ENDED, TriggerType.PET_DAMAGED})
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.num_triggers: int = 1
 
     @classmethod
     def spawn(cls):
@@ -830,7 +996,7 @@ class Gorilla(Pet):
         Trigger]:
         if trigger.type == TriggerType.TURN_ENDED:
             self.num_triggers = 1
-        elif trigger.type == TriggerType.PET_DAMAGED and trigger.pet == self and self.num_triggers:
+        elif trigger.type == TriggerType.PET_DAMAGED and trigger.pet is self and self.num_triggers:
             self.num_triggers = 0
             self.equipped_food = Coconut.create()
 
@@ -838,6 +1004,10 @@ class Gorilla(Pet):
 
 
 class Leopard(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.BATTLE_STARTED})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=10, toughness=4, symbol="🐆")
@@ -846,28 +1016,35 @@ class Leopard(Pet):
             List[Trigger]:
         triggers = []
         if trigger.type == TriggerType.BATTLE_STARTED:
-            for pet in pick_unique_pets(other_team, self.level, [], random_gen=self.random_gen):
+            for pet in pick_unique_pets(other_team, self.level, [], random_gen=random_for(self)):
                 triggers.append(Trigger(TriggerType.DEAL_DAMAGE, pet, damage=math.floor(0.5 * self.power)))
 
         return triggers
 
 
 class Mammoth(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.PET_FAINTED})
+
     @classmethod
     def spawn(cls):
         return cls(power=3, toughness=10, symbol="🦣")
 
     def _resolve_trigger(self, trigger: Trigger, my_team: List[Pet], other_team: List[Pet]) -> List[
         Trigger]:
-        if trigger.type == TriggerType.PET_FAINTED and trigger.pet == self:
+        if trigger.type == TriggerType.PET_FAINTED and trigger.pet is self:
             for pet in my_team:
-                if pet.toughness > 0 and pet != self:
+                if pet.toughness > 0 and pet is not self:
                     pet.buff(power=self.level * 2, toughness=self.level * 2)
 
         return []
 
 
 class Snake(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.AFTER_ATTACK})
+    uses_randomness = True
+
     @classmethod
     def spawn(cls):
         return cls(power=6, toughness=6, symbol="🐍")
@@ -877,14 +1054,19 @@ class Snake(Pet):
         triggers = []
         if trigger.type == TriggerType.AFTER_ATTACK and trigger.pet in my_team:
             if my_team.index(trigger.pet) == my_team.index(self) - 1:
-                for pet in pick_unique_pets(other_team, 1, [], random_gen=self.random_gen):
+                for pet in pick_unique_pets(other_team, 1, [], random_gen=random_for(self)):
                     triggers.append(Trigger(TriggerType.DEAL_DAMAGE, pet, damage=5 * self.level))
 
         return triggers
 
 
 class Tiger(Pet):
-    in_battle: bool = False
+    __slots__ = ("in_battle",)
+    trigger_types = frozenset(TriggerType)  # anything can be passed on to the pet in front
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.in_battle: bool = False
 
     @classmethod
     def spawn(cls):
@@ -915,6 +1097,8 @@ class Tiger(Pet):
 # ---------------------------------------------------------------------------------------------------------------------
 
 class ZombieCricket(Pet):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls.create(power=1, toughness=1)
@@ -925,6 +1109,9 @@ class ZombieCricket(Pet):
 
 
 class DirtyRat(Pet):
+    __slots__ = ()
+    trigger_types = frozenset({TriggerType.AFTER_ATTACK})
+
     @classmethod
     def spawn(cls):
         return cls.create(experience=0)
@@ -944,6 +1131,8 @@ class DirtyRat(Pet):
 
 
 class Ram(Pet):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls.create(power=2, toughness=2)
@@ -954,6 +1143,8 @@ class Ram(Pet):
 
 
 class Chick(Pet):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls.create(power=1)
@@ -964,6 +1155,8 @@ class Chick(Pet):
 
 
 class Bee(Pet):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls.create()
@@ -974,6 +1167,8 @@ class Bee(Pet):
 
 
 class Bus(Pet):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls.create(power=5, toughness=5)
@@ -985,12 +1180,16 @@ class Bus(Pet):
 
 # Food
 class Apple(SingleEatableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🍎", cost=3, power=1, toughness=1)
 
 
 class Cupcake(SingleEatableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🧁", cost=3, power=3, toughness=3)
@@ -1000,6 +1199,8 @@ class Cupcake(SingleEatableFood):
 
 
 class Honey(EquipableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🍯", cost=3)
@@ -1009,6 +1210,8 @@ class Honey(EquipableFood):
 
 
 class MeatBone(EquipableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🍖", cost=3)
@@ -1019,6 +1222,8 @@ class MeatBone(EquipableFood):
 
 
 class SleepingPill(Food):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="💊", cost=1)
@@ -1029,6 +1234,8 @@ class SleepingPill(Food):
 
 
 class Garlic(EquipableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🧄", cost=3)
@@ -1038,18 +1245,24 @@ class Garlic(EquipableFood):
 
 
 class SaladBowl(RandomEatableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🥗", cost=3, power=1, toughness=1, targets=2)
 
 
 class Pear(SingleEatableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🍐", cost=3, power=2, toughness=2)
 
 
 class CannedFood(Food):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🥫", cost=3)
@@ -1060,6 +1273,8 @@ class CannedFood(Food):
 
 
 class Chili(EquipableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🌶️", cost=3)
@@ -1071,6 +1286,8 @@ class Chili(EquipableFood):
 
 
 class Chocolate(Food):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🍫", cost=3)
@@ -1081,12 +1298,16 @@ class Chocolate(Food):
 
 
 class Sushi(RandomEatableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🍣", cost=3, power=1, toughness=1, targets=3)
 
 
 class Melon(EquipableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🍈", cost=3)
@@ -1097,12 +1318,16 @@ class Melon(EquipableFood):
 
 
 class Pizza(RandomEatableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🍕", cost=3, targets=2, power=2, toughness=2)
 
 
 class Steak(EquipableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🥩", cost=3)
@@ -1114,6 +1339,8 @@ class Steak(EquipableFood):
 
 
 class Mushroom(EquipableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         return cls(symbol="🍄", cost=3)
@@ -1127,6 +1354,8 @@ class Mushroom(EquipableFood):
 
 
 class Milk(SingleEatableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         raise NotImplementedError("Cannot spawn milk without specifying how powerful it is")
@@ -1137,6 +1366,8 @@ class Milk(SingleEatableFood):
 
 
 class Peanut(EquipableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         raise NotImplementedError("Cannot spawn milk without specifying how powerful it is")
@@ -1152,6 +1383,8 @@ class Peanut(EquipableFood):
 
 
 class Coconut(EquipableFood):
+    __slots__ = ()
+
     @classmethod
     def spawn(cls):
         raise NotImplementedError("Cannot spawn milk without specifying how powerful it is")
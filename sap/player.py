@@ -1,12 +1,14 @@
 import logging
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from enum import Enum
 from random import Random
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from sap import trace
 from sap.event_queue import EventQueue
-from sap.pet import Pet, Trigger, TriggerType, Food
-from sap.shop import Shop
+from sap.pet import Pet, Trigger, TriggerType, Food, slot_values, set_slot_values
+from sap.shop import Shop, ShopCheckpoint
 
 PET_COST = 3
 REROLL_COST = 1
@@ -14,6 +16,32 @@ MAX_PETS = 5
 STARTING_GOLD = 10
 
 
+class TurnAction(Enum):
+    """Everything a player can do in their turn, numbered as in the environment's action space"""
+    REROLL = 0
+    BUY_AND_PLACE_PET = 1
+    BUY_AND_COMBINE_PET = 2
+    BUY_FOOD_FOR_PET = 3
+    TOGGLE_FREEZE_PET = 4
+    TOGGLE_FREEZE_FOOD = 5
+    SELL_PET = 6
+    MOVE_PET = 7
+    END_TURN = 8
+
+
+# An action along with its source index (shop position, or pet being moved) and target index (pet position)
+LegalAction = Tuple[TurnAction, int, int]
+
+
+@dataclass
+class PlayerCheckpoint:
+    """What a player and their shop were like before an action, see Player.checkpoint"""
+    gold: int
+    pets: List[Tuple[Optional[Pet], Optional[Tuple]]]
+    random_states: List[Tuple[Random, Tuple]]
+    shop: ShopCheckpoint
+
+
 class Player(ABC):
     def __init__(self, name: str, shop: Shop, pets: List[Optional[Pet]] = None):
         self.name = name
@@ -27,6 +55,11 @@ class Player(ABC):
         self.lives = 10
         self.wins = 0
         self.won_last: Optional[bool] = None
+        self._event_queue: Optional[EventQueue] = None
+        self._event_queue_state: Optional[Tuple] = None
+        self._legal_actions_state: Optional[Tuple] = None
+        self._legal_actions: List[LegalAction] = []
+        self.journal: List[PlayerCheckpoint] = []  # undo log of the actions applied with journal=True
 
     def start_turn(self, round: int):
         self.gold = STARTING_GOLD
@@ -120,12 +153,15 @@ class Player(ABC):
         self.place_pet(pet, target)
 
     def _apply_food(self, food: Food, target_position: int):
+        if food.random_gen is None:  # food that didn't come from the shop picks at random like the shop's does
+            food.random_gen = self.shop.generator.random
         pets_who_ate = food.apply(self, self.pets[target_position])
         for pet in pets_who_ate:
             self.apply_trigger(Trigger(TriggerType.PET_EATEN_SHOP_FOOD, pet, food=food))
 
     def buy_and_apply_food(self, shop_position: int, target_position: int):
-        logging.debug(f"Buying food {self.shop.food[shop_position]} {self.pets[target_position]}")
+        if trace.enabled:
+            logging.debug(f"Buying food {self.shop.food[shop_position]} {self.pets[target_position]}")
         if self.gold < self.shop.food[shop_position].food.cost:
             raise ValueError("Not enough gold to buy food", self)
         food = self.shop.buy_food(shop_position)
@@ -198,15 +234,181 @@ class Player(ABC):
         self.gold += 1
         return sold_pet
 
+    def _action_state(self) -> Tuple:
+        return self.gold, tuple(self.pets), tuple(self.shop.pets), tuple(self.shop.food)
+
+    def _same_action_state(self, state: Tuple) -> bool:
+        # Compared by identity, as pets are only equal if they're the same pet. Holding on to the objects in the state
+        # also means their ids can't be reused by new pets while it's cached
+        old_state = self._legal_actions_state
+        if old_state is None or old_state[0] != state[0]:
+            return False
+        return all(len(old) == len(new) and all(a is b for a, b in zip(old, new))
+                   for old, new in zip(old_state[1:], state[1:]))
+
+    def legal_actions(self) -> List[LegalAction]:
+        """
+        Every action that can be taken right now, each listed once. Indices an action doesn't use are 0, placing or
+        moving a pet past the end of the team is listed only as the last position, as that's where it ends up anyway,
+        and moving a pet to where it already is isn't listed. The list is cached until the gold, pets or shop change,
+        so don't modify it
+        """
+        state = self._action_state()
+        if not self._same_action_state(state):
+            self._legal_actions = self._find_legal_actions()
+            self._legal_actions_state = state
+        return self._legal_actions
+
+    def _find_legal_actions(self) -> List[LegalAction]:
+        actions: List[LegalAction] = []
+        shop_pets = self.shop.pets
+        shop_food = self.shop.food
+        pet_positions = [i for i, pet in enumerate(self.pets) if pet is not None]
+
+        if self.can_reroll():
+            actions.append((TurnAction.REROLL, 0, 0))
+        if self.can_buy_pet():
+            if self.num_pets() < MAX_PETS:
+                actions.extend((TurnAction.BUY_AND_PLACE_PET, shop_index, target)
+                               for shop_index in range(len(shop_pets))
+                               for target in range(min(len(self.pets), MAX_PETS - 1) + 1))
+            actions.extend((TurnAction.BUY_AND_COMBINE_PET, shop_index, target)
+                           for shop_index, shop_pet in enumerate(shop_pets)
+                           for target in pet_positions
+                           if shop_pet.symbol == self.pets[target].symbol)
+        actions.extend((TurnAction.BUY_FOOD_FOR_PET, shop_index, target)
+                       for shop_index, shop_item in enumerate(shop_food)
+                       if self.gold >= shop_item.food.cost
+                       for target in pet_positions)
+        actions.extend((TurnAction.TOGGLE_FREEZE_PET, shop_index, 0) for shop_index in range(len(shop_pets)))
+        actions.extend((TurnAction.TOGGLE_FREEZE_FOOD, shop_index, 0) for shop_index in range(len(shop_food)))
+        actions.extend((TurnAction.SELL_PET, 0, position) for position in pet_positions)
+        actions.extend((TurnAction.MOVE_PET, origin, target)
+                       for origin in pet_positions
+                       for target in range(len(self.pets))
+                       if target != origin)
+        actions.append((TurnAction.END_TURN, 0, 0))
+        return actions
+
+    def apply_action(self, action: TurnAction, source: int = 0, target: int = 0, journal: bool = False):
+        """
+        Take one of the actions from legal_actions
+
+        :param journal: record the state before the action, so that undo can take it back, e.g. when searching through
+            actions. If the action fails, the state is put back before raising
+        """
+        if not journal:
+            self._apply_action(action, source, target)
+            return
+
+        checkpoint = self.checkpoint()
+        try:
+            self._apply_action(action, source, target)
+        except Exception:
+            self.restore(checkpoint)
+            raise
+        self.journal.append(checkpoint)
+
+    def undo(self):
+        """
+        Take back the last action applied with journal=True
+        """
+        if not self.journal:
+            raise ValueError("No actions to undo")
+        self.restore(self.journal.pop())
+
+    def checkpoint(self) -> PlayerCheckpoint:
+        """
+        Everything an action in the turn can change, including what abilities and food do to the pets, gold and shop,
+        and the state of every random generator involved. Objects are kept rather than copied, with the values in
+        their slots, so it's much cheaper than a deepcopy of the player
+        """
+        shop_random = self.shop.generator.random
+        randoms = {}
+        for pet in self.pets:
+            if pet is not None and pet.random_gen is not None and pet.random_gen is not shop_random:
+                randoms[id(pet.random_gen)] = pet.random_gen
+        for shop_food in self.shop.food:
+            if shop_food.food.random_gen is not None and shop_food.food.random_gen is not shop_random:
+                randoms[id(shop_food.food.random_gen)] = shop_food.food.random_gen
+
+        return PlayerCheckpoint(
+            gold=self.gold,
+            pets=[(pet, None if pet is None else slot_values(pet)) for pet in self.pets],
+            random_states=[(random_gen, random_gen.getstate()) for random_gen in randoms.values()],
+            shop=self.shop.checkpoint(),
+        )
+
+    def restore(self, checkpoint: PlayerCheckpoint):
+        """
+        Put the player back as they were at the checkpoint
+        """
+        self.gold = checkpoint.gold
+        # Keep the same list, as the event queue holds on to it
+        self.pets[:] = [pet for pet, _ in checkpoint.pets]
+        for pet, state in checkpoint.pets:
+            if pet is not None:
+                set_slot_values(pet, state)
+        for random_gen, state in checkpoint.random_states:
+            random_gen.setstate(state)
+        self.shop.restore(checkpoint.shop)
+
+    def _apply_action(self, action: TurnAction, source: int, target: int):
+        if action is TurnAction.REROLL:
+            self.reroll()
+        elif action is TurnAction.BUY_AND_PLACE_PET:
+            self.buy_and_place_pet(source, target)
+        elif action is TurnAction.BUY_AND_COMBINE_PET:
+            self.buy_and_combine_pet(source, target)
+        elif action is TurnAction.BUY_FOOD_FOR_PET:
+            self.buy_and_apply_food(source, target)
+        elif action is TurnAction.TOGGLE_FREEZE_PET:
+            self.shop.toggle_freeze_pet(source)
+        elif action is TurnAction.TOGGLE_FREEZE_FOOD:
+            self.shop.toggle_freeze_food(source)
+        elif action is TurnAction.SELL_PET:
+            self.sell(target)
+        elif action is TurnAction.MOVE_PET:
+            self.move(source, target)
+        elif action is TurnAction.END_TURN:
+            self.end_turn()
+        else:
+            raise ValueError("Unknown action", action)
+
+    @property
+    def event_queue(self) -> EventQueue:
+        """
+        Queue for resolving triggers in the shop phase, kept between actions. Its resolve order is only worked out
+        again once the pets have been moved, bought, sold or buffed since it was last used
+        """
+        # Pets summoned in the shop phase, e.g. by the spider, use the shop's random generator like the rest
+        random_gen = self.shop.generator.random
+        if self._event_queue is None or self._event_queue.team_1 is not self.pets:
+            self._event_queue = EventQueue(team_1=self.pets, team_2=[], random_gen=random_gen)
+        elif self._event_queue.event_queue:
+            # Still resolving an earlier action, e.g. food that triggers more, so don't mix its events with these
+            return EventQueue(team_1=self.pets, team_2=[], random_gen=random_gen)
+        # The resolve order depends on which pets there are, where, and their stats. If the queue worked it out again
+        # itself while resolving, it was for the pets part way through, so it's forgotten then too
+        state = (self._event_queue.resets,
+                 tuple(None if pet is None else (id(pet), pet.power, pet.toughness) for pet in self.pets))
+        if state != self._event_queue_state:
+            self._event_queue.reset_resolve_order()
+            self._event_queue_state = (self._event_queue.resets, state[1])
+        return self._event_queue
+
     def take_action(self, pet: Pet, trigger: Trigger):
         """Apply a trigger to one pets, and resolve the action queue that results"""
-        event_queue = EventQueue(team_1=self.pets, team_2=[])
+        event_queue = self.event_queue
         event_queue.append((pet, trigger))
         event_queue.resolve_events()
 
     def apply_trigger(self, trigger: Trigger):
         """Apply a trigger to all pets, and resolve the action queue"""
-        event_queue = EventQueue(team_1=self.pets, team_2=[])
+        # Most pets have no shop abilities, so often there's nothing to resolve
+        if not any(pet.handles_trigger(trigger.type) for pet in self.pets if pet is not None):
+            return
+        event_queue = self.event_queue
         event_queue.apply_trigger(trigger)
         event_queue.resolve_events()
 
@@ -0,0 +1,173 @@
+"""
+Pick the best of several candidate teams without battling each of them equally often.
+
+Candidates are raced against the same opponents, a batch of battles at a time, and the ones that are clearly worse are
+dropped early, so the battles go to the candidates that are close. Two schedules are available:
+
+- successive_halving keeps the better half of the candidates after each round, doubling the battles per candidate, so
+  the cost is known up front.
+- race keeps every candidate whose confidence interval still overlaps the leader's, stopping once one is left or the
+  budget is spent.
+
+Both return every candidate ranked best first, with Wilson confidence bounds on its share of battles won (draws
+counting as half), and how many battles were run in all.
+"""
+from dataclasses import dataclass
+from random import Random
+from typing import List, Optional, Sequence, Tuple
+
+from sap.battle import BattleOutcomes, simulate_pairs
+from sap.estimator import is_deterministic, wilson_interval
+from sap.pet import Pet
+
+
+def score(outcomes: BattleOutcomes) -> float:
+    """Share of battles won, counting draws as half"""
+    if not outcomes.battles:
+        return 0.0
+    return (outcomes.team_1_wins + 0.5 * outcomes.draws) / outcomes.battles
+
+
+@dataclass
+class Entry:
+    """How a candidate did in a race"""
+    index: int  # of the candidate in those given
+    team: List[Pet]
+    outcomes: BattleOutcomes
+    lower: float
+    upper: float
+    eliminated_after: Optional[int] = None  # battles run in all when it was dropped, None if it was never dropped
+
+    @property
+    def score(self) -> float:
+        return score(self.outcomes)
+
+
+@dataclass
+class RaceResult:
+    ranking: List[Entry]  # best first
+    simulations: int  # battles run for all the candidates
+
+    @property
+    def best(self) -> Entry:
+        return self.ranking[0]
+
+
+class _Race:
+    def __init__(self, candidates: Sequence[List[Pet]], opponents: Sequence[List[Pet]], confidence: float,
+                 random_gen: Optional[Random]):
+        if not candidates:
+            raise ValueError("Need candidates to race")
+        if not opponents:
+            raise ValueError("Need opponents to race the candidates against")
+        self.candidates = candidates
+        self.opponents = opponents
+        self.confidence = confidence
+        self.random_gen = random_gen
+        self.outcomes = [BattleOutcomes() for _ in candidates]
+        self.eliminated_after: List[Optional[int]] = [None] * len(candidates)
+        self.simulations = 0
+        self.next_opponent = 0
+        self.deterministic = all(is_deterministic(candidate, opponent)
+                                 for candidate in candidates for opponent in opponents)
+
+    def run(self, alive: List[int], battles: int):
+        """Battle each of the candidates that are left against the same next opponents"""
+        schedule = [self.opponents[(self.next_opponent + i) % len(self.opponents)] for i in range(battles)]
+        self.next_opponent += battles
+        for index in alive:
+            for pair_outcomes in simulate_pairs([(self.candidates[index], opponent) for opponent in schedule],
+                                                random_gen=self.random_gen):
+                self.outcomes[index].merge(pair_outcomes)
+        self.simulations += battles * len(alive)
+
+    def run_exactly(self):
+        """One battle against each opponent, which tells us everything if no pet uses randomness"""
+        self.run(list(range(len(self.candidates))), len(self.opponents))
+
+    def bounds(self, index: int) -> Tuple[float, float]:
+        outcomes = self.outcomes[index]
+        if self.deterministic:
+            exact = score(outcomes)
+            return exact, exact
+        return wilson_interval(outcomes.team_1_wins + 0.5 * outcomes.draws, outcomes.battles, self.confidence)
+
+    def eliminate(self, indices: Sequence[int]):
+        for index in indices:
+            self.eliminated_after[index] = self.simulations
+
+    def result(self) -> RaceResult:
+        entries = [Entry(index, candidate, outcomes, *self.bounds(index), eliminated_after=eliminated_after)
+                   for index, (candidate, outcomes, eliminated_after)
+                   in enumerate(zip(self.candidates, self.outcomes, self.eliminated_after))]
+        # Those that lasted longest first, as they were compared on more battles, then by score. Ties go to the
+        # earliest candidate
+        entries.sort(key=lambda entry: (entry.eliminated_after is not None, -(entry.eliminated_after or 0),
+                                        -entry.score, entry.index))
+        return RaceResult(entries, self.simulations)
+
+
+def successive_halving(candidates: Sequence[List[Pet]], opponents: Sequence[List[Pet]], samples: int = 4,
+                       confidence: float = 0.95, random_gen: Optional[Random] = None) -> RaceResult:
+    """
+    Rank the candidates by battling them against the opponents in rounds, keeping the better half each round
+
+    :param samples: battles for each candidate in the first round, which doubles every round
+    :param confidence: of the bounds given for each candidate
+    :param random_gen: for the random choices in battles
+    """
+    if samples < 1:
+        raise ValueError("Need at least one battle in the first round", samples)
+    state = _Race(candidates, opponents, confidence, random_gen)
+    if state.deterministic:
+        state.run_exactly()
+        return state.result()
+
+    alive = list(range(len(candidates)))
+    battles = samples
+    while len(alive) > 1:
+        state.run(alive, battles)
+        alive = sorted(alive, key=lambda index: -score(state.outcomes[index]))
+        keep = (len(alive) + 1) // 2
+        state.eliminate(alive[keep:])
+        alive = alive[:keep]
+        battles *= 2
+    return state.result()
+
+
+def race(candidates: Sequence[List[Pet]], opponents: Sequence[List[Pet]], batch_size: int = 8,
+         max_simulations: int = 10000, tolerance: float = 0.02, confidence: float = 0.95,
+         random_gen: Optional[Random] = None) -> RaceResult:
+    """
+    Rank the candidates by battling them against the opponents a batch at a time, dropping any whose upper bound falls
+    below the best lower bound. Stops when one is left, when none left could be better than the leader by more than
+    the tolerance, or when max_simulations battles have been run
+
+    :param batch_size: battles for each candidate left in each round
+    :param confidence: of the bounds used to drop candidates, and given for each
+    :param random_gen: for the random choices in battles
+    """
+    if batch_size < 1:
+        raise ValueError("Batches need at least one battle", batch_size)
+    if max_simulations < 1:
+        raise ValueError("Need to run at least one battle", max_simulations)
+    state = _Race(candidates, opponents, confidence, random_gen)
+    if state.deterministic:
+        state.run_exactly()
+        return state.result()
+
+    alive = list(range(len(candidates)))
+    while len(alive) > 1 and state.simulations + batch_size * len(alive) <= max_simulations:
+        state.run(alive, batch_size)
+        bounds = {index: state.bounds(index) for index in alive}
+        best_lower = max(lower for lower, _ in bounds.values())
+        dropped = [index for index in alive if bounds[index][1] < best_lower]
+        state.eliminate(dropped)
+        alive = [index for index in alive if index not in dropped]
+
+        # Candidates that are as good as each other can't be told apart however long they race
+        leader = max(alive, key=lambda index: score(state.outcomes[index]))
+        if len(alive) > 1 and \
+                max(bounds[index][1] for index in alive if index != leader) - bounds[leader][0] <= tolerance:
+            break
+    return state.result()
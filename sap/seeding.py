@@ -0,0 +1,26 @@
+"""
+Seeds for the separate random streams of a run.
+
+Each part of a run that makes random choices, like a player's shop or a single battle of a sharded simulation, gets its
+own Random, seeded from the run's seed and keys naming the part. So the same seed gives the same run, however the work
+is split up or ordered, and no two parts share hidden random state.
+"""
+from random import Random
+from typing import Optional, Union
+
+Key = Union[int, str]
+
+
+def new_seed() -> int:
+    return Random().getrandbits(64)
+
+
+def derive_seed(seed: int, *keys: Key) -> int:
+    """Seed for the part of the run named by the keys"""
+    # Seeding with a string hashes it with sha512, which unlike hash() is the same in every process
+    return Random("/".join(map(str, (seed,) + keys))).getrandbits(64)
+
+
+def seeded_random(seed: Optional[int], *keys: Key) -> Random:
+    """Random for the part of the run named by the keys, or an unseeded one if there's no seed"""
+    return Random() if seed is None else Random(derive_seed(seed, *keys))
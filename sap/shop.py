@@ -1,8 +1,7 @@
-import random
-
-from sap.pet import Pet, Food
-from typing import List, Tuple, Type, TypeVar
+from sap.pet import Pet, Food, slot_values, set_slot_values, MAX_POWER, MAX_TOUGHNESS
+from typing import List, Tuple, Type, TypeVar, Optional, Iterable, Dict
 from abc import ABC, abstractmethod
+import functools
 from dataclasses import dataclass
 from random import Random
 
@@ -19,6 +18,17 @@ class ShopGenerator(ABC):
     def get_food(self, tier: int) -> Food:
         raise NotImplementedError
 
+    def get_pets(self, tier: int, number: int) -> List[Pet]:
+        """Several pets at once, e.g. to fill a shop"""
+        return [self.get_pet(tier) for _ in range(number)]
+
+    def get_foods(self, tier: int, number: int) -> List[Food]:
+        return [self.get_food(tier) for _ in range(number)]
+
+    def get_shop_pets(self, tier: int, number: int) -> List["ShopPet"]:
+        """Pets to fill a shop with, ready to go in it"""
+        return [ShopPet(pet=pet) for pet in self.get_pets(tier, number)]
+
 
 T = TypeVar("T")
 
@@ -29,21 +39,54 @@ MAX_TIER = 6
 
 class TierShopGenerator(ShopGenerator):
     def __init__(self, pet_tiers: List[List[Type[Pet]]], food_tiers: List[List[Type[Food]]],
-                 random_gen: Random = random.Random()):
-        super().__init__(random_gen)
+                 random_gen: Optional[Random] = None):
+        """
+        :param random_gen: used for picking items, and given to them for any random choices they make
+        """
+        super().__init__(Random() if random_gen is None else random_gen)
         self.pet_tiers = pet_tiers
         self.food_tiers = food_tiers
+        self.pet_pools = cumulative_pools(pet_tiers)
+        self.food_pools = cumulative_pools(food_tiers)
+
+    @staticmethod
+    def get_pool(tier: int, pools: List[Tuple[Type[T], ...]]) -> Tuple[Type[T], ...]:
+        return pools[min(tier, len(pools) - 1)]
 
-    def get_from_tier(self, tier: int, tiers: List[List[Type[T]]]) -> Type[T]:
-        available_tiers = tiers[:tier]
-        available_items = tuple(item for tier in available_tiers for item in tier)
-        return self.random.choice(available_items)
+    def _spawn(self, item_type: Type[T]) -> T:
+        item = item_type.spawn()
+        item.random_gen = self.random
+        return item
 
     def get_pet(self, tier: int) -> Pet:
-        return self.get_from_tier(tier, self.pet_tiers).spawn()
+        return self._spawn(self.random.choice(self.get_pool(tier, self.pet_pools)))
 
     def get_food(self, tier: int) -> Food:
-        return self.get_from_tier(tier, self.food_tiers).spawn()
+        return self._spawn(self.random.choice(self.get_pool(tier, self.food_pools)))
+
+    def get_pets(self, tier: int, number: int) -> List[Pet]:
+        return [self._spawn(pet_type)
+                for pet_type in self.random.choices(self.get_pool(tier, self.pet_pools), k=number)]
+
+    def get_foods(self, tier: int, number: int) -> List[Food]:
+        return [self._spawn(food_type)
+                for food_type in self.random.choices(self.get_pool(tier, self.food_pools), k=number)]
+
+
+def cumulative_pools(tiers: List[List[Type[T]]]) -> List[Tuple[Type[T], ...]]:
+    """
+    Everything available at each tier, i.e. from that tier and every tier below it. Nothing is available at tier 0
+    """
+    pools = [()]
+    for tier in tiers:
+        pools.append(pools[-1] + tuple(tier))
+    return pools
+
+
+@functools.lru_cache(maxsize=None)
+def _prototype(pet_type: Type[Pet]) -> Pet:
+    """A freshly spawned pet of the type, to read what every new one looks like from. Never to be changed"""
+    return pet_type.spawn()
 
 
 @dataclass
@@ -51,12 +94,133 @@ class ShopPet:
     pet: Pet
     frozen: bool = False
 
+    # What it takes to decide what to do with a shop pet, which a lazy one can tell without spawning
+    @property
+    def pet_type(self) -> Type[Pet]:
+        return type(self.pet)
+
+    @property
+    def symbol(self) -> str:
+        return self.pet.symbol
+
+    @property
+    def power(self) -> int:
+        return self.pet.power
+
+    @property
+    def toughness(self) -> int:
+        return self.pet.toughness
+
+    @property
+    def equipped_food(self) -> Optional[Food]:
+        return self.pet.equipped_food
+
+    @property
+    def spawned(self) -> bool:
+        return True
+
     def __repr__(self) -> str:
         pet_string = str(self.pet)
         if self.frozen:
             pet_string = "🧊" + pet_string
         return pet_string
 
+    def buff(self, power: int = 0, toughness: int = 0):
+        self.pet.buff(power=power, toughness=toughness)
+
+    def checkpoint(self) -> Tuple:
+        """State that buying, freezing or buffing can change, to go back to with restore"""
+        return self.frozen, self.pet, slot_values(self.pet)
+
+    def restore(self, state: Tuple):
+        self.frozen, self.pet, pet_state = state
+        set_slot_values(self.pet, pet_state)
+
+
+class LazyShopPet(ShopPet):
+    """
+    Shop pet that's only spawned once something looks at it, so pets rerolled away unseen cost next to nothing
+    """
+
+    def __init__(self, pet_type: Type[Pet], random_gen: Random, frozen: bool = False):
+        self._pet_type = pet_type
+        self.random_gen = random_gen
+        self.frozen = frozen
+        self._pet: Optional[Pet] = None
+        self._buffs: List[Tuple[int, int]] = []  # buffs to give the pet once it's spawned
+
+    def __repr__(self) -> str:
+        if self._pet is not None:
+            return super().__repr__()
+        return ("🧊" if self.frozen else "") + f"{self.symbol}{self.power}/{self.toughness}"
+
+    @property
+    def pet(self) -> Pet:
+        if self._pet is None:
+            pet = self._pet_type.spawn()
+            pet.random_gen = self.random_gen
+            for power, toughness in self._buffs:
+                pet.buff(power=power, toughness=toughness)
+            self._pet = pet
+        return self._pet
+
+    @pet.setter
+    def pet(self, pet: Pet):
+        self._pet = pet
+
+    @property
+    def spawned(self) -> bool:
+        return self._pet is not None
+
+    @property
+    def pet_type(self) -> Type[Pet]:
+        return self._pet_type if self._pet is None else type(self._pet)
+
+    @property
+    def symbol(self) -> str:
+        return _prototype(self._pet_type).symbol if self._pet is None else self._pet.symbol
+
+    @property
+    def power(self) -> int:
+        if self._pet is not None:
+            return self._pet.power
+        power = _prototype(self._pet_type).power
+        for buff, _ in self._buffs:
+            power = min(power + buff, MAX_POWER)  # as Pet.buff does
+        return power
+
+    @property
+    def toughness(self) -> int:
+        if self._pet is not None:
+            return self._pet.toughness
+        toughness = _prototype(self._pet_type).toughness
+        for _, buff in self._buffs:
+            toughness = min(toughness + buff, MAX_TOUGHNESS)
+        return toughness
+
+    @property
+    def equipped_food(self) -> Optional[Food]:
+        """Food the pet has, which for some pets is food they spawn with. Not to be changed before spawning"""
+        return _prototype(self._pet_type).equipped_food if self._pet is None else self._pet.equipped_food
+
+    def buff(self, power: int = 0, toughness: int = 0):
+        if self._pet is None:
+            if power or toughness:
+                self._buffs.append((power, toughness))
+        else:
+            self._pet.buff(power=power, toughness=toughness)
+
+    def checkpoint(self) -> Tuple:
+        # Don't spawn the pet just for this
+        pet_state = None if self._pet is None else slot_values(self._pet)
+        return self.frozen, self._pet, pet_state, list(self._buffs)
+
+    def restore(self, state: Tuple):
+        self.frozen, self._pet, pet_state, buffs = state
+        self._buffs = list(buffs)
+        if self._pet is not None:
+            set_slot_values(self._pet, pet_state)
+
 
 @dataclass
 class ShopFood:
@@ -70,6 +234,16 @@ class ShopFood:
         return food_string
 
 
+@dataclass
+class ShopCheckpoint:
+    """What a shop was like at some point, see Shop.checkpoint"""
+    pets: List[Tuple[ShopPet, Tuple]]
+    food: List[Tuple[ShopFood, bool]]
+    power_buff: int
+    toughness_buff: int
+    random_state: Tuple
+
+
 # TODO: deal with level up shop spawn
 class Shop:
     def __init__(self, shop_generator: ShopGenerator):
@@ -121,7 +295,7 @@ class Shop:
         self.power_buff += power
         self.toughness_buff += toughness
         for shop_pet in self._pets:
-            shop_pet.pet.buff(power=power, toughness=toughness)
+            shop_pet.buff(power=power, toughness=toughness)
 
     def add_next_tier_pet(self):
         """When leveling up, we get to add a new, better, pet!"""
@@ -130,17 +304,35 @@ class Shop:
     def add_pet(self, shop_pet: ShopPet):
         if not self.has_open_slot:
             raise ValueError("Can't add a pet if there's no spot!")
-        shop_pet.pet.buff(power=self.power_buff, toughness=self.toughness_buff)
+        shop_pet.buff(power=self.power_buff, toughness=self.toughness_buff)
         self._pets.append(shop_pet)
 
     def reroll(self):
+        self.keep_frozen()
+        shop_pets = self.generator.get_shop_pets(self.tier, self.missing_pets)
+        foods = self.generator.get_foods(self.tier, self.missing_food)
+        for shop_pet in shop_pets:
+            self.add_pet(shop_pet)
+        self._food.extend(ShopFood(food=food) for food in foods)
+
+    def keep_frozen(self):
+        """Clear out everything that isn't frozen, the first half of a reroll"""
         self._pets = [pet for pet in self._pets if pet.frozen]
-        for _ in range(len(self._pets), self.pet_size):
-            self.add_pet(ShopPet(pet=self.generator.get_pet(self.tier)))
-
         self._food = [food for food in self._food if food.frozen]
-        for _ in range(len(self._food), self.food_size):
-            self._food.append(ShopFood(food=self.generator.get_food(self.tier)))
+
+    @property
+    def missing_pets(self) -> int:
+        return max(0, self.pet_size - len(self._pets))
+
+    @property
+    def missing_food(self) -> int:
+        return max(0, self.food_size - len(self._food))
+
+    def restock(self, pets: List[Pet], foods: List[Food]):
+        """Fill the shop up with the given new items, the second half of a reroll"""
+        for pet in pets:
+            self.add_pet(ShopPet(pet=pet))
+        self._food.extend(ShopFood(food=food) for food in foods)
 
     def buy_pet(self, position: int) -> Pet:
         return self._pets.pop(position).pet
@@ -161,6 +353,31 @@ class Shop:
         food.frozen = not food.frozen
         return food.frozen
 
+    def checkpoint(self) -> ShopCheckpoint:
+        """
+        Everything buying, freezing, rerolling or buffing the shop can change, so it can be put back with restore
+        """
+        return ShopCheckpoint(
+            pets=[(shop_pet, shop_pet.checkpoint()) for shop_pet in self._pets],
+            food=[(shop_food, shop_food.frozen) for shop_food in self._food],
+            power_buff=self.power_buff,
+            toughness_buff=self.toughness_buff,
+            random_state=self.generator.random.getstate(),
+        )
+
+    def restore(self, checkpoint: ShopCheckpoint):
+        self._pets = []
+        for shop_pet, state in checkpoint.pets:
+            shop_pet.restore(state)
+            self._pets.append(shop_pet)
+        self._food = []
+        for shop_food, frozen in checkpoint.food:
+            shop_food.frozen = frozen
+            self._food.append(shop_food)
+        self.power_buff = checkpoint.power_buff
+        self.toughness_buff = checkpoint.toughness_buff
+        self.generator.random.setstate(checkpoint.random_state)
+
     def setup_for_round(self, game_round: int):
         self.round = game_round
         self.reroll()
@@ -176,3 +393,22 @@ class Shop:
             food_illustration.append(f"{i}. {food}")
         foods_string = "\n".join(food_illustration)
         return f"<Shop {pets_string} {foods_string}>"
+
+
+def reroll_all(shops: Iterable[Shop]):
+    """
+    Reroll many shops, drawing the new items for all the shops sharing a generator and tier in one go
+    """
+    groups: Dict[Tuple[int, int], List[Shop]] = {}
+    for shop in shops:
+        shop.keep_frozen()
+        groups.setdefault((id(shop.generator), shop.tier), []).append(shop)
+
+    for group in groups.values():
+        generator, tier = group[0].generator, group[0].tier
+        pets = generator.get_pets(tier, sum(shop.missing_pets for shop in group))
+        foods = generator.get_foods(tier, sum(shop.missing_food for shop in group))
+        for shop in group:
+            missing_pets, missing_food = shop.missing_pets, shop.missing_food
+            shop.restock(pets[:missing_pets], foods[:missing_food])
+            pets, foods = pets[missing_pets:], foods[missing_food:]
@@ -0,0 +1,175 @@
+"""
+Exact battle outcomes, by enumerating every random choice the pets can make.
+
+The only randomness in a battle is in abilities, e.g. which pets pick_unique_pets picks, the dog's coin flip or the
+spider's summon. Ties in the resolve order are broken by team and position rather than randomly, so they don't branch.
+For small teams there are only a few such choices per round, so rather than sampling battles we can follow every
+branch, each weighted by its probability.
+
+Battles are stepped a round at a time. Every way the random choices in a round can go is replayed from the state at the
+top of the round, and the outcome from each state the round can end in is memoised, so branches that come back
+together in the same round (e.g. the mosquito hitting either of two identical pets) are only solved once.
+"""
+from random import Random
+from typing import List, Tuple, Dict, Optional, Hashable
+
+from sap.battle import Battle, Result, round_limit
+from sap.pet import Pet, slot_names
+
+Distribution = Dict[Result, float]
+# (probability, team 1, team 2) of a state a step can end in
+Transition = Tuple[float, List[Pet], List[Pet]]
+
+DEFAULT_MAX_PATHS = 10000
+
+_FIELDS = frozenset(Pet.__dataclass_fields__)
+
+
+class ScriptedRandom(Random):
+    """
+    Random that makes the choices it's given, in order, and then always the first option. Every choice made is noted
+    down with how many options it had, so the caller can work out the next unexplored branch.
+    """
+
+    def __init__(self, script: List[int]):
+        super().__init__(0)
+        self.script = script
+        self.choices: List[Tuple[int, int]] = []  # (choice, number of options)
+
+    # choice, randrange, shuffle etc. all pick through _randbelow, so this is the one place a branch can happen
+    def _randbelow(self, n: int) -> int:
+        position = len(self.choices)
+        choice = self.script[position] if position < len(self.script) else 0
+        self.choices.append((choice, n))
+        return choice
+
+    def random(self) -> float:
+        raise NotImplementedError("Can only enumerate choices between a whole number of options")
+
+    def probability(self) -> float:
+        probability = 1.0
+        for _, options in self.choices:
+            probability /= options
+        return probability
+
+    def next_script(self) -> Optional[List[int]]:
+        """The choices leading to the next branch to explore, or None if they've all been explored"""
+        for position in range(len(self.choices) - 1, -1, -1):
+            choice, options = self.choices[position]
+            if choice + 1 < options:
+                return [choice for choice, _ in self.choices[:position]] + [choice + 1]
+        return None
+
+
+def pet_key(pet: Pet) -> Hashable:
+    """Everything about a pet that matters in a battle, so pets with the same key are interchangeable, bar their id"""
+    # Any slot that isn't a dataclass field is ability state, like the fly's number of triggers
+    extra_state = tuple(
+        type(value) if isinstance(value, Pet) else value
+        for value in (getattr(pet, name) for name in slot_names(type(pet)) if name not in _FIELDS))
+    return (type(pet), pet.symbol, pet.power, pet.toughness, pet.experience, pet.temp_buff_power,
+            pet.temp_buff_toughness, type(pet.equipped_food), extra_state)
+
+
+def _state_key(started: bool, team_1: List[Pet], team_2: List[Pet]) -> Hashable:
+    return started, tuple(pet_key(pet) for pet in team_1), tuple(pet_key(pet) for pet in team_2)
+
+
+def step(team_1: List[Pet], team_2: List[Pet], started: bool, max_paths: int = DEFAULT_MAX_PATHS) -> List[Transition]:
+    """
+    Every way the next step of a battle can go: the start of the battle if it hasn't started, otherwise a round
+    """
+    transitions = []
+    script: Optional[List[int]] = []
+    while script is not None:
+        random_gen = ScriptedRandom(script)
+        # The battle clones the pets, keeping ability state like the whale's swallowed pet
+        battle = Battle(team_1, team_2, random_gen)
+        if started:
+            battle.do_round()
+        else:
+            battle.start()
+        transitions.append((random_gen.probability(), list(battle.team_1), list(battle.team_2)))
+        if len(transitions) > max_paths:
+            raise ValueError("Too many random branches in a round to solve exactly", max_paths)
+        script = random_gen.next_script()
+    return transitions
+
+
+class _Solver:
+    def __init__(self, max_paths: int, max_rounds: int):
+        self.max_paths = max_paths
+        self.max_rounds = max_rounds
+        # Keyed on the rounds gone as well as the state, as a state with fewer rounds left can be cut short sooner
+        self.solved: Dict[Tuple[Hashable, int], Distribution] = {}
+        self.in_progress = set()
+
+    def solve(self, team_1: List[Pet], team_2: List[Pet], started: bool, rounds: int) -> Distribution:
+        if started:
+            result = _assess(team_1, team_2)
+            if result is not Result.UNFINISHED:
+                return _certain(result)
+            if rounds >= self.max_rounds:
+                return _certain(Result.DRAW)  # as Battle calls it
+
+        key = _state_key(started, team_1, team_2)
+        if (key, rounds) in self.solved:
+            return self.solved[key, rounds]
+        if key in self.in_progress:
+            # The battle can go round a cycle of states, which it may or may not leave, and working out how likely
+            # each way out is would mean solving the whole cycle at once, which this doesn't do
+            raise ValueError("Battle can come back to an earlier state, so can't be solved exactly")
+
+        self.in_progress.add(key)
+        distribution = {result: 0.0 for result in _FINISHED}
+        staying_probability = 0.0
+        for probability, next_team_1, next_team_2 in step(team_1, team_2, started, self.max_paths):
+            if started and _state_key(True, next_team_1, next_team_2) == key:
+                staying_probability += probability  # nothing changed this round, dealt with below
+                continue
+            for result, result_probability in self.solve(next_team_1, next_team_2, True, rounds + 1).items():
+                distribution[result] += probability * result_probability
+        self.in_progress.remove(key)
+
+        if staying_probability >= 1:
+            distribution = _certain(Result.DRAW)
+        elif staying_probability:
+            # Rounds that change nothing just repeat until one does, so the other branches share their probability
+            distribution = {result: probability / (1 - staying_probability)
+                            for result, probability in distribution.items()}
+
+        self.solved[key, rounds] = distribution
+        return distribution
+
+
+_FINISHED = (Result.TEAM_1_WINS, Result.TEAM_2_WINS, Result.DRAW)
+
+
+def _certain(result: Result) -> Distribution:
+    return {finished: 1.0 if finished is result else 0.0 for finished in _FINISHED}
+
+
+def _assess(team_1: List[Pet], team_2: List[Pet]) -> Result:
+    if team_1 and team_2:
+        return Result.UNFINISHED
+    elif not team_1 and not team_2:
+        return Result.DRAW
+    return Result.TEAM_1_WINS if team_1 else Result.TEAM_2_WINS
+
+
+def solve_battle(team_1: List[Pet], team_2: List[Pet], max_paths: int = DEFAULT_MAX_PATHS,
+                 max_rounds: Optional[int] = None) -> Distribution:
+    """
+    Exact probability of each result of a battle between the two teams. The teams aren't modified.
+
+    A round that leaves the battle as it was just repeats until one changes something. A battle that can come back to
+    an earlier state by some longer way round can't be solved exactly, and raises a ValueError, as does one with too
+    many branches, so callers can fall back to sampling.
+
+    :param max_paths: most branches a single round may have, past which a ValueError is raised, so callers can fall
+        back to sampling
+    :param max_rounds: rounds after which a battle is called a draw, by default round_limit of the teams as for Battle
+    """
+    if max_rounds is None:
+        max_rounds = round_limit(team_1, team_2)
+    return _Solver(max_paths, max_rounds).solve(team_1, team_2, started=False, rounds=0)
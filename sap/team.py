@@ -0,0 +1,85 @@
+from typing import Dict, Iterable, List
+
+from sap.pet import Pet
+
+
+class Team(List[Pet]):
+    """
+    A list of pets that looks its pets up by identity.
+
+    Pets are dataclasses, so `in`, `index` and `remove` on a plain list compare every field of every pet until they
+    find a match. A team instead keeps an index from each pet to its position, which is rebuilt whenever the team
+    changes, so membership and position lookups are O(1). Teams are at most a handful of pets, and change far less
+    often than they're looked up in, so rebuilding the index on every change is cheap.
+    """
+
+    def __init__(self, pets: Iterable[Pet] = ()):
+        super().__init__(pets)
+        self._positions: Dict[int, int] = {}
+        self._reindex()
+
+    def _reindex(self):
+        # Go backwards so, like list.index, the first position wins if a pet is somehow in the team twice
+        self._positions = {id(self[position]): position for position in range(len(self) - 1, -1, -1)}
+
+    def __contains__(self, pet: object) -> bool:
+        return id(pet) in self._positions
+
+    def index(self, pet: Pet, start: int = 0, stop: int = None) -> int:
+        position = self._positions.get(id(pet))
+        if position is None or position < start or (stop is not None and position >= stop):
+            raise ValueError(f"{pet} is not in team")
+        return position
+
+    def append(self, pet: Pet):
+        super().append(pet)
+        self._positions.setdefault(id(pet), len(self) - 1)
+
+    def insert(self, index: int, pet: Pet):
+        super().insert(index, pet)
+        self._reindex()
+
+    def extend(self, pets: Iterable[Pet]):
+        super().extend(pets)
+        self._reindex()
+
+    def remove(self, pet: Pet):
+        del self[self.index(pet)]
+
+    def pop(self, index: int = -1) -> Pet:
+        pet = super().pop(index)
+        self._reindex()
+        return pet
+
+    def clear(self):
+        super().clear()
+        self._positions = {}
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._reindex()
+
+    def reverse(self):
+        super().reverse()
+        self._reindex()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._reindex()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._reindex()
+
+    def __iadd__(self, pets: Iterable[Pet]) -> "Team":
+        self.extend(pets)
+        return self
+
+    def __imul__(self, times: int) -> "Team":
+        super().__imul__(times)
+        self._reindex()
+        return self
+
+    def __reduce__(self):
+        # The index is keyed by id, which doesn't survive a copy or pickle, so rebuild it from the pets instead
+        return self.__class__, (list(self),)
@@ -0,0 +1,22 @@
+"""
+Whether to log the details of battles and games as they happen.
+
+The log messages, many of which include whole teams, are formatted before logging decides whether to drop them, and
+doing so costs more than the simulation itself. So the hot paths of battles and games check this flag before doing
+anything to do with logging, and only pay for it when tracing is turned on.
+"""
+import logging
+
+enabled = False
+
+
+def enable(level: int = logging.DEBUG):
+    """Turn tracing on, and show it at the given logging level"""
+    global enabled
+    enabled = True
+    logging.basicConfig(level=level)
+
+
+def disable():
+    global enabled
+    enabled = False
@@ -0,0 +1,74 @@
+"""
+Rerolling many shops at once with numpy, e.g. for the shops of hundreds of environments.
+
+The species for every missing slot of every shop are drawn in a single numpy call. Pets are only spawned when an agent
+looks at or buys them (see LazyShopPet), as most are rerolled away unseen.
+"""
+from random import Random
+from typing import List, Type, Optional, Sequence
+
+import numpy as np
+
+from sap.pet import Pet, Food
+from sap.shop import TierShopGenerator, Shop, LazyShopPet
+
+
+class VectorShopGenerator(TierShopGenerator):
+    """
+    Tier shop generator that can also reroll many shops using it at once. A shop using it rerolled on its own gets
+    lazy pets too. Single draws, e.g. the pet from leveling up, work as they do for TierShopGenerator
+    """
+
+    def __init__(self, pet_tiers: List[List[Type[Pet]]], food_tiers: List[List[Type[Food]]],
+                 random_gen: Optional[Random] = None):
+        """
+        :param random_gen: used for single draws and given to the pets and food for their random choices, and seeds
+            the numpy generator for bulk draws
+        """
+        super().__init__(pet_tiers, food_tiers, random_gen)
+        self.numpy_gen = np.random.default_rng(self.random.getrandbits(64))
+        # Pools are cumulative, so each is the start of the last one, and a species index into it is valid for a tier
+        # as long as it's below the size of that tier's pool
+        self.all_pets = self.pet_pools[-1]
+        self.all_foods = self.food_pools[-1]
+        self.pet_pool_sizes = np.array([len(pool) for pool in self.pet_pools])
+        self.food_pool_sizes = np.array([len(pool) for pool in self.food_pools])
+
+    def get_shop_pets(self, tier: int, number: int) -> List[LazyShopPet]:
+        return [LazyShopPet(pet_type, self.random)
+                for pet_type in self.random.choices(self.get_pool(tier, self.pet_pools), k=number)]
+
+    def reroll_all(self, shops: Sequence[Shop]):
+        """
+        Reroll all the given shops, which must use this generator, keeping what's frozen
+        """
+        for shop in shops:
+            if shop.generator is not self:
+                raise ValueError("Can only reroll shops using this generator", shop)
+            shop.keep_frozen()
+
+        tiers = np.array([shop.tier for shop in shops], dtype=np.intp)
+        missing_pets = np.array([shop.missing_pets for shop in shops], dtype=np.intp)
+        missing_food = np.array([shop.missing_food for shop in shops], dtype=np.intp)
+        pet_bounds = np.repeat(self.pet_pool_sizes[np.minimum(tiers, len(self.pet_pools) - 1)], missing_pets)
+        food_bounds = np.repeat(self.food_pool_sizes[np.minimum(tiers, len(self.food_pools) - 1)], missing_food)
+        bounds = np.concatenate((pet_bounds, food_bounds))
+        if not bounds.all():
+            raise ValueError("Nothing available to stock a shop at its tier", tiers)
+
+        # Every slot of every shop in one go
+        species = (self.numpy_gen.random(len(bounds)) * bounds).astype(np.intp).tolist()
+        pet_species, food_species = species[:len(pet_bounds)], species[len(pet_bounds):]
+
+        pet_index = food_index = 0
+        for shop, shop_missing_pets, shop_missing_food in zip(shops, missing_pets.tolist(), missing_food.tolist()):
+            for pet_id in pet_species[pet_index:pet_index + shop_missing_pets]:
+                shop.add_pet(LazyShopPet(self.all_pets[pet_id], self.random))
+            foods = []
+            for food_id in food_species[food_index:food_index + shop_missing_food]:
+                food = self.all_foods[food_id].spawn()
+                food.random_gen = self.random
+                foods.append(food)
+            shop.restock([], foods)
+            pet_index += shop_missing_pets
+            food_index += shop_missing_food
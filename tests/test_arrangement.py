@@ -0,0 +1,71 @@
+import itertools
+from random import Random
+
+import pytest
+
+from sap.arrangement import orderings, moves_to, best_arrangement, arrange, score
+from sap.battle import simulate
+from sap.pet_impl import Whale, Ant, Cricket, Fish
+from test_helpers import dummy_pet, DummyPlayer
+
+
+class TestArrangement:
+    def test_orderings_skip_equal_pets(self):
+        a_1, a_2, b = dummy_pet("A"), dummy_pet("A"), dummy_pet("B")
+        orders = list(orderings([a_1, a_2, b]))
+        assert orders[0] == [a_1, a_2, b]
+        assert len(orders) == 3
+        assert [[pet.symbol for pet in order] for order in orders] == [["A", "A", "B"], ["A", "B", "A"],
+                                                                       ["B", "A", "A"]]
+
+    def test_orderings_all_different(self):
+        team = [dummy_pet(symbol, power=i + 1) for i, symbol in enumerate("ABCDE")]
+        orders = list(orderings(team))
+        assert len(orders) == 120
+        assert len({tuple(id(pet) for pet in order) for order in orders}) == 120
+
+    def test_moves_to(self):
+        team = [dummy_pet(symbol) for symbol in "ABCDE"]
+        for order in itertools.permutations(team):
+            player = DummyPlayer(pets=list(team))
+            for origin, target in moves_to(team, list(order)):
+                player.move(origin, target)
+            assert player.pets == list(order)
+            assert all(a is b for a, b in zip(player.pets, order))
+
+    def test_deterministic_finds_the_best(self):
+        team = [dummy_pet("A", 1, 6), dummy_pet("B", 5, 1), dummy_pet("C", 2, 3)]
+        opponents = [[dummy_pet("X", 4, 4), dummy_pet("Y", 2, 5)], [dummy_pet("Z", 3, 2)]]
+        arrangement = best_arrangement(team, opponents)
+
+        best = 0.0
+        for order in itertools.permutations(team):
+            outcomes = [simulate(list(order), opponent) for opponent in opponents]
+            best = max(best, sum(score(outcome) for outcome in outcomes) / len(opponents))
+        assert arrangement.score == best
+        assert arrangement.simulations == 6 * len(opponents)
+
+    def test_keeps_order_on_a_tie(self):
+        team = [dummy_pet("A", 1, 1), dummy_pet("B", 1, 1)]
+        arrangement = best_arrangement(team, [[dummy_pet("X", 50, 50)]])
+        assert arrangement.order == team
+        assert arrangement.moves == []
+
+    def test_random_pets_use_halving(self):
+        team = [Whale.spawn(), Ant.spawn(), Cricket.spawn(), Fish.spawn()]
+        opponents = [[Ant.spawn(), Fish.spawn()], [Cricket.spawn(), Cricket.spawn(), Fish.spawn()]]
+        arrangement = best_arrangement(team, opponents, samples=2, random_gen=Random(0))
+        assert sorted(map(id, arrangement.order)) == sorted(map(id, team))
+        # 24 orders, halving to 12, 6, 3, 2 and 1, with 2, 4, 8, 16 and 32 battles each
+        assert arrangement.simulations == 24 * 2 + 12 * 4 + 6 * 8 + 3 * 16 + 2 * 32
+        assert arrangement.outcomes.battles == 2 + 4 + 8 + 16 + 32
+
+    def test_arrange_player(self):
+        pets = [dummy_pet("A", 1, 6), None, dummy_pet("B", 5, 1)]
+        player = DummyPlayer(pets=pets)
+        arrangement = arrange(player, [[dummy_pet("X", 4, 4), dummy_pet("Y", 2, 5)]])
+        assert player.pets == arrangement.order
+
+    def test_needs_opponents(self):
+        with pytest.raises(ValueError):
+            best_arrangement([dummy_pet()], [])
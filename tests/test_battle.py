@@ -1,6 +1,9 @@
 from typing import List
 from test_helpers import create_pets, dummy_pet
 from sap.battle import *
+from sap.game import create_shop
+from sap.pet_impl import Mosquito, Fish
+from sap.solver import solve_battle
 
 
 class TestBattle:
@@ -51,3 +54,85 @@ class TestBattle:
             dummy_pet(power=3, toughness=6),
             dummy_pet(power=4, toughness=5)
         ]).battle() == Result.TEAM_1_WINS
+
+    def test_rounds(self):
+        b = Battle([dummy_pet(power=1, toughness=3)], [dummy_pet(power=1, toughness=2)])
+        assert b.battle() == Result.TEAM_1_WINS
+        assert b.rounds == 2
+
+    def test_reset(self):
+        team_1 = [dummy_pet(power=2, toughness=2)]
+        team_2 = [dummy_pet(power=1, toughness=1)]
+        b = Battle(team_1, team_2)
+        assert b.battle() == Result.TEAM_1_WINS
+        b.reset(team_1, team_2)
+        assert b.rounds == 0
+        assert b.team_1 == team_1
+        assert b.team_2 == team_2
+        assert b.battle() == Result.TEAM_1_WINS
+
+    def test_simulate(self):
+        team_1 = [dummy_pet(power=2, toughness=2)]
+        team_2 = [dummy_pet(power=1, toughness=1)]
+        outcomes = simulate(team_1, team_2, samples=5, record_rounds=True)
+        assert outcomes == BattleOutcomes(team_1_wins=5, rounds=[1] * 5)
+        assert outcomes.battles == 5
+        assert team_2[0].toughness == 1
+
+    def test_simulate_pairs(self):
+        strong = [dummy_pet(power=2, toughness=2)]
+        weak = [dummy_pet(power=1, toughness=1)]
+        assert simulate_pairs([(strong, weak), (weak, strong), (weak, weak)], samples=2) == [
+            BattleOutcomes(team_1_wins=2),
+            BattleOutcomes(team_2_wins=2),
+            BattleOutcomes(draws=2),
+        ]
+
+    def test_stalemate_is_draw(self):
+        b = Battle([dummy_pet(power=0, toughness=1)], [dummy_pet(power=0, toughness=1)])
+        assert b.battle() == Result.DRAW
+        assert b.looped
+        assert b.rounds == 2
+
+    def test_max_rounds(self):
+        b = Battle([dummy_pet(power=1, toughness=50)], [dummy_pet(power=1, toughness=50)], max_rounds=10)
+        assert b.battle() == Result.DRAW
+        assert b.looped
+        assert b.rounds == 10
+
+    def test_long_battle_finishes(self):
+        # Five 1/50s take 245 rounds to beat five 1/49s, well past any fixed limit that seems generous
+        team_1 = [dummy_pet(power=1, toughness=50) for _ in range(5)]
+        team_2 = [dummy_pet(power=1, toughness=49) for _ in range(5)]
+        b = Battle(team_1, team_2)
+        assert b.battle() == Result.TEAM_1_WINS
+        assert not b.looped
+        assert b.rounds == 245
+        assert b.max_rounds == round_limit(team_1, team_2)
+        assert solve_battle(team_1, team_2)[Result.TEAM_1_WINS] == 1
+
+    def test_simulate_leaves_shop_random_alone(self):
+        shop = create_shop(Random(0))
+        mosquito = Mosquito.spawn()
+        mosquito.random_gen = shop.generator.random  # as for a pet bought from the shop
+        state = shop.generator.random.getstate()
+        simulate([mosquito], [Fish.spawn(), Fish.spawn()], samples=10)
+        simulate_pairs([([mosquito], [Fish.spawn()])], samples=10)
+        assert shop.generator.random.getstate() == state
+
+    def test_simulate_counts_loops(self):
+        stuck = [dummy_pet(power=0, toughness=1)]
+        outcomes = simulate(stuck, stuck, samples=3)
+        assert outcomes == BattleOutcomes(draws=3, looped=3)
+        assert outcomes.mirrored().looped == 3
+
+    def test_only_logs_when_tracing(self, caplog, monkeypatch):
+        caplog.set_level(logging.DEBUG)
+        monkeypatch.setattr(trace, "enabled", False)
+        Battle([dummy_pet(power=2, toughness=2)], [dummy_pet(power=1, toughness=1)]).battle()
+        assert not caplog.records
+
+        # monkeypatch puts the flag back however the test ends, so tracing can't leak into later tests
+        monkeypatch.setattr(trace, "enabled", True)
+        Battle([dummy_pet(power=2, toughness=2)], [dummy_pet(power=1, toughness=1)]).battle()
+        assert caplog.records
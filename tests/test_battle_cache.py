@@ -0,0 +1,48 @@
+from sap.battle import BattleOutcomes
+from sap.battle_cache import BattleCache
+from sap.pet_impl import Fish, Hedgehog, Sheep, Mosquito, Squirrel, Rat, Duck, Crab
+
+
+class TestBattleCache:
+    def test_hits_equivalent_teams(self):
+        cache = BattleCache()
+        first = cache.outcomes([Fish.spawn()], [Hedgehog.spawn()])
+        second = cache.outcomes([Fish.spawn()], [Hedgehog.spawn()])
+        assert first is second
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.hit_rate == 0.5
+
+    def test_different_stats_miss(self):
+        cache = BattleCache()
+        buffed = Fish.spawn()
+        buffed.buff(power=1)
+        cache.outcomes([Fish.spawn()], [Hedgehog.spawn()])
+        cache.outcomes([buffed], [Hedgehog.spawn()])
+        assert cache.misses == 2
+
+    def test_swapped_teams_simulated_separately(self):
+        cache = BattleCache()
+        # Team 1 goes first on ties, so swapping the teams doesn't just swap the winner
+        squirrels = [Squirrel.spawn(), Rat.spawn(), Duck.spawn()]
+        crabs = [Crab.spawn(), Hedgehog.spawn()]
+        assert cache.outcomes(squirrels, crabs) == BattleOutcomes(team_2_wins=1)
+        assert cache.outcomes(crabs, squirrels) == BattleOutcomes(draws=1)
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    def test_samples_random_matchups(self):
+        cache = BattleCache(samples=7)
+        assert cache.outcomes([Mosquito.spawn()], [Fish.spawn()]).battles == 7
+        assert cache.outcomes([Sheep.spawn()], [Fish.spawn()]).battles == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = BattleCache(max_size=2)
+        cache.outcomes([Fish.spawn()], [Sheep.spawn()])
+        cache.outcomes([Hedgehog.spawn()], [Sheep.spawn()])
+        cache.outcomes([Fish.spawn()], [Sheep.spawn()])
+        cache.outcomes([Fish.spawn()], [Hedgehog.spawn()])
+        assert len(cache) == 2
+        # Hedgehog against Sheep was used least recently, so went first
+        cache.outcomes([Fish.spawn()], [Sheep.spawn()])
+        assert cache.hits == 2
+        cache.outcomes([Hedgehog.spawn()], [Sheep.spawn()])
+        assert cache.misses == 4
@@ -0,0 +1,35 @@
+from random import Random
+
+import pytest
+
+from sap.encoding import encode_team, decode_team
+from sap.pet_impl import Sheep, Scorpion, Dog, Honey, Peanut
+from test_helpers import dummy_pet
+
+
+class TestEncoding:
+    def test_round_trip(self):
+        sheep = Sheep.spawn()
+        sheep.buff(power=2)
+        sheep.experience = 3
+        sheep.equipped_food = Honey.spawn()
+        team = [sheep, Scorpion.spawn(), Dog.spawn()]
+
+        encoded = encode_team(team)
+        decoded = decode_team(encoded)
+        assert [type(pet) for pet in decoded] == [Sheep, Scorpion, Dog]
+        assert (decoded[0].power, decoded[0].toughness, decoded[0].experience) == (4, 2, 3)
+        assert type(decoded[0].equipped_food) == Honey
+        assert type(decoded[1].equipped_food) == Peanut
+        assert decoded[2].equipped_food is None
+        assert encode_team(decoded) == encoded
+        assert hash(encoded) == hash(encode_team(decoded))
+
+    def test_random_gen(self):
+        random_gen = Random(1)
+        decoded = decode_team(encode_team([Dog.spawn()]), random_gen)
+        assert decoded[0].random_gen is random_gen
+
+    def test_unknown_species(self):
+        with pytest.raises(ValueError):
+            encode_team([dummy_pet()])
@@ -0,0 +1,51 @@
+from random import Random
+
+import pytest
+
+from sap.estimator import estimate_win_probability, is_deterministic, wilson_interval
+from sap.pet_impl import Fish, Hedgehog, Mosquito, Dog, Cricket
+from test_helpers import dummy_pet
+
+
+class TestEstimator:
+    def test_is_deterministic(self):
+        assert is_deterministic([Fish.spawn(), Hedgehog.spawn()], [dummy_pet()])
+        assert not is_deterministic([Fish.spawn()], [Mosquito.spawn()])
+        assert not is_deterministic([Dog.spawn()], [])
+
+    def test_deterministic_needs_one_battle(self):
+        estimate = estimate_win_probability([dummy_pet(power=2, toughness=2)], [dummy_pet(power=1, toughness=1)])
+        assert estimate.deterministic
+        assert estimate.samples == 1
+        assert estimate.win_probability == estimate.lower == estimate.upper == 1
+
+    def test_stops_when_interval_is_tight(self):
+        estimate = estimate_win_probability([Mosquito.spawn(), Cricket.spawn()], [Mosquito.spawn(), Cricket.spawn()],
+                                            tolerance=0.1, batch_size=20, random_gen=Random(0))
+        assert not estimate.deterministic
+        assert (estimate.upper - estimate.lower) / 2 <= 0.1
+        assert estimate.lower <= estimate.win_probability <= estimate.upper
+        assert estimate.samples < 10000
+
+    def test_stops_at_budget(self):
+        estimate = estimate_win_probability([Mosquito.spawn(), Cricket.spawn()], [Mosquito.spawn(), Cricket.spawn()],
+                                            tolerance=0.001, max_samples=30, batch_size=20, random_gen=Random(0))
+        assert estimate.samples == 30
+
+    def test_needs_battles(self):
+        teams = [Mosquito.spawn()], [Cricket.spawn()]
+        with pytest.raises(ValueError):
+            estimate_win_probability(*teams, max_samples=0)
+        with pytest.raises(ValueError):
+            estimate_win_probability(*teams, batch_size=0)
+        with pytest.raises(ValueError):
+            wilson_interval(1, 2, confidence=1)
+
+    def test_wilson_interval(self):
+        assert wilson_interval(0, 0) == (0, 1)
+        lower, upper = wilson_interval(50, 100)
+        assert lower == pytest.approx(1 - upper)
+        assert lower == pytest.approx(0.4038, abs=1e-3)
+        lower, upper = wilson_interval(10, 10)
+        assert 0.65 < lower < 1
+        assert upper == 1
@@ -0,0 +1,68 @@
+from sap.event_queue import EventQueue
+from sap.pet import Pet, Trigger, TriggerType
+from test_helpers import dummy_pet
+
+
+class RecordingPet(Pet):
+    """Pet that notes down every trigger it resolves, so we can check the queue order"""
+    trigger_types = frozenset(TriggerType)
+    seen = []
+
+    def _resolve_trigger(self, trigger, my_team, other_team):
+        RecordingPet.seen.append((self.symbol, trigger.type))
+        return []
+
+
+class TestEventQueue:
+    def test_resolves_first_in_first_out(self):
+        RecordingPet.seen = []
+        pet_1 = RecordingPet(symbol="1", power=1, toughness=1)
+        pet_2 = RecordingPet(symbol="2", power=2, toughness=2)
+        queue = EventQueue(team_1=[pet_1], team_2=[pet_2])
+        queue.apply_trigger(Trigger(TriggerType.BATTLE_STARTED))
+        queue.apply_trigger(Trigger(TriggerType.TURN_ENDED))
+        queue.resolve_events()
+        assert RecordingPet.seen == [
+            ("1", TriggerType.BATTLE_STARTED),
+            ("2", TriggerType.BATTLE_STARTED),
+            ("1", TriggerType.TURN_ENDED),
+            ("2", TriggerType.TURN_ENDED),
+        ]
+        assert not queue.event_queue
+
+    def test_damage_faints_and_removes(self):
+        target = dummy_pet(power=1, toughness=1)
+        attacker = dummy_pet(power=1, toughness=1)
+        queue = EventQueue(team_1=[target], team_2=[attacker])
+        queue.append((attacker, Trigger(TriggerType.DEAL_DAMAGE, target, damage=1)))
+        queue.resolve_events()
+        assert queue.team_1 == []
+        assert queue.team_2 == [attacker]
+
+    def test_resolve_order_kept_for_the_round(self):
+        weak = dummy_pet(power=1, toughness=1)
+        strong = dummy_pet(power=2, toughness=2)
+        queue = EventQueue(team_1=[weak], team_2=[strong])
+        assert queue.resolve_order == [weak, strong]
+        weak.buff(power=5)
+        assert queue.resolve_order == [weak, strong]
+        queue.reset_resolve_order()
+        assert queue.resolve_order == [strong, weak]
+
+    def test_resolve_order_includes_summoned_pets(self):
+        summoner = dummy_pet(power=1, toughness=1)
+        summoned = dummy_pet(power=3, toughness=3)
+        queue = EventQueue(team_1=[summoner], team_2=[])
+        assert queue.resolve_order == [summoner]
+        queue.append((summoner, Trigger(TriggerType.SUMMON_PET, summoner, summoned_pets=[summoned])))
+        queue.resolve_events()
+        assert queue.resolve_order == [summoner, summoned]
+
+    def test_only_subscribers_are_queued(self):
+        listener = RecordingPet(symbol="L", power=1, toughness=1)
+        queue = EventQueue(team_1=[dummy_pet(), listener], team_2=[dummy_pet()])
+        queue.apply_trigger(Trigger(TriggerType.TURN_ENDED))
+        assert [pet for pet, _ in queue.event_queue] == [listener]
+        queue.event_queue.clear()
+        queue.apply_trigger(Trigger(TriggerType.PET_FAINTED, listener))
+        assert len(queue.event_queue) == 3
@@ -1,3 +1,8 @@
+from random import Random
+from typing import Tuple
+
+import pytest
+
 from sap.pet_impl import *
 from sap.shop import Shop
 from test_helpers import DummyPlayer, dummy_pet, StubShopGenerator
@@ -29,10 +34,21 @@ class TestFoodImpl:
         assert pet.toughness == 0
 
     def test_salad_bowl(self):
-        _, pet = self.apply_food(SaladBowl.spawn())
+        salad_bowl = SaladBowl.spawn()
+        salad_bowl.random_gen = Random(0)
+        _, pet = self.apply_food(salad_bowl)
         assert pet.power == 2
         assert pet.toughness == 2
 
+    def test_random_food_needs_a_random_generator(self):
+        with pytest.raises(ValueError):
+            self.apply_food(SaladBowl.spawn())
+        # The player gives food one when it's eaten in the shop phase
+        player = DummyPlayer(pets=[dummy_pet(power=1, toughness=1)])
+        salad_bowl = SaladBowl.spawn()
+        player._apply_food(salad_bowl, 0)
+        assert salad_bowl.random_gen is player.shop.generator.random
+
     def test_canned_food(self):
         player, _ = self.apply_food(
             player=DummyPlayer(shop=Shop(StubShopGenerator([dummy_pet(power=1, toughness=1) for _ in range(6)]))),
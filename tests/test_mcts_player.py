@@ -0,0 +1,78 @@
+import functools
+from random import Random
+
+import pytest
+
+from sap.envs.sap_random_versus_env import SapRandomVersusEnv0
+from sap.game import create_shop
+from sap.mcts_player import MCTSPlayer, create_mcts_player, random_opponent_teams
+from sap.player import TurnAction, STARTING_GOLD, PET_COST
+from test_helpers import dummy_pet
+
+
+def state(player: MCTSPlayer):
+    return (player.gold, [(type(pet), pet.power, pet.toughness) for pet in player.pets],
+            [(type(item.pet), item.frozen) for item in player.shop.pets], [type(item.food) for item in player.shop.food],
+            player.shop.generator.random.getstate())
+
+
+class TestMCTSPlayer:
+    def test_search_leaves_player_as_it_was(self):
+        player = create_mcts_player(0, rollouts=30)
+        player.start_turn(3)
+        before = state(player)
+        root = player.search()
+        assert state(player) == before
+        assert root.visits == 30
+        assert player.last_search.rollouts == 30
+        assert player.journal == []
+
+    def test_buys_a_team(self):
+        player = create_mcts_player(0, rollouts=30)
+        player.perform_buys(1)
+        assert player.num_pets() >= 2
+        assert player.gold < PET_COST
+        assert player.search_stats.rollouts >= 60
+        assert player.search_stats.rollouts_per_second > 0
+
+    def test_same_seed_same_team(self):
+        teams = []
+        for _ in range(2):
+            player = create_mcts_player(4, rollouts=20)
+            player.perform_buys(1)
+            teams.append([(type(pet), pet.power, pet.toughness) for pet in player.pets])
+        assert teams[0] == teams[1]
+
+    def test_time_budget(self):
+        player = create_mcts_player(0, rollouts=None, time_budget=0.2)
+        player.start_turn(1)
+        player.buy_phase()
+        assert player.search_stats.seconds < 0.4
+        assert player.search_stats.rollouts > 0
+
+    def test_needs_a_budget(self):
+        with pytest.raises(ValueError):
+            MCTSPlayer(create_shop(Random(0)), Random(0), rollouts=None, time_budget=None)
+
+    def test_prefers_winning_teams(self):
+        # The weak pet can't beat the strong one unless it's bought, so buying it is the only way to win
+        strong = [dummy_pet("S", power=3, toughness=3)]
+        player = create_mcts_player(0, rollouts=100, opponent_pool=lambda game_round: [strong], stats_weight=0)
+        player.start_turn(1)
+        player.gold = STARTING_GOLD
+        root = player.search()
+        best = max(root.children, key=lambda child: child.visits)
+        assert best.action[0] is TurnAction.BUY_AND_PLACE_PET
+
+    def test_random_opponent_teams(self):
+        teams = random_opponent_teams(2, 3, Random(0))
+        assert len(teams) == 3
+        assert all(teams)
+
+    def test_env_opponent(self):
+        env = SapRandomVersusEnv0(opponent_factory=functools.partial(create_mcts_player, rollouts=5))
+        env.seed(0)
+        env.reset()
+        assert isinstance(env.game.player_2, MCTSPlayer)
+        env.step((TurnAction.END_TURN.value, 0, 0))
+        assert env.game.player_2.search_stats.rollouts > 0
@@ -0,0 +1,37 @@
+from sap.battle import simulate_pairs
+from sap.parallel import simulate_pairs_parallel, make_shards
+from sap.pet_impl import Ant, Mosquito, Hedgehog, Sheep, Fish
+
+
+def make_pairs():
+    return [
+        ([Ant.spawn(), Mosquito.spawn()], [Fish.spawn(), Mosquito.spawn()]),
+        ([Hedgehog.spawn()], [Sheep.spawn()]),
+        ([Fish.spawn()], [Fish.spawn()]),
+    ]
+
+
+class TestParallel:
+    def test_shards_split_samples(self):
+        shards, pair_indices = make_shards(["a", "b"], samples=5, record_rounds=False, seed=0, shard_size=3)
+        assert [shard[1] for shard in shards] == [[3], [2, 1], [3], [1]]
+        assert pair_indices == [0, 0, 1, 1, 1]
+        assert [shard[4] for shard in shards] == [[(0, 0)], [(0, 3), (1, 0)], [(1, 1)], [(1, 4)]]
+
+    def test_matches_serial_tallies(self):
+        outcomes = simulate_pairs_parallel(make_pairs(), samples=20, processes=2, seed=3, shard_size=7,
+                                           record_rounds=True)
+        assert [outcome.battles for outcome in outcomes] == [20, 20, 20]
+        assert all(len(outcome.rounds) == 20 for outcome in outcomes)
+        # Deterministic matchups must agree with a plain serial run
+        assert outcomes[1:] == simulate_pairs(make_pairs()[1:], samples=20, record_rounds=True)
+
+    def test_reproducible_whatever_the_pool_size(self):
+        pairs = make_pairs()
+        assert simulate_pairs_parallel(pairs, samples=30, processes=1, seed=7, shard_size=8) == \
+               simulate_pairs_parallel(pairs, samples=30, processes=3, seed=7, shard_size=8)
+
+    def test_reproducible_whatever_the_shard_size(self):
+        pairs = make_pairs()
+        assert simulate_pairs_parallel(pairs, samples=30, processes=1, seed=7, shard_size=8, record_rounds=True) == \
+               simulate_pairs_parallel(pairs, samples=30, processes=1, seed=7, shard_size=29, record_rounds=True)
@@ -1,7 +1,13 @@
+from concurrent.futures import ProcessPoolExecutor
+
 import pytest
 from sap.pet import *
 
 
+def spawn_ids(number: int) -> List[int]:
+    return [Pet(symbol="P", power=1, toughness=1).id for _ in range(number)]
+
+
 class TestPet:
     def test_takes_base_stats(self):
         pet = Pet("Test", "T", 1, 2)
@@ -9,3 +15,61 @@ class TestPet:
         assert pet.toughness == 2
         assert pet.name == "Test"
         assert pet.symbol == "T"
+
+    def test_ids_are_unique(self):
+        ids = spawn_ids(100)
+        assert len(set(ids)) == 100
+        # Pets made in worker processes don't share ids with ours, so results can be merged
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            worker_ids = executor.submit(spawn_ids, 100).result()
+        assert not set(ids) & set(worker_ids)
+        assert len(short_id(ids[0])) == 3
+
+    def test_pick_unique_pets(self):
+        pets = [Pet(symbol="P", power=1, toughness=toughness) for toughness in (1, 0, 1, 1)]
+        exclusion = [pets[0]]
+        random_gen = Random(0)
+        for _ in range(20):
+            picks = pick_unique_pets(pets, 5, exclusion, random_gen=random_gen)
+            assert sorted(map(id, picks)) == sorted(map(id, pets[2:]))
+        assert exclusion == [pets[0]]
+        assert len(pick_unique_pets(pets, 5, exclusion, require_living=False, random_gen=random_gen)) == 3
+
+        counts = {id(pet): 0 for pet in pets}
+        for _ in range(3000):
+            counts[id(pick_unique_pets(pets, 1, random_gen=random_gen)[0])] += 1
+        assert counts[id(pets[1])] == 0
+        assert all(900 < counts[id(pet)] < 1100 for pet in (pets[0], pets[2], pets[3]))
+
+    def test_no_shared_random_gen(self):
+        pet = Pet(symbol="P", power=1, toughness=1)
+        assert pet.random_gen is None
+        with pytest.raises(ValueError):
+            random_for(pet)
+        pet.random_gen = Random(0)
+        assert random_for(pet) is pet.random_gen
+        # Which generator a pet has doesn't make it a different pet
+        assert pet == Pet(symbol="P", power=1, toughness=1, id=pet.id)
+
+    def test_slotted_super(self):
+        @slotted
+        @dataclass
+        class Buffed(Pet):
+            bonus: int = 1
+
+            def buff(self, power: int = 0, toughness: int = 0):
+                super().buff(power=power + self.bonus, toughness=toughness)
+
+            @property
+            def cls(self):
+                return __class__
+
+            @classmethod
+            def spawn(cls):
+                return cls(symbol="B", power=1, toughness=1)
+
+        pet = Buffed.spawn()
+        pet.buff(power=1)
+        assert pet.power == 3
+        assert pet.cls is Buffed
+        assert not hasattr(pet, "__dict__")
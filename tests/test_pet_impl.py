@@ -57,3 +57,67 @@ class TestPetImpl:
         player._apply_food(SleepingPill.spawn(), 0)
         assert len(player.pets) == 1
         assert type(player.pets[0]) == Bee
+
+    def test_slots(self):
+        def subclasses(cls):
+            for subclass in cls.__subclasses__():
+                yield subclass
+                yield from subclasses(subclass)
+
+        # Every pet and food needs to declare __slots__, or it gets a __dict__ back
+        assert [cls for base in (Pet, Food) for cls in subclasses(base)
+                if cls.__module__.startswith("sap.") and cls.__dictoffset__] == []
+        assert not hasattr(Trigger(TriggerType.PET_FAINTED), "__dict__")
+
+        assert Whale.spawn().swallowed_pet is None
+        assert Gorilla.spawn().num_triggers == 1
+        assert not Tiger.spawn().in_battle
+        assert SaladBowl.spawn().targets == 2
+
+    def test_clone(self):
+        whale = Whale.spawn()
+        whale.swallowed_pet = Fish.spawn()
+        whale.equipped_food = Melon.spawn()
+        cloned = whale.clone()
+        assert cloned == whale and cloned is not whale
+        assert cloned.swallowed_pet is whale.swallowed_pet
+        assert cloned.equipped_food == whale.equipped_food
+        assert cloned.equipped_food is not whale.equipped_food
+
+        fly = Fly.spawn()
+        fly.num_triggers = 1
+        assert fly.clone().num_triggers == 1
+        cloned = fly.clone()
+        cloned.power += 1
+        assert fly.power == 5
+
+    def test_shop_phase_event_queue(self):
+        player = DummyPlayer(pets=[dummy_pet()])
+        player.apply_trigger(Trigger(TriggerType.TURN_ENDED, None))
+        assert player._event_queue is None  # nobody reacts, so nothing to resolve
+
+        horse = Horse.spawn()
+        player.place_pet(horse, 1)
+        player.apply_trigger(Trigger(TriggerType.PET_SUMMONED, player.pets[0], player=player))
+        assert player.pets[0].power == 2
+        queue = player._event_queue
+        player.move(1, 0)
+        player.apply_trigger(Trigger(TriggerType.PET_SUMMONED, player.pets[1], player=player))
+        assert player.pets[1].power == 3
+        assert player._event_queue is queue
+
+    def test_shop_phase_resolve_order_kept(self):
+        player = DummyPlayer(pets=[Horse.spawn(), dummy_pet()])
+        player.apply_trigger(Trigger(TriggerType.PET_SUMMONED, player.pets[1], player=player))
+        order = player.event_queue.resolve_order
+        # Nothing changed, so the resolve order isn't worked out again
+        assert player.event_queue.resolve_order is order
+        player.pets[0].buff(power=5)
+        assert player.event_queue.resolve_order is not order
+        assert player.event_queue.resolve_order[-1] is player.pets[0]
+
+    def test_shop_phase_summons_use_shop_random(self):
+        player = DummyPlayer(pets=[Spider.spawn()])
+        player._apply_food(SleepingPill.spawn(), 0)
+        assert len(player.pets) == 1
+        assert player.pets[0].random_gen is player.shop.generator.random
@@ -1,6 +1,14 @@
+import copy
+from random import Random
+
+import numpy as np
 import pytest
 from sap.player import *
-from test_helpers import create_shop, dummy_pet, create_pets
+from sap.game import create_shop as create_game_shop
+from sap.pet_impl import Pig, Duck, CannedFood
+from sap.shop import ShopPet
+from sap.envs.sap_random_versus_env import SapRandomVersusEnv0
+from test_helpers import create_shop, dummy_pet, create_pets, DummyPlayer
 
 
 
@@ -44,4 +52,155 @@ class TestPlayer:
         assert player.condense() == [pet_1, pet_2]
 
 
+class TestLegalActions:
+    def test_legal_actions_can_all_be_taken(self):
+        for seed in range(5):
+            player = DummyPlayer(shop=create_game_shop(Random(seed)))
+            player.start_turn(seed)
+            for _ in range(5):
+                legal_actions = player.legal_actions()
+                assert (TurnAction.END_TURN, 0, 0) in legal_actions
+                assert len(set(legal_actions)) == len(legal_actions)
+                for action in legal_actions:
+                    copy.deepcopy(player).apply_action(*action)
+
+                player.apply_action(*legal_actions[0])
+
+    def test_no_gold(self):
+        player = DummyPlayer(shop=create_game_shop(Random(0)), pets=[dummy_pet()])
+        player.start_turn(0)
+        player.gold = 0
+        actions = {action for action, _, _ in player.legal_actions()}
+        assert actions == {TurnAction.TOGGLE_FREEZE_PET, TurnAction.TOGGLE_FREEZE_FOOD, TurnAction.SELL_PET,
+                           TurnAction.END_TURN}
+
+    def test_only_combine_same_pet(self):
+        player = DummyPlayer(shop=create_game_shop(Random(0)), pets=[dummy_pet("A"), dummy_pet("B")])
+        player.start_turn(0)
+        symbol = player.shop.pets[0].pet.symbol
+        player.pets.append(dummy_pet(symbol))
+        combines = [(source, target) for action, source, target in player.legal_actions()
+                    if action is TurnAction.BUY_AND_COMBINE_PET]
+        assert (0, 2) in combines
+        assert (0, 0) not in combines
+        assert (0, 1) not in combines
+
+    def test_moves(self):
+        player = DummyPlayer(shop=create_game_shop(Random(0)), pets=[dummy_pet("A"), dummy_pet("B"), dummy_pet("C")])
+        moves = [(source, target) for action, source, target in player.legal_actions() if action is TurnAction.MOVE_PET]
+        assert moves == [(0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1)]
+
+    def test_cached_until_state_changes(self):
+        player = DummyPlayer(shop=create_game_shop(Random(0)))
+        player.start_turn(0)
+        legal_actions = player.legal_actions()
+        assert player.legal_actions() is legal_actions
+
+        player.gold -= 8
+        after_spending = player.legal_actions()
+        assert after_spending is not legal_actions
+        assert len(after_spending) < len(legal_actions)
+
+        player.gold += 8
+        player.apply_action(TurnAction.BUY_AND_PLACE_PET, 0, 0)
+        assert (TurnAction.SELL_PET, 0, 0) in player.legal_actions()
+
+    def test_env_flat_action_mask(self):
+        env = SapRandomVersusEnv0(flat_actions=True)
+        env.seed(1)
+        env.reset()
+        random_gen = Random(1)
+        for _ in range(30):
+            mask = env.action_masks()
+            assert mask.shape == (env.action_space.n,)
+            assert mask.sum() == len(env.game.player_1.legal_actions())
+            _, _, done, _ = env.step(random_gen.choice(np.flatnonzero(mask)))
+            if done:
+                env.reset()
+
+
+class TestJournal:
+    @staticmethod
+    def create_player(pets=None) -> DummyPlayer:
+        player = DummyPlayer(shop=create_game_shop(Random(0)), pets=pets)
+        player.start_turn(0)
+        return player
+
+    def test_undo_pig_gold(self):
+        pig = Pig.spawn()
+        player = self.create_player([pig])
+        player.apply_action(TurnAction.SELL_PET, 0, 0, journal=True)
+        assert player.gold == STARTING_GOLD + 2
+        assert player.pets == []
 
+        player.undo()
+        assert player.gold == STARTING_GOLD
+        assert player.pets == [pig]
+        assert player.pets[0] is pig
+
+    def test_undo_duck_shop_buff(self):
+        player = self.create_player([Duck.spawn()])
+        toughness = [shop_pet.pet.toughness for shop_pet in player.shop.pets]
+        player.apply_action(TurnAction.SELL_PET, 0, 0, journal=True)
+        assert [shop_pet.pet.toughness for shop_pet in player.shop.pets] == [t + 1 for t in toughness]
+
+        player.undo()
+        assert [shop_pet.pet.toughness for shop_pet in player.shop.pets] == toughness
+
+    def test_undo_canned_food(self):
+        player = self.create_player([dummy_pet()])
+        player.shop.replace_shop([CannedFood.spawn()])
+        power = [shop_pet.pet.power for shop_pet in player.shop.pets]
+        player.apply_action(TurnAction.BUY_FOOD_FOR_PET, 0, 0, journal=True)
+        assert player.shop.power_buff == 2
+        assert player.shop.food == []
+
+        player.undo()
+        assert player.shop.power_buff == 0
+        assert [shop_pet.pet.power for shop_pet in player.shop.pets] == power
+        assert [type(item.food) for item in player.shop.food] == [CannedFood]
+
+    def test_undo_buy_and_combine(self):
+        player = self.create_player()
+        bought = player.shop.pets[0].pet
+        player.apply_action(TurnAction.BUY_AND_PLACE_PET, 0, 0, journal=True)
+        player.pets.append(type(bought).spawn())
+        player.shop.pets.insert(0, ShopPet(type(bought).spawn()))
+        power, toughness = bought.power, bought.toughness
+        player.apply_action(TurnAction.BUY_AND_COMBINE_PET, 0, 0, journal=True)
+        assert bought.power > power
+
+        player.undo()
+        assert (bought.power, bought.toughness) == (power, toughness)
+        assert len(player.shop.pets) == 3
+        player.undo()
+        assert player.gold == STARTING_GOLD
+        assert player.shop.pets[0].pet is bought
+
+    def test_undo_reroll_repeats_the_same_shop(self):
+        player = self.create_player()
+        player.apply_action(TurnAction.TOGGLE_FREEZE_PET, 1, journal=True)
+        before = [type(shop_pet.pet) for shop_pet in player.shop.pets]
+        player.apply_action(TurnAction.REROLL, journal=True)
+        rerolled = [type(shop_pet.pet) for shop_pet in player.shop.pets]
+
+        player.undo()
+        assert [type(shop_pet.pet) for shop_pet in player.shop.pets] == before
+        player.apply_action(TurnAction.REROLL, journal=True)
+        assert [type(shop_pet.pet) for shop_pet in player.shop.pets] == rerolled
+
+        player.undo()
+        player.undo()
+        assert not any(shop_pet.frozen for shop_pet in player.shop.pets)
+
+    def test_failed_action_changes_nothing(self):
+        player = self.create_player([dummy_pet()])
+        food = player.shop.food[0]
+        with pytest.raises(IndexError):
+            player.apply_action(TurnAction.BUY_FOOD_FOR_PET, 0, 3, journal=True)
+        assert player.shop.food == [food]
+        assert player.gold == STARTING_GOLD
+        assert player.journal == []
+
+        with pytest.raises(ValueError):
+            player.undo()
@@ -0,0 +1,70 @@
+from random import Random
+
+import pytest
+
+from sap.pet_impl import Ant
+from sap.racing import successive_halving, race, score
+from sap.battle import simulate
+from test_helpers import dummy_pet
+
+
+def candidates(number: int):
+    # The ant picks a pet to buff at random when it faints, so battles between these aren't deterministic
+    return [[Ant.spawn(), dummy_pet("T", power=stats, toughness=stats)] for stats in range(1, number + 1)]
+
+
+OPPONENTS = [[Ant.spawn(), dummy_pet("X", power=4, toughness=4)], [dummy_pet("Y", power=3, toughness=6), Ant.spawn()]]
+
+
+class TestRacing:
+    def test_deterministic_is_exact(self):
+        teams = [[dummy_pet("A", power=stats, toughness=3)] for stats in (1, 5, 3)]
+        opponents = [[dummy_pet("X", power=2, toughness=4)], [dummy_pet("Y", power=4, toughness=2)]]
+        result = successive_halving(teams, opponents)
+        assert result.simulations == 6
+        assert [entry.index for entry in result.ranking] == [1, 2, 0]
+        for entry in result.ranking:
+            expected = sum(score(simulate(entry.team, opponent)) for opponent in opponents) / len(opponents)
+            assert entry.score == entry.lower == entry.upper == expected
+
+    def test_successive_halving(self):
+        result = successive_halving(candidates(8), OPPONENTS, samples=4, random_gen=Random(0))
+        # 8 candidates with 4 battles, 4 with 8 and 2 with 16
+        assert result.simulations == 8 * 4 + 4 * 8 + 2 * 16
+        # Teams from 6 / 6 up always win
+        assert result.best.index >= 5
+        assert result.best.eliminated_after is None
+        assert all(entry.eliminated_after is not None for entry in result.ranking[1:])
+        assert result.best.outcomes.battles == 4 + 8 + 16
+        assert 0 <= result.best.lower <= result.best.score <= result.best.upper <= 1
+
+    def test_race_drops_clearly_worse(self):
+        result = race(candidates(8), OPPONENTS, batch_size=8, max_simulations=2000, random_gen=Random(0))
+        assert result.best.index >= 5
+        # The teams that always win are too close to tell apart, so it stops before the budget runs out
+        assert result.simulations < 2000
+        assert result.best.lower >= 0.98
+        worst = next(entry for entry in result.ranking if entry.index == 0)
+        assert worst.eliminated_after is not None
+        assert worst.outcomes.battles < result.best.outcomes.battles
+        # The ranking follows when each was dropped
+        dropped = [entry.eliminated_after for entry in result.ranking if entry.eliminated_after is not None]
+        assert dropped == sorted(dropped, reverse=True)
+
+    def test_race_stops_at_budget(self):
+        same = [[Ant.spawn(), dummy_pet("T", power=3, toughness=3)] for _ in range(4)]
+        result = race(same, OPPONENTS, batch_size=10, max_simulations=200, tolerance=0, random_gen=Random(0))
+        assert result.simulations <= 200
+        assert len(result.ranking) == 4
+
+    def test_needs_candidates_and_opponents(self):
+        with pytest.raises(ValueError):
+            race([], OPPONENTS)
+        with pytest.raises(ValueError):
+            successive_halving(candidates(2), [])
+        with pytest.raises(ValueError):
+            successive_halving(candidates(2), OPPONENTS, samples=0)
+        with pytest.raises(ValueError):
+            race(candidates(2), OPPONENTS, batch_size=0)
+        with pytest.raises(ValueError):
+            race(candidates(2), OPPONENTS, max_simulations=0)
@@ -0,0 +1,20 @@
+from sap.game import create_game
+from sap.seeding import derive_seed, seeded_random
+
+
+def play(seed: int):
+    game = create_game(seed)
+    result = game.play_game()
+    return result, game.round, game.player_1.lives, game.player_2.lives, game.player_1.wins, game.player_2.wins
+
+
+class TestSeeding:
+    def test_derive_seed(self):
+        assert derive_seed(1, "a", 2) == derive_seed(1, "a", 2)
+        assert derive_seed(1, "a", 2) != derive_seed(1, "a", 3)
+        assert derive_seed(1, 2) != derive_seed(2, 1)
+        assert seeded_random(1, "a").random() == seeded_random(1, "a").random()
+
+    def test_games_are_reproducible(self):
+        assert play(3) == play(3)
+        assert len({play(seed) for seed in range(10)}) > 1
@@ -1,3 +1,6 @@
+from random import Random
+
+from sap.pet_impl import Ant, Fish, Horse, Dog, Apple, Pear
 from sap.shop import *
 from test_helpers import create_pets, StubShopGenerator
 from typing import Optional
@@ -40,3 +43,36 @@ class TestShop:
         assert shop.pets[2:] == pets[SHOP_SIZE+1:-1]
 
 
+
+
+class TestTierShopGenerator:
+    def make_generator(self):
+        return TierShopGenerator([[Ant, Fish], [Horse], [Dog]], [[Apple], [Pear]], Random(0))
+
+    def test_cumulative_pools(self):
+        assert cumulative_pools([[Ant, Fish], [Horse]]) == [(), (Ant, Fish), (Ant, Fish, Horse)]
+
+    def test_batches_stay_in_tier(self):
+        generator = self.make_generator()
+        pets = generator.get_pets(2, 100)
+        assert len(pets) == 100
+        assert {type(pet) for pet in pets} == {Ant, Fish, Horse}
+        assert {type(food) for food in generator.get_foods(9, 50)} == {Apple, Pear}
+        assert all(pet.random_gen is generator.random for pet in pets)
+
+    def test_reroll_all(self):
+        generator = self.make_generator()
+        shops = [Shop(generator) for _ in range(3)]
+        for game_round, shop in enumerate(shops):
+            shop.round = 1 + game_round * 4
+        shops[0].reroll()
+        frozen = shops[0].pets[1]
+        shops[0].toggle_freeze_pet(1)
+
+        reroll_all(shops)
+        assert [len(shop.pets) for shop in shops] == [3, 4, 5]
+        assert [len(shop.food) for shop in shops] == [1, 2, 2]
+        assert frozen in shops[0].pets
+        for shop in shops:
+            tier_pool = cumulative_pools(generator.pet_tiers)[min(shop.tier, 3)]
+            assert all(type(shop_pet.pet) in tier_pool for shop_pet in shop.pets)
@@ -0,0 +1,68 @@
+from random import Random
+
+import pytest
+
+from sap.battle import Result, simulate
+from sap.pet_impl import Mosquito, Fish, Cricket, Dog, Hedgehog
+from sap import solver
+from sap.solver import solve_battle, ScriptedRandom
+from test_helpers import dummy_pet
+
+
+class TestSolver:
+    def test_deterministic(self):
+        distribution = solve_battle([dummy_pet(power=2, toughness=2)], [dummy_pet(power=1, toughness=1)])
+        assert distribution == {Result.TEAM_1_WINS: 1, Result.TEAM_2_WINS: 0, Result.DRAW: 0}
+
+    def test_mosquito_branches(self):
+        # The mosquito kills the 1/1 half the time, then the 2/2 mosquito draws with the 1/2, otherwise it beats both
+        team_1 = [Mosquito(symbol="M", power=2, toughness=2)]
+        team_2 = [dummy_pet(power=1, toughness=1), dummy_pet(power=1, toughness=2)]
+        distribution = solve_battle(team_1, team_2)
+        assert distribution[Result.TEAM_1_WINS] == pytest.approx(0.5)
+        assert distribution[Result.DRAW] == pytest.approx(0.5)
+        assert distribution[Result.TEAM_2_WINS] == pytest.approx(0)
+        assert len(team_2) == 2 and team_2[0].toughness == 1  # teams aren't modified
+
+    def test_matches_sampling(self):
+        team_1 = [Mosquito.spawn(), Cricket.spawn(), Fish.spawn()]
+        team_2 = [Mosquito.spawn(), Dog.spawn(), Hedgehog.spawn()]
+        distribution = solve_battle(team_1, team_2)
+        assert sum(distribution.values()) == pytest.approx(1)
+
+        outcomes = simulate(team_1, team_2, samples=2000, random_gen=Random(0))
+        assert outcomes.team_1_wins / outcomes.battles == pytest.approx(distribution[Result.TEAM_1_WINS], abs=0.05)
+        assert outcomes.draws / outcomes.battles == pytest.approx(distribution[Result.DRAW], abs=0.05)
+
+    def test_max_paths(self):
+        with pytest.raises(ValueError):
+            solve_battle([Mosquito.spawn(), Mosquito.spawn()], [dummy_pet(), dummy_pet(), dummy_pet()], max_paths=2)
+
+    def test_scripted_random(self):
+        random_gen = ScriptedRandom([1])
+        assert random_gen.randrange(3) == 1
+        assert random_gen.choice("ab") == "a"
+        assert random_gen.probability() == pytest.approx(1 / 6)
+        assert random_gen.next_script() == [1, 1]
+        with pytest.raises(NotImplementedError):
+            random_gen.random()
+
+    def test_cycle_is_not_exact(self, monkeypatch):
+        # Scripted rounds, by the toughness of team 1's pet: 1 -> 2 -> 1 can go round forever, or leave from 2 to a win
+        rounds = {1: [(1.0, 2)], 2: [(0.5, 1), (0.5, 0)]}
+        monkeypatch.setattr(solver, "step", lambda team_1, team_2, started, max_paths: [
+            (probability, [dummy_pet(toughness=toughness)], [] if not toughness else team_2)
+            for probability, toughness in rounds[team_1[0].toughness]])
+        with pytest.raises(ValueError):
+            solve_battle([dummy_pet(toughness=1)], [dummy_pet()])
+
+    def test_cut_short_depends_on_rounds_left(self, monkeypatch):
+        # 1 reaches 2 straight away or by way of 3, and from 2 it's two more rounds to a win, which the longer way
+        # doesn't have time for
+        rounds = {1: [(0.5, 2), (0.5, 3)], 3: [(1.0, 2)], 2: [(1.0, 4)], 4: [(1.0, 0)]}
+        monkeypatch.setattr(solver, "step", lambda team_1, team_2, started, max_paths: [
+            (probability, [dummy_pet(toughness=toughness)], [] if not toughness else team_2)
+            for probability, toughness in rounds[team_1[0].toughness]])
+        distribution = solve_battle([dummy_pet(toughness=1)], [dummy_pet()], max_rounds=3)
+        assert distribution[Result.TEAM_1_WINS] == pytest.approx(0.5)
+        assert distribution[Result.DRAW] == pytest.approx(0.5)
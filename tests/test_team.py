@@ -0,0 +1,44 @@
+import copy
+
+import pytest
+
+from sap.team import Team
+from test_helpers import dummy_pet
+
+
+class TestTeam:
+    def test_membership_is_by_identity(self):
+        pet = dummy_pet()
+        twin = copy.copy(pet)
+        assert pet == twin
+        team = Team([pet])
+        assert pet in team
+        assert twin not in team
+
+    def test_index_follows_inserts_and_removes(self):
+        pet_1, pet_2, pet_3 = dummy_pet(), dummy_pet(), dummy_pet()
+        team = Team([pet_1, pet_2])
+        team.insert(0, pet_3)
+        assert team.index(pet_3) == 0
+        assert team.index(pet_2) == 2
+        team.remove(pet_1)
+        assert team == [pet_3, pet_2]
+        assert team.index(pet_2) == 1
+        assert pet_1 not in team
+        with pytest.raises(ValueError):
+            team.index(pet_1)
+
+    def test_remove_leaves_equal_pets(self):
+        pet = dummy_pet()
+        twin = copy.copy(pet)
+        team = Team([twin, pet])
+        team.remove(pet)
+        assert len(team) == 1
+        assert team[0] is twin
+
+    def test_copy_rebuilds_index(self):
+        pet = dummy_pet()
+        team = Team([pet])
+        copied = copy.deepcopy(team)
+        assert pet not in copied
+        assert copied[0] in copied
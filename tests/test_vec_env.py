@@ -0,0 +1,137 @@
+from random import Random
+
+import numpy as np
+import pytest
+from gym import spaces
+
+from sap.envs.sap_random_versus_env import SapRandomVersusEnv0, Action, player_observation, get_legal_action_mask, \
+    _shop_pets_values
+from sap.envs.sap_random_versus_vec_env import SapRandomVersusVecEnv
+from sap.pet_impl import PET_TYPE_TO_ID
+from sap.seeding import derive_seed
+from sap.shop import Shop, ShopPet, LazyShopPet, TierShopGenerator
+
+END_TURN = (Action.END_TURN.action_value, 0, 0)
+
+
+def random_actions(vec_env: SapRandomVersusVecEnv, random_gen: np.random.Generator) -> np.ndarray:
+    if vec_env.flat_actions:
+        return np.array([random_gen.choice(np.flatnonzero(mask)) for mask in vec_env.action_masks()])
+    return random_gen.integers(0, vec_env.action_space_dimension, size=(vec_env.num_envs, 3))
+
+
+class TestVecEnv:
+    def test_observations_match_flatten(self):
+        env = SapRandomVersusEnv0(flat_actions=True)
+        env.seed(0)
+        obs = env.reset()
+        random_gen = np.random.default_rng(0)
+        for _ in range(300):
+            assert np.array_equal(obs, spaces.flatten(env.real_observation_space, player_observation(env.game)))
+            obs, _, done, _ = env.step(random_gen.choice(np.flatnonzero(env.action_masks())))
+            if done:
+                obs = env.reset()
+
+    def test_lazy_shop_observations_match_flatten(self):
+        env = SapRandomVersusEnv0(flat_actions=True, lazy_shop=True)
+        env.seed(0)
+        obs = env.reset()
+        random_gen = np.random.default_rng(0)
+        unspawned = 0
+        for _ in range(300):
+            unspawned += sum(not item.spawned for item in env.game.player_1.shop.pets)
+            # Flattening the observation spawns the shop pets, so it has to come second
+            assert np.array_equal(obs, spaces.flatten(env.real_observation_space, player_observation(env.game)))
+            obs, _, done, _ = env.step(random_gen.choice(np.flatnonzero(env.action_masks())))
+            if done:
+                obs = env.reset()
+        assert unspawned > 0
+
+    @pytest.mark.parametrize("pet_type", [pet_type for pet_type in PET_TYPE_TO_ID if pet_type is not None])
+    def test_lazy_shop_pets_observed_as_spawned(self, pet_type):
+        observed = []
+        for shop_pet in [ShopPet(pet_type.spawn()), LazyShopPet(pet_type, Random(0))]:
+            shop_pet.buff(power=1, toughness=1)
+            observed_shop = Shop(TierShopGenerator([], [], Random(0)))
+            observed_shop.pets.append(shop_pet)
+            observed.append(_shop_pets_values(observed_shop))
+        assert observed[0] == observed[1]
+
+    def test_step_leaves_shop_lazy(self):
+        env = SapRandomVersusEnv0(lazy_shop=True)
+        env.seed(0)
+        env.reset()
+        env.step((Action.REROLL.action_value, 0, 0))
+        assert not any(shop_pet.spawned for shop_pet in env.game.player_1.shop.pets)
+
+    @pytest.mark.parametrize("flat_actions", [False, True])
+    def test_matches_separate_envs(self, flat_actions: bool):
+        vec_env = SapRandomVersusVecEnv(3, flat_actions=flat_actions)
+        vec_env.seed(5)
+        envs = [SapRandomVersusEnv0(flat_actions=flat_actions) for _ in range(3)]
+        for i, env in enumerate(envs):
+            env.seed(derive_seed(5, i))
+
+        obs = vec_env.reset()
+        assert obs.shape == (3, vec_env.observation_space.shape[0])
+        assert np.array_equal(obs, np.stack([env.reset() for env in envs]))
+
+        random_gen = np.random.default_rng(1)
+        finished = 0
+        for _ in range(400):
+            actions = random_actions(vec_env, random_gen)
+            obs, rewards, dones, infos = vec_env.step(actions)
+            for i, env in enumerate(envs):
+                env_obs, reward, done, _ = env.step(actions[i])
+                assert rewards[i] == reward
+                assert dones[i] == done
+                if done:
+                    assert np.array_equal(infos[i]["terminal_observation"], env_obs)
+                    env_obs = env.reset()
+                    finished += 1
+                assert np.array_equal(obs[i], env_obs)
+                assert np.array_equal(vec_env.action_masks()[i], env.action_masks())
+        assert finished > 0
+
+    def test_finished_games_restart(self):
+        vec_env = SapRandomVersusVecEnv(2)
+        vec_env.seed(0)
+        vec_env.reset()
+        for _ in range(100):
+            obs, _, dones, infos = vec_env.step(np.array([END_TURN, END_TURN]))
+            if dones.any():
+                break
+        assert dones.any()
+        for i in np.flatnonzero(dones):
+            assert infos[i]["terminal_observation"].shape == obs[i].shape
+            assert not np.array_equal(infos[i]["terminal_observation"], obs[i])
+            assert vec_env.games[i].round == 1
+
+    def test_returns_copies(self):
+        vec_env = SapRandomVersusVecEnv(2, flat_actions=True)
+        vec_env.seed(0)
+        obs = vec_env.reset()
+        before = obs.copy()
+        vec_env.step(np.array([np.flatnonzero(mask)[0] for mask in vec_env.action_masks()]))
+        assert np.array_equal(obs, before)
+
+    def test_env_methods(self):
+        vec_env = SapRandomVersusVecEnv(2, flat_actions=True)
+        vec_env.seed(0)
+        vec_env.reset()
+        masks = vec_env.env_method("action_masks")
+        assert len(masks) == 2
+        for mask, g in zip(masks, vec_env.games):
+            assert np.array_equal(mask, get_legal_action_mask(g, vec_env.action_space_dimension))
+        assert vec_env.get_attr("flat_actions", indices=1) == [True]
+        vec_env.set_attr("actions_this_turn", 5)
+        assert vec_env.get_attr("actions_this_turn") == [5, 5]
+        assert vec_env.env_is_wrapped(object) == [False, False]
+
+    def test_needs_a_game(self):
+        with pytest.raises(ValueError):
+            SapRandomVersusVecEnv(0)
+
+    def test_is_a_vec_env(self):
+        vec_env_module = pytest.importorskip("stable_baselines3.common.vec_env")
+        assert isinstance(SapRandomVersusVecEnv(1), vec_env_module.VecEnv)
@@ -0,0 +1,79 @@
+from random import Random
+
+import pytest
+
+from sap.envs.sap_random_versus_env import EnvironmentPlayer
+from sap.game import create_shop
+from sap.pet_impl import PET_TIERS, FOOD_TIERS, Fish
+from sap.player import TurnAction
+from sap.shop import Shop, LazyShopPet, TierShopGenerator
+from sap.vector_shop import VectorShopGenerator
+
+
+def make_shops(generator, rounds):
+    shops = [Shop(generator) for _ in rounds]
+    for shop, game_round in zip(shops, rounds):
+        shop.round = game_round
+    return shops
+
+
+class TestVectorShop:
+    def test_follows_shop_rules(self):
+        generator = VectorShopGenerator(PET_TIERS, FOOD_TIERS, Random(0))
+        shops = make_shops(generator, [1, 5, 9, 20])
+        shops[0].reroll()
+        frozen = shops[0].pets[2]
+        shops[0].toggle_freeze_pet(2)
+
+        generator.reroll_all(shops)
+        assert [len(shop.pets) for shop in shops] == [shop.pet_size for shop in shops] == [3, 4, 5, 5]
+        assert [len(shop.food) for shop in shops] == [shop.food_size for shop in shops] == [1, 2, 2, 2]
+        assert shops[0].pets[0] is frozen
+        for shop in shops:
+            pool = generator.get_pool(shop.tier, generator.pet_pools)
+            assert all(shop_pet.pet_type in pool for shop_pet in shop.pets[shop is shops[0]:])
+            assert all(type(shop_food.food) in generator.get_pool(shop.tier, generator.food_pools)
+                       for shop_food in shop.food)
+
+    def test_pets_are_lazy(self):
+        generator = VectorShopGenerator(PET_TIERS, FOOD_TIERS, Random(0))
+        shops = make_shops(generator, [3] * 10)
+        generator.reroll_all(shops)
+        assert not any(shop_pet.spawned for shop in shops for shop_pet in shop.pets)
+        pet = shops[0].buy_pet(0)
+        assert pet.random_gen is generator.random
+        assert not shops[0].pets[0].spawned
+
+    def test_needs_its_own_shops(self):
+        generator = VectorShopGenerator(PET_TIERS, FOOD_TIERS)
+        with pytest.raises(ValueError):
+            generator.reroll_all(make_shops(TierShopGenerator(PET_TIERS, FOOD_TIERS), [1]))
+
+    def test_lazy_shop_pet_buffs(self):
+        shop_pet = LazyShopPet(Fish, Random())
+        shop_pet.buff(power=1, toughness=2)
+        assert not shop_pet.spawned
+        assert (shop_pet.pet.power, shop_pet.pet.toughness) == (3, 5)
+        shop_pet.buff(power=1)
+        assert shop_pet.pet.power == 4
+
+    def test_lazy_shop_pet_without_spawning(self):
+        shop_pet = LazyShopPet(Fish, Random())
+        shop_pet.buff(power=1, toughness=2)
+        assert (shop_pet.pet_type, shop_pet.symbol, shop_pet.power, shop_pet.toughness) == (Fish, "🐟", 3, 5)
+        assert repr(shop_pet) == "🐟3/5"
+        assert not shop_pet.spawned
+        assert (shop_pet.symbol, shop_pet.power, shop_pet.toughness) == \
+               (shop_pet.pet.symbol, shop_pet.pet.power, shop_pet.pet.toughness)
+
+    def test_lazy_shop(self):
+        player = EnvironmentPlayer(create_shop(Random(0), lazy=True))
+        player.start_turn(3)
+        assert isinstance(player.shop.generator, VectorShopGenerator)
+        assert all(isinstance(shop_pet, LazyShopPet) for shop_pet in player.shop.pets)
+        player.apply_action(TurnAction.BUY_AND_PLACE_PET, 0, 0)
+        player.apply_action(TurnAction.REROLL)
+        # Looking for pets to combine with doesn't spawn any
+        assert any(action[0] is TurnAction.BUY_AND_COMBINE_PET for action in player.legal_actions()) == \
+               any(shop_pet.symbol == player.pets[0].symbol for shop_pet in player.shop.pets)
+        assert not any(shop_pet.spawned for shop_pet in player.shop.pets)